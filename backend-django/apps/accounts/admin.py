@@ -6,6 +6,8 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth import get_user_model
 
+from .models import RevokedToken
+
 User = get_user_model()
 
 
@@ -65,3 +67,12 @@ class UserAdmin(BaseUserAdmin):
             )
         }),
     )
+
+
+@admin.register(RevokedToken)
+class RevokedTokenAdmin(admin.ModelAdmin):
+    """Administration des tokens révoqués (lecture seule)."""
+    
+    list_display = ['jti', 'expires_at', 'created_at']
+    search_fields = ['jti']
+    readonly_fields = ['jti', 'expires_at', 'created_at']
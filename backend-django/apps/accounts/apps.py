@@ -9,3 +9,7 @@ class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.accounts'
     verbose_name = 'Gestion des comptes'
+    
+    def ready(self):
+        """Enregistre les signaux de l'application."""
+        from . import signals  # noqa: F401
@@ -0,0 +1,104 @@
+"""
+Authentification JWT avec cache des utilisateurs.
+
+JWTAuthentication charge l'utilisateur en base à chaque requête. Les
+permissions n'ayant besoin que du rôle et de l'état actif, l'utilisateur
+résolu est conservé dans un cache mémoire propre au processus, pour une
+courte durée (AUTH_USER_CACHE_TTL secondes).
+
+Le cache est invalidé :
+- à chaque modification ou suppression de l'utilisateur (signaux, même processus)
+- lorsque le rôle porté par le token diffère du rôle en cache
+- à l'expiration de la durée de vie (modifications faites par un autre processus)
+"""
+
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+# Durée de vie d'un utilisateur en cache (secondes)
+AUTH_USER_CACHE_TTL = getattr(settings, 'AUTH_USER_CACHE_TTL', 30)
+
+# Nom du claim portant le rôle dans les tokens
+ROLE_CLAIM = 'role'
+
+
+class _UserCache:
+    """Cache mémoire {user_id: (expiration, utilisateur)} protégé par un verrou."""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            self.forget(user_id)
+            return None
+        return user
+
+    def set(self, user_id, user):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + AUTH_USER_CACHE_TTL, user)
+
+    def forget(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Cache partagé par les requêtes du processus
+user_cache = _UserCache()
+
+
+def forget_user(user_id):
+    """Retire un utilisateur du cache (après modification ou suppression)."""
+    user_cache.forget(str(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    Authentification JWT résolvant l'utilisateur depuis un cache mémoire.
+
+    Les requêtes d'un utilisateur déjà résolu dans la fenêtre de cache
+    n'exécutent aucune requête d'authentification.
+    """
+
+    def get_user(self, validated_token):
+        """Retourne l'utilisateur du token, depuis le cache si possible."""
+        try:
+            user_id = str(validated_token[api_settings.USER_ID_CLAIM])
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = user_cache.get(user_id)
+        role = validated_token.get(ROLE_CLAIM)
+        if user is None or (role is not None and role != user.role):
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+        elif not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        # Copie par requête : une vue peut modifier request.user sans
+        # affecter les autres requêtes
+        return copy.copy(user)
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """Documentation OpenAPI : même schéma que JWTAuthentication."""
+
+    target_class = 'apps.accounts.authentication.CachedJWTAuthentication'
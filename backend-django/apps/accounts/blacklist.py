@@ -0,0 +1,275 @@
+"""
+Liste de révocation des tokens de rafraîchissement.
+
+Avec ROTATE_REFRESH_TOKENS et BLACKLIST_AFTER_ROTATION, chaque
+rafraîchissement révoque l'ancien token. Plutôt que l'application
+rest_framework_simplejwt.token_blacklist (qui conserve chaque token émis et
+interroge ses tables à chaque rafraîchissement), seuls les identifiants
+(jti) des tokens révoqués sont stockés (modèle RevokedToken).
+
+Chaque processus garde en mémoire un filtre de Bloom des jti révoqués :
+- un jti absent du filtre n'est pas révoqué (aucune requête)
+- un jti présent est confirmé en base (faux positifs ~0,1 %)
+
+Les révocations sont mises en attente et écrites par lots
+(TOKEN_BLACKLIST_FLUSH_SIZE lignes ou TOKEN_BLACKLIST_FLUSH_INTERVAL secondes),
+puis reprises par les autres processus lors de leur synchronisation
+(toutes les TOKEN_BLACKLIST_SYNC_INTERVAL secondes). Un token rejoué sur un
+autre processus pendant ce délai est encore accepté ; régler
+TOKEN_BLACKLIST_FLUSH_SIZE à 1 pour une écriture immédiate.
+"""
+
+import atexit
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .models import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+# Taux de faux positifs visé par le filtre de Bloom
+ERROR_RATE = 0.001
+
+# Capacité minimale du filtre (nombre de jti)
+MIN_CAPACITY = 100_000
+
+# Taille des lots lus ou écrits en base
+BATCH_SIZE = 10_000
+
+# Écriture des révocations en attente : nombre de jti ou délai (secondes)
+FLUSH_SIZE = getattr(settings, 'TOKEN_BLACKLIST_FLUSH_SIZE', 500)
+FLUSH_INTERVAL = getattr(settings, 'TOKEN_BLACKLIST_FLUSH_INTERVAL', 2.0)
+
+# Délai (secondes) entre deux lectures des révocations des autres processus
+SYNC_INTERVAL = getattr(settings, 'TOKEN_BLACKLIST_SYNC_INTERVAL', 5.0)
+
+# Marge de relecture : couvre les transactions validées après une synchronisation
+SYNC_MARGIN = timedelta(seconds=60)
+
+_MASK64 = (1 << 64) - 1
+
+
+class BloomFilter:
+    """
+    Filtre de Bloom sur un tableau de bits.
+
+    Positions obtenues par double hachage (blake2b 128 bits découpé en
+    deux entiers de 64 bits) : h1 + i * h2, i = 0..k-1.
+    """
+
+    def __init__(self, capacity, error_rate=ERROR_RATE):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    @staticmethod
+    def _digest(key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+    def _positions(self, key):
+        h1, h2 = self._digest(key)
+        return [((h1 + i * h2) & _MASK64) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        """Ajoute une clé ; `count` ne compte que les clés absentes du filtre."""
+        if key in self:
+            return
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def update(self, keys):
+        """
+        Ajoute un lot de clés (calcul des positions vectorisé).
+
+        Les clés déjà présentes (relues lors d'une synchronisation) ne sont
+        pas comptées : `count` suit le nombre de clés distinctes.
+        """
+        digests = [self._digest(key) for key in dict.fromkeys(keys)]
+        if not digests:
+            return
+        h1, h2 = (np.array(column, dtype=np.uint64) for column in zip(*digests))
+        steps = np.arange(self.hashes, dtype=np.uint64)
+        # Débordements sur 64 bits voulus : identiques au masque de _positions
+        with np.errstate(over='ignore'):
+            positions = (h1[:, None] + steps * h2[:, None]) % np.uint64(self.size)
+        indexes = (positions >> np.uint64(3)).astype(np.intp)
+        masks = np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8)
+        bits = np.frombuffer(self.bits, dtype=np.uint8)
+        present = ((bits[indexes] & masks) != 0).all(axis=1)
+        np.bitwise_or.at(bits, indexes.ravel(), masks.ravel())
+        self.count += int(np.count_nonzero(~present))
+
+    def __contains__(self, key):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+class TokenBlacklist:
+    """
+    Révocations des tokens : filtre de Bloom en mémoire, écriture par lots.
+
+    Le filtre est construit au premier usage à partir des révocations non
+    expirées, puis complété par synchronisations incrémentales (created_at).
+    Il est reconstruit lorsqu'il dépasse sa capacité, ce qui écarte les jti
+    expirés.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._bloom = None
+        self._synced_at = 0.0
+        self._watermark = None
+        self._pending = {}
+        self._timer = None
+
+    def reset(self):
+        """Oublie l'état en mémoire (rechargé au prochain usage)."""
+        with self._lock:
+            self._bloom = None
+
+    def _load(self):
+        now = timezone.now()
+        active = RevokedToken.objects.filter(expires_at__gt=now)
+        bloom = BloomFilter(max(MIN_CAPACITY, 2 * active.count()))
+        jtis = active.values_list('jti', flat=True).iterator(chunk_size=BATCH_SIZE)
+        batch = []
+        for jti in jtis:
+            batch.append(jti)
+            if len(batch) >= BATCH_SIZE:
+                bloom.update(batch)
+                batch = []
+        bloom.update(batch)
+        bloom.update(list(self._pending))
+        self._bloom = bloom
+        self._watermark = now
+        self._synced_at = time.monotonic()
+
+    def _sync(self):
+        """Charge ou complète le filtre si nécessaire (appelé sous verrou)."""
+        if self._bloom is None or self._bloom.count > self._bloom.capacity:
+            self._load()
+            return
+        if time.monotonic() - self._synced_at < SYNC_INTERVAL:
+            return
+        now = timezone.now()
+        jtis = RevokedToken.objects.filter(
+            created_at__gte=self._watermark - SYNC_MARGIN
+        ).values_list('jti', flat=True)
+        self._bloom.update(list(jtis))
+        self._watermark = now
+        self._synced_at = time.monotonic()
+
+    def is_revoked(self, jti):
+        """Indique si le token d'identifiant `jti` a été révoqué."""
+        with self._lock:
+            if jti in self._pending:
+                return True
+            self._sync()
+            if jti not in self._bloom:
+                return False
+        return RevokedToken.objects.filter(jti=jti).exists()
+
+    def revoke(self, jti, expires_at):
+        """Révoque un token (écriture différée, par lots)."""
+        with self._lock:
+            self._pending[jti] = expires_at
+            if self._bloom is not None:
+                self._bloom.add(jti)
+            if len(self._pending) < FLUSH_SIZE:
+                self._schedule_flush()
+                return
+        self.flush()
+
+    def _schedule_flush(self):
+        if self._timer is None:
+            self._timer = threading.Timer(FLUSH_INTERVAL, self._timed_flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _timed_flush(self):
+        try:
+            self.flush()
+        except DatabaseError:
+            logger.exception("Échec de l'écriture des tokens révoqués")
+        finally:
+            connection.close()
+
+    def flush(self):
+        """Écrit les révocations en attente. Retourne le nombre de jti écrits."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not pending:
+            return 0
+        try:
+            RevokedToken.objects.bulk_create(
+                [RevokedToken(jti=jti, expires_at=expires_at) for jti, expires_at in pending.items()],
+                batch_size=BATCH_SIZE,
+                ignore_conflicts=True
+            )
+        except DatabaseError:
+            # Conserver les révocations pour une prochaine tentative
+            with self._lock:
+                self._pending = {**pending, **self._pending}
+                self._schedule_flush()
+            raise
+        return len(pending)
+
+
+token_blacklist = TokenBlacklist()
+atexit.register(token_blacklist.flush)
+
+
+def prune_expired(batch_size=BATCH_SIZE, now=None):
+    """
+    Supprime les révocations expirées par lots de `batch_size` lignes.
+
+    Returns:
+        int: Nombre de lignes supprimées
+    """
+    now = now or timezone.now()
+    expired = RevokedToken.objects.filter(expires_at__lte=now)
+    deleted = 0
+    while True:
+        ids = list(expired.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += RevokedToken.objects.filter(pk__in=ids).delete()[0]
+
+
+class RevocableRefreshToken(RefreshToken):
+    """Token de rafraîchissement vérifié contre la liste de révocation."""
+
+    def verify(self, *args, **kwargs):
+        super().verify(*args, **kwargs)
+        if token_blacklist.is_revoked(self[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        """Révoque le token jusqu'à son expiration."""
+        token_blacklist.revoke(
+            self[api_settings.JTI_CLAIM],
+            datetime_from_epoch(self['exp'])
+        )
@@ -0,0 +1,303 @@
+"""
+Statistiques du tableau de bord, par rôle.
+
+Chaque tableau de bord est calculé en un nombre fixe de requêtes agrégées :
+- administrateur : 1 requête
+- agent : 2 requêtes (biens et locataires, paiements)
+- locataire : 3 requêtes (bail actif, soldes, prochaine échéance)
+
+Les résultats sont mis en cache par utilisateur (un seul tableau partagé
+par les administrateurs) et invalidés après la validation des écritures
+concernées (signaux et opérations en masse). Une entrée calculée un autre
+jour est recalculée (échéances passées en retard). Les sections du tableau
+de bord composite (voir overview) et la page d'accueil des locataires (voir
+apps.tenants.home) suivent la même invalidation.
+
+L'invalidation n'atteint tous les processus qu'avec un cache partagé
+(Redis, Memcached) : avec le cache local par défaut, la durée de vie des
+entrées est réduite à LOCAL_CACHE_TIMEOUT secondes.
+"""
+
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, Q, Sum
+from django.contrib.auth import get_user_model
+
+from apps.tenants.deferred import defer_per_transaction
+
+# Durée de vie d'un tableau de bord en cache (secondes)
+DASHBOARD_CACHE_TIMEOUT = getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300)
+
+# Durée de vie avec un cache local au processus (LocMem) : l'invalidation ne
+# touche que le processus qui a écrit, les autres servent au plus ce délai
+# de données périmées
+LOCAL_CACHE_TIMEOUT = getattr(settings, 'DASHBOARD_LOCAL_CACHE_TIMEOUT', 5)
+
+# Au-delà de ce nombre de biens ou baux modifiés, tout le cache est invalidé
+INVALIDATE_ALL_THRESHOLD = 1000
+
+# Clé du tableau de bord commun aux administrateurs
+ADMIN_KEY = 'admin'
+
+GENERATION_KEY = 'dashboard:generation'
+
+
+def cache_timeout(timeout=DASHBOARD_CACHE_TIMEOUT):
+    """Durée de vie des entrées : courte si le cache n'est pas partagé entre processus."""
+    if isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache):
+        return min(timeout, LOCAL_CACHE_TIMEOUT)
+    return timeout
+
+
+def _generation():
+    """Retourne la génération courante des tableaux de bord."""
+    return cache.get_or_set(GENERATION_KEY, 1, timeout=None)
+
+
+def _cache_key(key):
+    return f"dashboard:{_generation()}:{key}"
+
+
+def sections_cache_key(key):
+    """Clé des sections du tableau de bord composite d'un utilisateur (ou ADMIN_KEY)."""
+    return f"dashboard:{_generation()}:{key}:sections"
+
+
+def home_cache_key(key):
+    """Clé de la page d'accueil d'un locataire."""
+    return f"dashboard:{_generation()}:{key}:home"
+
+
+def invalidate_all_dashboards():
+    """Invalide tous les tableaux de bord en cache."""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 1, timeout=None)
+
+
+def _invalidate(keys):
+    """Résout les biens, baux, locataires et agents modifiés en utilisateurs et vide leur cache."""
+    from apps.properties.models import Property
+    from apps.tenants.models import AgentTenantAccess, TenantAssignment
+
+    user_keys = {value for kind, value in keys if kind == 'user'}
+    property_ids = {value for kind, value in keys if kind == 'property'}
+    assignment_ids = {value for kind, value in keys if kind == 'assignment'}
+    tenant_ids = {value for kind, value in keys if kind == 'tenant'}
+    agent_ids = {value for kind, value in keys if kind == 'agent'}
+    changed = len(property_ids) + len(assignment_ids) + len(tenant_ids) + len(agent_ids)
+    if changed > INVALIDATE_ALL_THRESHOLD:
+        invalidate_all_dashboards()
+        return
+
+    stale = []
+    if property_ids or assignment_ids or tenant_ids:
+        # Sections communes des administrateurs (biens, paiements, locataires)
+        stale.append(sections_cache_key(ADMIN_KEY))
+    if tenant_ids:
+        # Agents ayant accès aux locataires modifiés (liste des locataires)
+        user_keys.update(
+            AgentTenantAccess.objects.filter(
+                tenant_id__in=tenant_ids
+            ).values_list('agent_id', flat=True)
+        )
+    if agent_ids:
+        # Locataires des biens des agents modifiés (contact de l'agent)
+        user_keys.update(
+            TenantAssignment.objects.filter(
+                property__agent_id__in=agent_ids, is_active=True
+            ).values_list('tenant_id', flat=True)
+        )
+
+    if property_ids:
+        # Agent du bien et locataires dont le bail actif porte sur le bien
+        user_keys.update(
+            Property.objects.filter(pk__in=property_ids).values_list('agent_id', flat=True)
+        )
+        user_keys.update(
+            TenantAssignment.objects.filter(
+                property_id__in=property_ids, is_active=True
+            ).values_list('tenant_id', flat=True)
+        )
+    if assignment_ids:
+        rows = TenantAssignment.objects.filter(pk__in=assignment_ids).values_list(
+            'tenant_id', 'property__agent_id'
+        )
+        for tenant_id, agent_id in rows:
+            user_keys.update((tenant_id, agent_id))
+
+    user_keys.discard(None)
+    for key in user_keys:
+        stale.extend((_cache_key(key), sections_cache_key(key), home_cache_key(key)))
+    if stale:
+        cache.delete_many(stale)
+
+
+def invalidate_dashboards(users=(), properties=(), assignments=(), tenants=(), agents=(),
+                          using=DEFAULT_DB_ALIAS):
+    """
+    Invalide les tableaux de bord concernés par une écriture.
+
+    L'invalidation est exécutée une seule fois, après la validation de la
+    transaction en cours.
+
+    Args:
+        users: Identifiants d'utilisateurs (ou ADMIN_KEY)
+        properties: Biens modifiés (agent et locataires actifs)
+        assignments: Baux modifiés (agent et locataire)
+        tenants: Locataires modifiés (agents ayant accès)
+        agents: Agents modifiés (locataires actifs de leurs biens)
+        using: Alias de la base de données
+    """
+    keys = {('user', value) for value in users if value is not None}
+    keys.update(('property', value) for value in properties if value is not None)
+    keys.update(('assignment', value) for value in assignments if value is not None)
+    keys.update(('tenant', value) for value in tenants if value is not None)
+    keys.update(('agent', value) for value in agents if value is not None)
+    defer_per_transaction(_invalidate, keys, using=using)
+
+
+def _month_bounds(today):
+    start = today.replace(day=1)
+    if start.month == 12:
+        return start, start.replace(year=start.year + 1, month=1)
+    return start, start.replace(month=start.month + 1)
+
+
+def _rate(part, total):
+    return round(part / total * 100, 2) if total else 0
+
+
+def admin_dashboard(today):
+    """Comptes utilisateurs par rôle (1 requête)."""
+    return get_user_model().objects.aggregate(
+        total_users=Count('id'),
+        total_agents=Count('id', filter=Q(role='agent')),
+        total_tenants=Count('id', filter=Q(role='tenant')),
+    )
+
+
+def agent_dashboard(agent, today):
+    """Biens, occupation, locataires et encaissements d'un agent (2 requêtes)."""
+    from apps.payments.models import Payment
+    from apps.properties.models import Property
+
+    properties = Property.objects.for_user(agent).aggregate(
+        total_properties=Count('id', distinct=True),
+        occupied_properties=Count('id', filter=Q(is_available=False), distinct=True),
+        total_tenants=Count(
+            'tenant_assignments__tenant',
+            filter=Q(tenant_assignments__is_active=True),
+            distinct=True
+        ),
+    )
+
+    month_start, next_month = _month_bounds(today)
+    in_month = Q(due_date__gte=month_start, due_date__lt=next_month)
+    paid = Q(status=Payment.Status.PAID)
+    overdue = ~paid & Q(due_date__lt=today)
+    payments = Payment.objects.for_user(agent).aggregate(
+        month_payments=Count('id', filter=in_month),
+        month_paid=Count('id', filter=in_month & paid),
+        month_due=Sum('amount', filter=in_month),
+        month_collected=Sum('amount', filter=in_month & paid),
+        overdue_count=Count('id', filter=overdue),
+        overdue_total=Sum('amount', filter=overdue),
+    )
+
+    return {
+        'total_properties': properties['total_properties'],
+        'occupied_properties': properties['occupied_properties'],
+        'occupancy_rate': _rate(properties['occupied_properties'], properties['total_properties']),
+        'total_tenants': properties['total_tenants'],
+        'month': month_start.strftime('%Y-%m'),
+        'month_due': float(payments['month_due'] or 0),
+        'month_collected': float(payments['month_collected'] or 0),
+        'collection_rate': _rate(payments['month_paid'], payments['month_payments']),
+        'overdue_count': payments['overdue_count'],
+        'overdue_total': float(payments['overdue_total'] or 0),
+    }
+
+
+def tenant_dashboard(tenant, today):
+    """Bail actif, prochaine échéance et solde d'un locataire (3 requêtes)."""
+    from apps.payments.models import Payment
+    from apps.tenants.models import TenantAssignment
+
+    lease = TenantAssignment.objects.for_user(tenant).filter(
+        is_active=True
+    ).select_related('property__agent').order_by('-start_date').first()
+
+    payments = Payment.objects.for_user(tenant)
+    unpaid = ~Q(status=Payment.Status.PAID)
+    totals = payments.aggregate(
+        balance=Sum('amount', filter=unpaid),
+        overdue_total=Sum('amount', filter=unpaid & Q(due_date__lt=today)),
+    )
+    next_payment = payments.filter(unpaid).order_by('due_date', 'id').values(
+        'id', 'amount', 'due_date', 'kind', 'status'
+    ).first()
+
+    current_lease = None
+    if lease is not None:
+        prop = lease.property
+        current_lease = {
+            'id': lease.id,
+            'property': {
+                'id': prop.id,
+                'name': prop.name,
+                'address': prop.full_address,
+            },
+            'start_date': lease.start_date,
+            'end_date': lease.end_date,
+            'rent_amount': float(lease.rent_amount),
+            'charges': float(prop.charges),
+            'agent_contact': {
+                'name': prop.agent.get_full_name(),
+                'email': prop.agent.email,
+                'phone': prop.agent.phone,
+            },
+        }
+    if next_payment is not None:
+        next_payment['amount'] = float(next_payment['amount'])
+        next_payment['is_late'] = next_payment['due_date'] < today
+
+    return {
+        'current_lease': current_lease,
+        'next_payment': next_payment,
+        'balance': float(totals['balance'] or 0),
+        'overdue_total': float(totals['overdue_total'] or 0),
+    }
+
+
+def get_dashboard(user, today=None):
+    """
+    Retourne le tableau de bord de l'utilisateur, depuis le cache si possible.
+
+    Args:
+        user: Utilisateur connecté
+        today: Date de référence (aujourd'hui par défaut)
+
+    Returns:
+        dict: Statistiques selon le rôle
+    """
+    today = today or date.today()
+    if user.role == 'admin':
+        key, builder = ADMIN_KEY, admin_dashboard
+    elif user.role == 'agent':
+        key, builder = user.pk, lambda day: agent_dashboard(user, day)
+    else:
+        key, builder = user.pk, lambda day: tenant_dashboard(user, day)
+
+    cache_key = _cache_key(key)
+    entry = cache.get(cache_key)
+    if entry is not None and entry[0] == today:
+        return entry[1]
+    stats = builder(today)
+    cache.set(cache_key, (today, stats), cache_timeout())
+    return stats
@@ -0,0 +1,25 @@
+"""
+Hachage des mots de passe dans les processus du pool de création de comptes.
+
+Ce module est chargé par des processus lancés en mode "spawn" : il n'importe
+que la classe de hachage demandée, sans initialiser Django (aucun modèle,
+aucun accès aux paramètres).
+"""
+
+from importlib import import_module
+
+
+def hash_passwords(hasher_path, passwords):
+    """
+    Hache une liste de mots de passe avec la classe `hasher_path`.
+
+    Args:
+        hasher_path: Chemin de la classe (ex: django.contrib.auth.hashers.PBKDF2PasswordHasher)
+        passwords: Mots de passe en clair
+
+    Returns:
+        list: Mots de passe encodés (format de stockage Django)
+    """
+    module_path, class_name = hasher_path.rsplit('.', 1)
+    hasher = getattr(import_module(module_path), class_name)()
+    return [hasher.encode(password, hasher.salt()) for password in passwords]
@@ -0,0 +1,104 @@
+"""
+Mesure du coût par requête de la chaîne de middlewares.
+
+Envoie la même requête à l'application WSGI avec la chaîne complète
+(MIDDLEWARE) puis avec la chaîne réduite de l'API (API_MIDDLEWARE), sans
+serveur HTTP, et affiche la durée moyenne par requête.
+
+Par défaut, la requête vise un endpoint sans accès à la base (401 sans
+token) pour isoler le coût des middlewares ; --email authentifie la requête
+avec un token d'accès de l'utilisateur indiqué.
+
+Usage :
+    python manage.py benchmark_middleware
+    python manage.py benchmark_middleware --path /api/accounts/profile/ --email admin@immogest.com
+"""
+
+import io
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from immogest.handlers import APIWSGIHandler
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """Compare la chaîne de middlewares complète et la chaîne de l'API."""
+
+    help = "Mesure le coût par requête de la chaîne de middlewares (complète / API)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default='/api/accounts/profile/',
+            help="Chemin demandé (défaut : /api/accounts/profile/)"
+        )
+        parser.add_argument(
+            '--email',
+            help="Authentifie la requête avec un token de cet utilisateur"
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=2000,
+            help="Nombre de requêtes par chaîne (défaut : 2000)"
+        )
+
+    def _environ(self, path, token):
+        environ = {
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': path,
+            'QUERY_STRING': '',
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '80',
+            'REMOTE_ADDR': '127.0.0.1',
+            'HTTP_ACCEPT': 'application/json',
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': io.BytesIO(),
+            'wsgi.errors': io.StringIO(),
+        }
+        if token:
+            environ['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+        return environ
+
+    def _run(self, handler, path, token, count):
+        statuses = set()
+
+        def start_response(status, headers, exc_info=None):
+            statuses.add(status)
+
+        # Préchauffage (imports, résolution des URLs, caches)
+        for _ in range(20):
+            b''.join(handler(self._environ(path, token), start_response))
+        statuses.clear()
+
+        start = time.perf_counter()
+        for _ in range(count):
+            response = handler(self._environ(path, token), start_response)
+            b''.join(response)
+            response.close()
+        elapsed = time.perf_counter() - start
+        return elapsed / count * 1_000_000, statuses
+
+    def handle(self, *args, **options):
+        token = None
+        if options['email']:
+            user = User.objects.filter(email=options['email']).first()
+            if user is None:
+                raise CommandError(f"Utilisateur introuvable : {options['email']}")
+            token = str(AccessToken.for_user(user))
+
+        count = max(1, options['requests'])
+        results = {}
+        for label, handler_class in (("Chaîne complète", WSGIHandler), ("Chaîne API", APIWSGIHandler)):
+            per_request, statuses = self._run(handler_class(), options['path'], token, count)
+            results[label] = per_request
+            self.stdout.write(f"{label} : {per_request:.0f} µs/requête ({', '.join(sorted(statuses))})")
+
+        saved = results["Chaîne complète"] - results["Chaîne API"]
+        self.stdout.write(self.style.SUCCESS(f"Gain : {saved:.0f} µs/requête"))
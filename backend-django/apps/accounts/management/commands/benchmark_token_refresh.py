@@ -0,0 +1,137 @@
+"""
+Mesure du débit de rafraîchissement des tokens JWT.
+
+Insère des révocations fictives (tokens déjà tournés), puis mesure :
+- la construction du filtre de Bloom à partir de la base
+- la vérification de jti avec filtre / par requête directe
+- le débit de rafraîchissement de bout en bout (sérialiseur)
+
+Les données fictives sont supprimées en fin de mesure (sauf --keep).
+
+Usage :
+    python manage.py benchmark_token_refresh
+    python manage.py benchmark_token_refresh --tokens 5000000 --refreshes 5000
+"""
+
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from apps.accounts.blacklist import BATCH_SIZE, RevocableRefreshToken, token_blacklist
+from apps.accounts.models import RevokedToken
+from apps.accounts.serializers import CustomTokenRefreshSerializer
+
+User = get_user_model()
+
+# Préfixe des jti et email des données fictives
+BENCH_PREFIX = 'bench-'
+BENCH_EMAIL = 'benchmark-refresh@immogest.local'
+
+
+class Command(BaseCommand):
+    """Mesure le rafraîchissement des tokens avec un grand nombre de révocations."""
+
+    help = "Mesure le débit de rafraîchissement des tokens JWT."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tokens',
+            type=int,
+            default=1_000_000,
+            help="Nombre de tokens révoqués insérés (défaut : 1 000 000)"
+        )
+        parser.add_argument(
+            '--refreshes',
+            type=int,
+            default=2000,
+            help="Nombre de rafraîchissements mesurés (défaut : 2000)"
+        )
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help="Conserve les données fictives après la mesure"
+        )
+
+    def _timed(self, label, func, count=None):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        rate = f" ({count / elapsed:,.0f}/s)" if count and elapsed else ""
+        self.stdout.write(f"{label} : {elapsed:.2f} s{rate}")
+        return result
+
+    def _seed(self, count):
+        expires_at = timezone.now() + api_settings.REFRESH_TOKEN_LIFETIME
+        for offset in range(0, count, BATCH_SIZE):
+            RevokedToken.objects.bulk_create(
+                RevokedToken(jti=f"{BENCH_PREFIX}{uuid.uuid4().hex}", expires_at=expires_at)
+                for _ in range(min(BATCH_SIZE, count - offset))
+            )
+
+    def _refresh(self, token, count):
+        for _ in range(count):
+            serializer = CustomTokenRefreshSerializer(data={'refresh': str(token)})
+            serializer.is_valid(raise_exception=True)
+            token = serializer.validated_data['refresh']
+        return token
+
+    def _cleanup(self, user):
+        seeded = RevokedToken.objects.filter(jti__startswith=BENCH_PREFIX)
+        while True:
+            ids = list(seeded.values_list('pk', flat=True)[:BATCH_SIZE])
+            if not ids:
+                break
+            RevokedToken.objects.filter(pk__in=ids).delete()
+        user.delete()
+        token_blacklist.reset()
+
+    def handle(self, *args, **options):
+        tokens = max(0, options['tokens'])
+        refreshes = max(1, options['refreshes'])
+        user, _ = User.objects.get_or_create(
+            email=BENCH_EMAIL,
+            defaults={'first_name': 'Benchmark', 'last_name': 'Refresh', 'role': 'tenant'}
+        )
+
+        self._timed(f"Insertion de {tokens:,} révocations", lambda: self._seed(tokens), tokens)
+
+        token_blacklist.reset()
+        self._timed("Construction du filtre", lambda: token_blacklist.is_revoked('warmup'))
+
+        probes = [uuid.uuid4().hex for _ in range(refreshes)]
+        self._timed(
+            "Vérification avec filtre",
+            lambda: [token_blacklist.is_revoked(jti) for jti in probes],
+            refreshes
+        )
+        self._timed(
+            "Vérification par requête",
+            lambda: [RevokedToken.objects.filter(jti=jti).exists() for jti in probes],
+            refreshes
+        )
+
+        first = RevocableRefreshToken.for_user(user)
+        self._timed(
+            f"{refreshes:,} rafraîchissements",
+            lambda: self._refresh(first, refreshes),
+            refreshes
+        )
+        self._timed("Écriture des révocations en attente", token_blacklist.flush)
+
+        # Le premier token a été tourné : sa réutilisation doit être refusée
+        try:
+            self._refresh(first, 1)
+            self.stdout.write(self.style.ERROR("Token tourné accepté"))
+        except TokenError:
+            self.stdout.write(self.style.SUCCESS("Token tourné refusé"))
+
+        if options['keep']:
+            return
+        # Les révocations des rafraîchissements mesurés expirent normalement
+        # (prune_revoked_tokens) ; seules les données fictives sont supprimées
+        self._timed("Suppression des données fictives", lambda: self._cleanup(user))
@@ -0,0 +1,73 @@
+"""
+Affiche les plans d'exécution des périmètres d'accès par rôle.
+
+Pour chaque modèle exposant for_user et chaque rôle (un utilisateur existant
+par rôle), affiche la requête SQL générée et son plan (EXPLAIN). Permet de
+vérifier le chemin de jointure et l'usage des index après une migration.
+
+Usage :
+    python manage.py explain_scopes
+    python manage.py explain_scopes --model payments.Payment --analyze
+"""
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.accounts.scoping import ScopedQuerySetMixin
+
+User = get_user_model()
+
+ROLES = ('admin', 'agent', 'tenant')
+
+
+class Command(BaseCommand):
+    """Affiche le SQL et le plan de for_user pour chaque modèle et rôle."""
+
+    help = "Affiche les plans d'exécution des périmètres d'accès (for_user) par rôle."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            action='append',
+            help="Modèle à analyser (app_label.Model), répétable (défaut : tous)"
+        )
+        parser.add_argument(
+            '--analyze',
+            action='store_true',
+            help="Exécute les requêtes (EXPLAIN ANALYZE, PostgreSQL)"
+        )
+
+    def _models(self, labels):
+        if labels:
+            try:
+                return [apps.get_model(label) for label in labels]
+            except (LookupError, ValueError) as exc:
+                raise CommandError(str(exc))
+        return [
+            model for model in apps.get_models()
+            if isinstance(model._default_manager.all(), ScopedQuerySetMixin)
+        ]
+
+    def handle(self, *args, **options):
+        users = {}
+        for role in ROLES:
+            user = User.objects.filter(role=role, is_active=True).order_by('pk').first()
+            if user is None:
+                self.stderr.write(f"Aucun utilisateur actif de rôle {role} : rôle ignoré")
+            else:
+                users[role] = user
+
+        explain_options = {'analyze': True} if options['analyze'] else {}
+        for model in self._models(options['model']):
+            queryset = model._default_manager.all()
+            if not isinstance(queryset, ScopedQuerySetMixin):
+                raise CommandError(f"{model._meta.label} n'expose pas for_user.")
+            for role, user in users.items():
+                scoped = queryset.for_user(user)
+                self.stdout.write(self.style.MIGRATE_HEADING(f"{model._meta.label} / {role}"))
+                self.stdout.write(str(scoped.query))
+                if scoped.query.is_empty():
+                    self.stdout.write("(aucun accès : aucune requête)\n")
+                    continue
+                self.stdout.write(scoped.explain(**explain_options) + "\n")
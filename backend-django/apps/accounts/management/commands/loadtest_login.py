@@ -0,0 +1,157 @@
+"""
+Test de charge de la connexion sous attaque par force brute.
+
+Des threads « attaquants » envoient des mots de passe erronés à débit fixe
+(depuis une adresse IP, sur quelques emails) pendant que des utilisateurs
+légitimes, chacun depuis sa propre adresse, se connectent à intervalle
+régulier. Leur latence est mesurée sans attaque, puis sous attaque sans
+limitation et avec limitation.
+
+Usage :
+    python manage.py loadtest_login
+    python manage.py loadtest_login --attackers 8 --rate 200 --logins 50
+"""
+
+import statistics
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from apps.accounts import throttling
+from apps.accounts.views import CustomTokenObtainPairView
+
+User = get_user_model()
+
+# Comptes fictifs (supprimés en fin de mesure)
+LOADTEST_EMAIL = 'loadtest-login-{index}@immogest.local'
+LOADTEST_PASSWORD = 'LoadTest-Password-2024'
+TARGET_EMAILS = [f'loadtest-target-{index}@immogest.local' for index in range(5)]
+
+ATTACKER_IP = '10.66.6.6'
+
+
+class Command(BaseCommand):
+    """Mesure la latence de connexion d'utilisateurs légitimes sous attaque."""
+
+    help = "Mesure la latence de connexion sous attaque par force brute."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--attackers',
+            type=int,
+            default=4,
+            help="Nombre de threads attaquants (défaut : 4)"
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=40,
+            help="Débit total de l'attaque, en requêtes par seconde (défaut : 40)"
+        )
+        parser.add_argument(
+            '--logins',
+            type=int,
+            default=30,
+            help="Nombre de connexions légitimes mesurées par scénario (défaut : 30)"
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0.05,
+            help="Pause entre deux connexions légitimes, en secondes (défaut : 0.05)"
+        )
+
+    def _attack(self, stop, counters, period):
+        client = Client(REMOTE_ADDR=ATTACKER_IP)
+        url = reverse('accounts:login')
+        index = 0
+        next_at = time.perf_counter()
+        try:
+            while not stop.is_set():
+                # Débit fixe : une requête par période, sans rattrapage du retard
+                next_at = max(next_at + period, time.perf_counter())
+                stop.wait(max(0, next_at - time.perf_counter()))
+                response = client.post(url, {
+                    'email': TARGET_EMAILS[index % len(TARGET_EMAILS)],
+                    'password': f'wrong-{index}',
+                }, content_type='application/json')
+                counters[response.status_code] = counters.get(response.status_code, 0) + 1
+                index += 1
+        finally:
+            connection.close()
+
+    def _measure(self, logins, interval):
+        url = reverse('accounts:login')
+        latencies = []
+        failures = 0
+        for index in range(logins):
+            client = Client(REMOTE_ADDR=f'10.0.{index // 250}.{index % 250 + 1}')
+            start = time.perf_counter()
+            response = client.post(url, {
+                'email': LOADTEST_EMAIL.format(index=index),
+                'password': LOADTEST_PASSWORD,
+            }, content_type='application/json')
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                failures += 1
+            time.sleep(interval)
+        return latencies, failures
+
+    def _scenario(self, label, attackers, options, throttled):
+        caches[throttling.THROTTLE_CACHE].clear()
+        original = CustomTokenObtainPairView.throttle_classes
+        if not throttled:
+            CustomTokenObtainPairView.throttle_classes = []
+
+        stop = threading.Event()
+        counters = {}
+        period = attackers / options['rate'] if attackers else 0
+        threads = [
+            threading.Thread(target=self._attack, args=(stop, counters, period), daemon=True)
+            for _ in range(attackers)
+        ]
+        try:
+            for thread in threads:
+                thread.start()
+            latencies, failures = self._measure(options['logins'], options['interval'])
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            CustomTokenObtainPairView.throttle_classes = original
+
+        latencies.sort()
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        attempts = ', '.join(f"{code}: {count}" for code, count in sorted(counters.items()))
+        self.stdout.write(
+            f"{label} : médiane {statistics.median(latencies):.1f} ms, "
+            f"p95 {p95:.1f} ms, échecs {failures}"
+            + (f" — attaque ({attempts})" if attempts else "")
+        )
+
+    def handle(self, *args, **options):
+        # Un compte par connexion légitime mesurée (un seul hachage pour tous)
+        logins = max(1, options['logins'])
+        options['logins'] = logins
+        emails = [LOADTEST_EMAIL.format(index=index) for index in range(logins)]
+        users = User.objects.filter(email__in=emails)
+        users.delete()
+        password = make_password(LOADTEST_PASSWORD)
+        User.objects.bulk_create(
+            User(email=email, first_name='Load', last_name='Test', role='tenant', password=password)
+            for email in emails
+        )
+        try:
+            self._scenario("Sans attaque", 0, options, throttled=True)
+            self._scenario("Attaque, sans limitation", options['attackers'], options, throttled=False)
+            self._scenario("Attaque, avec limitation", options['attackers'], options, throttled=True)
+        finally:
+            users.delete()
+            caches[throttling.THROTTLE_CACHE].clear()
@@ -0,0 +1,87 @@
+"""
+Commande de création de comptes locataires en masse.
+
+Les identifiants générés sont écrits dans un fichier CSV (droits 0600) à
+remettre aux locataires puis à supprimer.
+
+Usage :
+    python manage.py provision_tenants locataires.csv --output identifiants.csv
+    python manage.py provision_tenants locataires.ndjson --output identifiants.csv --workers 8
+"""
+
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.accounts.provisioning import DEFAULT_BATCH_SIZE, HASH_WORKERS, TenantProvisioner
+from apps.properties.importers import SUPPORTED_FORMATS, detect_format
+
+
+class Command(BaseCommand):
+    """Crée des comptes locataires depuis un fichier CSV ou NDJSON."""
+
+    help = "Crée des comptes locataires en masse (mots de passe générés)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Chemin du fichier à importer")
+        parser.add_argument(
+            '--output',
+            required=True,
+            help="Fichier CSV où écrire les identifiants générés (ne doit pas exister)"
+        )
+        parser.add_argument(
+            '--format',
+            choices=SUPPORTED_FORMATS,
+            help="Format du fichier (déduit de l'extension par défaut)"
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Nombre de comptes insérés par requête"
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=HASH_WORKERS,
+            help=f"Nombre de processus de hachage (défaut : {HASH_WORKERS})"
+        )
+        parser.add_argument(
+            '--report',
+            help="Fichier JSON où écrire le rapport d'erreurs ligne par ligne"
+        )
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or detect_format(options['path'])
+        if file_format not in SUPPORTED_FORMATS:
+            raise CommandError("Format non reconnu, utilisez --format csv|ndjson.")
+
+        try:
+            descriptor = os.open(options['output'], os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            raise CommandError(f"Le fichier {options['output']} existe déjà.")
+
+        started = time.monotonic()
+        with open(descriptor, 'w', encoding='utf-8', newline='') as credentials, \
+                open(options['path'], 'rb') as stream:
+            provisioner = TenantProvisioner(
+                credentials,
+                batch_size=options['batch_size'],
+                workers=options['workers']
+            )
+            report = provisioner.run(stream, file_format)
+        elapsed = time.monotonic() - started
+
+        if options['report']:
+            with open(options['report'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, ensure_ascii=False, indent=2)
+
+        for error in report['errors'][:20]:
+            self.stderr.write(f"Ligne {error['line']} : {json.dumps(error['errors'], ensure_ascii=False)}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['created']} comptes créés, {report['error_count']} lignes en erreur "
+            f"sur {report['total_rows']} ({elapsed:.1f} s) ; identifiants : {options['output']}"
+        ))
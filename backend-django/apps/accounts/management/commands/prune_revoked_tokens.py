@@ -0,0 +1,33 @@
+"""
+Commande de purge des tokens révoqués expirés.
+
+Un token expiré est refusé par sa signature : sa révocation n'est plus
+utile. Les lignes sont supprimées par lots pour limiter la durée des
+verrous. À planifier une fois par jour (cron, timer systemd...).
+
+Usage :
+    python manage.py prune_revoked_tokens
+    python manage.py prune_revoked_tokens --batch-size 5000
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.accounts.blacklist import BATCH_SIZE, prune_expired
+
+
+class Command(BaseCommand):
+    """Supprime les révocations de tokens expirés."""
+
+    help = "Supprime par lots les tokens révoqués expirés."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help=f"Nombre de lignes supprimées par requête (défaut : {BATCH_SIZE})"
+        )
+
+    def handle(self, *args, **options):
+        deleted = prune_expired(batch_size=max(1, options['batch_size']))
+        self.stdout.write(self.style.SUCCESS(f"{deleted} tokens révoqués expirés supprimés"))
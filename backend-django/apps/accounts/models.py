@@ -6,8 +6,22 @@ Définit le modèle User personnalisé avec les rôles (admin, agent, tenant).
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
 
+from .scoping import ScopedQuerySetMixin
 
-class UserManager(BaseUserManager):
+
+class UserQuerySet(ScopedQuerySetMixin, models.QuerySet):
+    """
+    QuerySet des utilisateurs.
+    
+    for_user : un agent voit les locataires de ses biens (table d'accès
+    agent → locataire), un locataire ne voit que lui-même.
+    """
+    
+    agent_lookup = 'agent_access__agent_id'
+    tenant_lookup = 'pk'
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
     """
     Manager personnalisé pour le modèle User.
     Gère la création des utilisateurs standards et superutilisateurs.
@@ -141,3 +155,29 @@ class User(AbstractUser):
     def is_tenant(self):
         """Vérifie si l'utilisateur est locataire."""
         return self.role == self.Role.TENANT
+
+
+class RevokedToken(models.Model):
+    """
+    Token de rafraîchissement révoqué (rotation, déconnexion).
+    
+    Seul l'identifiant du token (claim jti) est conservé, avec sa date
+    d'expiration : une fois expiré, le token est refusé par sa signature
+    et la ligne peut être supprimée (commande prune_revoked_tokens).
+    
+    Attributes:
+        jti: Identifiant unique du token
+        expires_at: Date d'expiration du token
+        created_at: Date de révocation
+    """
+    
+    jti = models.CharField('Identifiant du token', max_length=255, unique=True)
+    expires_at = models.DateTimeField('Expiration', db_index=True)
+    created_at = models.DateTimeField('Date de révocation', auto_now_add=True, db_index=True)
+    
+    class Meta:
+        verbose_name = 'Token révoqué'
+        verbose_name_plural = 'Tokens révoqués'
+    
+    def __str__(self):
+        return self.jti
@@ -0,0 +1,181 @@
+"""
+Tableau de bord composite de l'agent (et de l'administrateur).
+
+Regroupe en une réponse les sections chargées séparément par le frontend :
+- properties : statistiques des biens (/api/properties/stats/)
+- payments : statistiques de paiement du mois (/api/payments/stats/)
+- accounts : tableau de bord du rôle (/api/accounts/stats/)
+- tenants : premiers locataires (/api/tenants/)
+- recent_payments : dernières échéances (/api/payments/)
+
+Toutes les sections partagent les QuerySets de périmètre de l'utilisateur
+(for_user). Les sections absentes du cache sont calculées en parallèle sur
+un pool de threads lorsque la base le permet (PostgreSQL, hors transaction),
+séquentiellement sinon. Chaque section est mise en cache avec les tableaux
+de bord de l'utilisateur et invalidée avec eux (voir dashboard).
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+
+from apps.payments.stats import payment_stats
+from apps.properties.stats import property_stats
+from .dashboard import ADMIN_KEY, cache_timeout, get_dashboard, sections_cache_key
+
+# Nombre de threads de calcul des sections (1 : calcul séquentiel)
+SECTION_WORKERS = getattr(settings, 'DASHBOARD_SECTION_WORKERS', 4)
+
+# Nombre d'éléments des listes (défaut et maximum)
+DEFAULT_LIMIT = 5
+MAX_LIMIT = 50
+
+_executor = None
+
+
+def _tenants_section(user, params):
+    from apps.tenants.serializers import TenantListSerializer
+    from apps.tenants.views import active_assignments_prefetch
+    from .models import User
+
+    tenants = User.objects.for_user(user).filter(role='tenant')
+    page = tenants.prefetch_related(active_assignments_prefetch())[:params['limit']]
+    return {
+        'count': tenants.count(),
+        'results': list(TenantListSerializer(page, many=True).data),
+    }
+
+
+def _recent_payments_section(user, params):
+    from apps.payments.models import Payment
+    from apps.payments.serializers import PaymentListSerializer
+
+    payments = Payment.objects.for_user(user).select_related(
+        'assignment__tenant', 'assignment__property'
+    )[:params['limit']]
+    return list(PaymentListSerializer(payments, many=True).data)
+
+
+def _payments_section(user, params):
+    from apps.payments.models import Payment
+
+    month = params['month']
+    return {
+        'month': month.strftime('%Y-%m'),
+        **payment_stats(Payment.objects.for_user(user), month.year, month.month),
+    }
+
+
+def _properties_section(user, params):
+    from apps.properties.models import Property
+
+    return property_stats(Property.objects.for_user(user))
+
+
+def _accounts_section(user, params):
+    return get_dashboard(user, params['today'])
+
+
+# Sections disponibles et paramètres dont dépend leur contenu
+SECTIONS = {
+    'properties': (_properties_section, ()),
+    'payments': (_payments_section, ('month',)),
+    'accounts': (_accounts_section, ()),
+    'tenants': (_tenants_section, ('limit',)),
+    'recent_payments': (_recent_payments_section, ('limit',)),
+}
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=SECTION_WORKERS, thread_name_prefix='dashboard-section'
+        )
+    return _executor
+
+
+def _run_in_thread(builder, user, params):
+    """Calcule une section dans un thread du pool, avec sa propre connexion."""
+    close_old_connections()
+    try:
+        return builder(user, params)
+    finally:
+        # Même cycle de vie qu'une requête (CONN_MAX_AGE)
+        close_old_connections()
+
+
+def _can_run_concurrently(using=DEFAULT_DB_ALIAS):
+    """
+    Indique si les sections peuvent être calculées sur d'autres connexions.
+
+    Les threads ont chacun leur connexion : ils ne voient pas les écritures
+    d'une transaction en cours, et SQLite sérialise les accès.
+    """
+    connection = connections[using]
+    return (
+        SECTION_WORKERS > 1
+        and connection.vendor == 'postgresql'
+        and not connection.in_atomic_block
+    )
+
+
+def _param_key(name, params):
+    return ':'.join([name] + [str(params[param]) for param in SECTIONS[name][1]])
+
+
+def get_overview(user, sections, month=None, limit=DEFAULT_LIMIT, today=None):
+    """
+    Retourne les sections demandées du tableau de bord.
+
+    Args:
+        user: Utilisateur connecté (admin ou agent)
+        sections: Noms des sections (clés de SECTIONS)
+        month: Premier jour du mois des statistiques de paiement (défaut : mois en cours)
+        limit: Nombre d'éléments des listes
+        today: Date de référence (aujourd'hui par défaut)
+
+    Returns:
+        dict: Contenu de chaque section
+    """
+    today = today or date.today()
+    params = {
+        'today': today,
+        'month': month or today.replace(day=1),
+        'limit': max(1, min(limit, MAX_LIMIT)),
+    }
+
+    # Un administrateur voit toutes les données : sections communes
+    cache_key = sections_cache_key(ADMIN_KEY if user.role == 'admin' else user.pk)
+    cached = cache.get(cache_key) or {}
+    result = {}
+    missing = []
+    for name in sections:
+        entry = cached.get(_param_key(name, params))
+        if entry is not None and entry[0] == today:
+            result[name] = entry[1]
+        else:
+            missing.append(name)
+
+    if len(missing) > 1 and _can_run_concurrently():
+        executor = _get_executor()
+        futures = {
+            name: executor.submit(_run_in_thread, SECTIONS[name][0], user, params)
+            for name in missing
+        }
+        computed = {name: future.result() for name, future in futures.items()}
+    else:
+        computed = {name: SECTIONS[name][0](user, params) for name in missing}
+
+    if computed:
+        # Relecture : une autre requête a pu compléter l'entrée entre-temps
+        cached = cache.get(cache_key) or {}
+        for name, data in computed.items():
+            cached[_param_key(name, params)] = (today, data)
+        cache.set(cache_key, cached, cache_timeout())
+        result.update(computed)
+
+    return {name: result[name] for name in sections}
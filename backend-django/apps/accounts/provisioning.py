@@ -0,0 +1,324 @@
+"""
+Création de comptes locataires en masse.
+
+Chaque ligne est validée avec TenantProvisionSerializer, les mots de passe
+sont générés (UserCreateSerializer.generate_password) puis hachés en
+parallèle par un pool de processus, et les comptes sont insérés par lots.
+
+Les identifiants générés sont écrits dans un fichier CSV. Côté API, ce
+fichier est conservé hors de MEDIA_ROOT et ne peut être téléchargé qu'une
+seule fois, par l'utilisateur qui a lancé la création.
+"""
+
+import csv
+import logging
+import multiprocessing
+import os
+import re
+import secrets
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import get_hasher
+from django.db import DatabaseError, IntegrityError, transaction
+from rest_framework import serializers
+
+from apps.properties.importers import iter_records
+from .dashboard import ADMIN_KEY, invalidate_dashboards
+from .hashing import hash_passwords
+from .serializers import TenantProvisionSerializer, UserCreateSerializer
+
+User = get_user_model()
+
+logger = logging.getLogger(__name__)
+
+# Taille par défaut des lots d'insertion
+DEFAULT_BATCH_SIZE = 500
+
+# Nombre de mots de passe hachés par tâche envoyée au pool
+HASH_CHUNK_SIZE = 25
+
+# Nombre de processus de hachage
+HASH_WORKERS = getattr(settings, 'TENANT_PROVISIONING_WORKERS', os.cpu_count() or 1)
+
+# Nombre maximal de lignes acceptées par l'API (au-delà : commande provision_tenants)
+MAX_UPLOAD_ROWS = getattr(settings, 'TENANT_PROVISIONING_MAX_ROWS', 5000)
+
+# Dossier des fichiers d'identifiants et durée de conservation (secondes)
+CREDENTIALS_ROOT = Path(getattr(
+    settings, 'TENANT_CREDENTIALS_ROOT', settings.BASE_DIR / 'private' / 'credentials'
+))
+CREDENTIALS_TTL = getattr(settings, 'TENANT_CREDENTIALS_TTL', 24 * 3600)
+
+# Colonnes du fichier d'identifiants
+CREDENTIALS_FIELDS = ['email', 'password', 'first_name', 'last_name']
+
+_TOKEN_PATTERN = re.compile(r'[0-9a-f]{32}')
+
+
+class TenantProvisioner:
+    """
+    Crée des comptes locataires par lots.
+
+    Attributes:
+        credentials: Fichier texte où écrire les identifiants (CSV)
+        batch_size: Nombre de comptes insérés par requête
+        workers: Nombre de processus de hachage (1 : hachage dans le processus courant)
+        created: Nombre de comptes créés
+        errors: Rapport d'erreurs ligne par ligne
+    """
+
+    def __init__(self, credentials, batch_size=DEFAULT_BATCH_SIZE, workers=HASH_WORKERS):
+        self.batch_size = batch_size
+        self.workers = max(1, workers)
+        self.created = 0
+        self.total_rows = 0
+        self.errors = []
+        self._writer = csv.writer(credentials)
+        self._writer.writerow(CREDENTIALS_FIELDS)
+        self._serializer = TenantProvisionSerializer()
+        self._password_source = UserCreateSerializer()
+        hasher = get_hasher()
+        self._hasher_path = f"{type(hasher).__module__}.{type(hasher).__qualname__}"
+        self._seen = set()
+        self._pending = []
+        self._executor = None
+
+    @contextmanager
+    def _pool(self):
+        """Ouvre le pool de hachage le temps de l'import."""
+        if self.workers == 1:
+            yield
+            return
+        # "spawn" évite de dupliquer les threads du serveur web
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn')
+        ) as executor:
+            self._executor = executor
+            try:
+                yield
+            finally:
+                self._executor = None
+
+    def hash_passwords(self, passwords):
+        """Hache les mots de passe, en parallèle si un pool est ouvert."""
+        if self._executor is None or len(passwords) <= HASH_CHUNK_SIZE:
+            return hash_passwords(self._hasher_path, passwords)
+        chunks = [
+            passwords[start:start + HASH_CHUNK_SIZE]
+            for start in range(0, len(passwords), HASH_CHUNK_SIZE)
+        ]
+        results = self._executor.map(partial(hash_passwords, self._hasher_path), chunks)
+        return [encoded for chunk in results for encoded in chunk]
+
+    def _error(self, line_number, errors):
+        self.errors.append({'line': line_number, 'errors': errors})
+
+    def add(self, line_number, record):
+        """Valide une ligne et la place dans le lot courant."""
+        self.total_rows += 1
+        try:
+            data = self._serializer.run_validation(record)
+        except serializers.ValidationError as exc:
+            self._error(line_number, serializers.as_serializer_error(exc))
+            return
+
+        if data['email'] in self._seen:
+            self._error(line_number, {'email': ["Email en double dans le fichier."]})
+            return
+        self._seen.add(data['email'])
+
+        self._pending.append((line_number, data))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Crée les comptes du lot courant (une requête de contrôle, une insertion).
+
+        Une erreur de base de données n'interrompt pas la création : les lignes
+        concernées sont signalées et les comptes déjà créés restent dans le
+        fichier d'identifiants.
+        """
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+
+        existing = set(User.objects.filter(
+            email__in=[data['email'] for _, data in pending]
+        ).values_list('email', flat=True))
+        rows = []
+        for line_number, data in pending:
+            if data['email'] in existing:
+                self._error(line_number, {'email': ["Un utilisateur avec cet email existe déjà."]})
+            else:
+                rows.append(data)
+        if not rows:
+            return
+
+        passwords = [self._password_source.generate_password() for _ in rows]
+        hashed = self.hash_passwords(passwords)
+        users = [
+            User(
+                email=data['email'],
+                first_name=data['first_name'],
+                last_name=data['last_name'],
+                phone=data.get('phone') or None,
+                role=User.Role.TENANT,
+                password=encoded
+            )
+            for data, encoded in zip(rows, hashed)
+        ]
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users, batch_size=self.batch_size)
+            inserted = list(zip(rows, passwords))
+        except IntegrityError:
+            # Email créé entre le contrôle et l'insertion : comptes un par un
+            inserted = self._create_one_by_one(pending, users, rows, passwords)
+        except DatabaseError as exc:
+            logger.exception("Échec de l'insertion d'un lot de comptes locataires")
+            for line_number, data in pending:
+                if data['email'] not in existing:
+                    self._error(line_number, {'non_field_errors': [f"Erreur base de données : {exc}"]})
+            return
+        if inserted:
+            invalidate_dashboards(users=[ADMIN_KEY])
+
+        for data, password in inserted:
+            self._writer.writerow([data['email'], password, data['first_name'], data['last_name']])
+        self.created += len(inserted)
+
+    def _create_one_by_one(self, pending, users, rows, passwords):
+        """Insère un lot compte par compte, les emails en conflit sont signalés."""
+        line_numbers = {data['email']: line_number for line_number, data in pending}
+        inserted = []
+        for user, data, password in zip(users, rows, passwords):
+            try:
+                with transaction.atomic():
+                    user.save(force_insert=True)
+            except IntegrityError:
+                self._error(
+                    line_numbers[data['email']],
+                    {'email': ["Un utilisateur avec cet email existe déjà."]}
+                )
+            except DatabaseError as exc:
+                logger.exception("Échec de l'insertion d'un compte locataire")
+                self._error(
+                    line_numbers[data['email']],
+                    {'non_field_errors': [f"Erreur base de données : {exc}"]}
+                )
+            else:
+                inserted.append((data, password))
+        return inserted
+
+    def run(self, stream, file_format):
+        """
+        Crée les comptes d'un fichier CSV ou NDJSON.
+
+        Args:
+            stream: Fichier ouvert en mode binaire
+            file_format: 'csv' ou 'ndjson'
+
+        Returns:
+            dict: Rapport de création
+        """
+        with self._pool():
+            for line_number, record, error in iter_records(stream, file_format):
+                if error is not None:
+                    self.total_rows += 1
+                    self._error(line_number, error)
+                    continue
+                self.add(line_number, record)
+            self.flush()
+        return self.report()
+
+    def report(self):
+        """Retourne le rapport de création."""
+        return {
+            'total_rows': self.total_rows,
+            'created': self.created,
+            'error_count': len(self.errors),
+            'errors': self.errors,
+        }
+
+
+def count_lines(stream):
+    """Compte les lignes non vides d'un fichier binaire puis revient au début."""
+    count = sum(1 for line in stream if line.strip())
+    stream.seek(0)
+    return count
+
+
+def _credentials_path(user, token):
+    return CREDENTIALS_ROOT / f"{user.pk}-{token}.csv"
+
+
+def purge_credentials(max_age=CREDENTIALS_TTL):
+    """Supprime les fichiers d'identifiants non téléchargés après `max_age` secondes."""
+    if not CREDENTIALS_ROOT.is_dir():
+        return
+    limit = time.time() - max_age
+    for path in CREDENTIALS_ROOT.glob('*.csv'):
+        try:
+            if path.stat().st_mtime < limit:
+                path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+@contextmanager
+def open_credentials(user):
+    """
+    Crée un fichier d'identifiants réservé à `user` (droits 0600).
+
+    Yields:
+        tuple: (jeton de téléchargement, fichier texte ouvert en écriture)
+    """
+    CREDENTIALS_ROOT.mkdir(parents=True, exist_ok=True)
+    token = secrets.token_hex(16)
+    path = _credentials_path(user, token)
+    descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with open(descriptor, 'w', encoding='utf-8', newline='') as output:
+        yield token, output
+
+
+def discard_credentials(user, token):
+    """Supprime un fichier d'identifiants (aucun compte créé)."""
+    _credentials_path(user, token).unlink(missing_ok=True)
+
+
+def take_credentials(user, token):
+    """
+    Ouvre un fichier d'identifiants et le supprime du disque.
+
+    Le fichier reste lisible par le descripteur retourné : il ne peut être
+    téléchargé qu'une fois.
+
+    Returns:
+        file: Fichier ouvert en lecture binaire, None s'il n'existe pas
+        (ou plus), s'il a expiré ou s'il appartient à un autre utilisateur
+    """
+    if not _TOKEN_PATTERN.fullmatch(token):
+        return None
+    path = _credentials_path(user, token)
+    try:
+        handle = open(path, 'rb')
+    except FileNotFoundError:
+        return None
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        # Téléchargement concurrent : un seul des deux obtient le fichier
+        handle.close()
+        return None
+    if os.fstat(handle.fileno()).st_mtime < time.time() - CREDENTIALS_TTL:
+        handle.close()
+        return None
+    return handle
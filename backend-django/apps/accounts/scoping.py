@@ -0,0 +1,65 @@
+"""
+Périmètre des données accessibles selon le rôle.
+
+Les QuerySets des modèles métier exposent `for_user(user)` :
+- admin : tous les objets
+- agent : objets rattachés à ses biens
+- locataire : objets rattachés à ses propres baux
+
+Chaque modèle déclare le chemin de jointure le plus court vers l'agent du
+bien et vers le locataire (filtre sur la clé étrangère, sans jointure sur la
+table des utilisateurs). Le QuerySet de base d'un modèle est construit une
+fois par requête et mémorisé sur l'utilisateur de la requête.
+"""
+
+from django.db.models import Q
+
+# Attribut de l'utilisateur portant les QuerySets mémorisés
+SCOPE_CACHE_ATTR = '_scoped_querysets'
+
+
+class ScopedQuerySetMixin:
+    """
+    Ajoute `for_user(user)` à un QuerySet.
+
+    Attributes:
+        agent_lookup: Chemin vers l'identifiant de l'agent du bien (None : aucun accès)
+        tenant_lookup: Chemin vers l'identifiant du locataire (None : aucun accès)
+    """
+
+    agent_lookup = None
+    tenant_lookup = None
+
+    def scope_filter(self, user):
+        """
+        Retourne la condition d'accès de l'utilisateur.
+
+        Returns:
+            Q: Condition (vide pour un administrateur), None si aucun accès
+        """
+        if not user.is_authenticated:
+            return None
+        if user.role == 'admin':
+            return Q()
+        lookup = {'agent': self.agent_lookup, 'tenant': self.tenant_lookup}.get(user.role)
+        if lookup is None:
+            return None
+        return Q(**{lookup: user.pk})
+
+    def _scoped(self, user):
+        condition = self.scope_filter(user)
+        if condition is None:
+            return self.none()
+        return self.filter(condition) if condition else self.all()
+
+    def for_user(self, user):
+        """Restreint le QuerySet aux objets accessibles par `user`."""
+        # Seul le QuerySet de base (sans filtre) est mémorisé
+        if self.query.has_filters():
+            return self._scoped(user)
+        memo = user.__dict__.setdefault(SCOPE_CACHE_ATTR, {})
+        key = (self.model, self.db)
+        if key not in memo:
+            memo[key] = self._scoped(user)
+        # Copie : les résultats évalués ne sont pas partagés entre appels
+        return memo[key].all()
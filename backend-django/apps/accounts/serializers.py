@@ -4,11 +4,13 @@ Convertissent les modèles en JSON et valident les données entrantes.
 """
 
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
 from django.contrib.auth import get_user_model
 import secrets
 import string
 
+from .blacklist import RevocableRefreshToken
+
 User = get_user_model()
 
 
@@ -110,6 +112,24 @@ class UserCreateSerializer(serializers.ModelSerializer):
         return data
 
 
+class TenantProvisionSerializer(serializers.Serializer):
+    """
+    Ligne d'un fichier de création de locataires en masse.
+    
+    L'unicité des emails est vérifiée par lot (apps.accounts.provisioning),
+    et non ligne par ligne comme dans UserCreateSerializer.
+    """
+    
+    email = serializers.EmailField(max_length=254)
+    first_name = serializers.CharField(max_length=150)
+    last_name = serializers.CharField(max_length=150)
+    phone = serializers.CharField(max_length=20, required=False, allow_blank=True)
+    
+    def validate_email(self, value):
+        """Normalise l'email comme UserManager.create_user."""
+        return User.objects.normalize_email(value)
+
+
 class UserUpdateSerializer(serializers.ModelSerializer):
     """
     Sérialiseur pour la mise à jour des informations utilisateur.
@@ -144,6 +164,13 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     Ajoute les informations utilisateur dans la réponse.
     """
     
+    @classmethod
+    def get_token(cls, user):
+        """Ajoute le rôle dans le token (repris par les tokens d'accès)."""
+        token = super().get_token(user)
+        token['role'] = user.role
+        return token
+    
     def validate(self, attrs):
         """
         Valide les credentials et retourne les tokens avec les infos utilisateur.
@@ -158,3 +185,13 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         data['user'] = user_data
         
         return data
+
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Sérialiseur de rafraîchissement des tokens JWT.
+    Refuse les tokens révoqués et révoque l'ancien token à chaque rotation
+    (voir apps.accounts.blacklist).
+    """
+    
+    token_class = RevocableRefreshToken
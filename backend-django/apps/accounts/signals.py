@@ -0,0 +1,70 @@
+"""
+Signaux de l'application accounts.
+Invalident le cache d'authentification lors des changements d'utilisateur,
+et les tableaux de bord en cache lors des écritures qui les concernent.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.payments.models import Payment
+from apps.properties.models import Property
+from apps.tenants.models import TenantAssignment
+from .authentication import forget_user
+from .dashboard import ADMIN_KEY, invalidate_dashboards
+
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, using, **kwargs):
+    """Retire l'utilisateur modifié du cache d'authentification."""
+    forget_user(instance.pk)
+    invalidate_dashboards(
+        users=[ADMIN_KEY, instance.pk],
+        tenants=[instance.pk] if instance.role == User.Role.TENANT else (),
+        agents=[instance.pk] if instance.role == User.Role.AGENT else (),
+        using=using
+    )
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, using, **kwargs):
+    """Retire l'utilisateur supprimé du cache d'authentification."""
+    forget_user(instance.pk)
+    invalidate_dashboards(users=[ADMIN_KEY, instance.pk], using=using)
+
+
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+def property_changed(sender, instance, using, **kwargs):
+    """
+    Invalide les tableaux de bord de l'agent (ancien et nouveau) et des locataires.
+    
+    Connecté avant le signal de tenants qui réinitialise _loaded_agent_id.
+    """
+    invalidate_dashboards(
+        users=[instance.agent_id, getattr(instance, '_loaded_agent_id', None)],
+        properties=[instance.pk],
+        using=using
+    )
+
+
+@receiver(post_save, sender=TenantAssignment)
+@receiver(post_delete, sender=TenantAssignment)
+def assignment_changed(sender, instance, using, **kwargs):
+    """Invalide les tableaux de bord du locataire et de l'agent du bien."""
+    invalidate_dashboards(
+        users=[instance.tenant_id],
+        properties=[instance.property_id],
+        using=using
+    )
+
+
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+def payment_changed(sender, instance, using, **kwargs):
+    """Invalide les tableaux de bord du locataire et de l'agent concernés."""
+    invalidate_dashboards(assignments=[instance.assignment_id], using=using)
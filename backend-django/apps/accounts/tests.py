@@ -0,0 +1,194 @@
+"""
+Tests de l'application accounts.
+
+Périmètres d'accès par rôle (for_user) : requête générée pour chaque modèle
+et rôle, isolation des données entre agents et entre locataires, et
+restriction des assignations sélectionnables à la création d'un paiement.
+Limitation des échecs de connexion par email, toutes adresses confondues.
+"""
+
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.payments.models import Payment
+from apps.properties.models import Property, PropertyPhoto
+from apps.tenants.models import AgentTenantAccess, TenantAssignment
+from . import throttling
+
+User = get_user_model()
+
+# Modèles exposant for_user et colonne de clé étrangère filtrée par rôle
+# (None : aucun accès pour ce rôle)
+SCOPED_MODELS = {
+    User: {'agent': '"agent_id"', 'tenant': '"id"'},
+    Property: {'agent': '"agent_id"', 'tenant': '"tenant_id"'},
+    PropertyPhoto: {'agent': '"agent_id"', 'tenant': None},
+    TenantAssignment: {'agent': '"agent_id"', 'tenant': '"tenant_id"'},
+    Payment: {'agent': '"agent_id"', 'tenant': '"tenant_id"'},
+}
+
+
+class ScopedQuerySetTests(APITestCase):
+    """Requêtes et données visibles selon le rôle."""
+
+    @classmethod
+    def setUpTestData(cls):
+        def user(email, role):
+            return User.objects.create_user(
+                email=email, password='test', first_name='Test', last_name=role, role=role
+            )
+
+        cls.admin = user('admin@test.local', 'admin')
+        cls.agent = user('agent@test.local', 'agent')
+        cls.other_agent = user('agent2@test.local', 'agent')
+        cls.tenant = user('tenant@test.local', 'tenant')
+        cls.other_tenant = user('tenant2@test.local', 'tenant')
+
+        cls.property = Property.objects.create(
+            name='Bien A', address='1 rue A', city='Paris', postal_code='75001',
+            monthly_rent=800, agent=cls.agent
+        )
+        cls.other_property = Property.objects.create(
+            name='Bien B', address='2 rue B', city='Lyon', postal_code='69001',
+            monthly_rent=900, agent=cls.other_agent
+        )
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.assignment = TenantAssignment.objects.create(
+                tenant=cls.tenant, property=cls.property, agent=cls.agent,
+                start_date=date(2024, 1, 1), rent_amount=800
+            )
+            cls.other_assignment = TenantAssignment.objects.create(
+                tenant=cls.other_tenant, property=cls.other_property, agent=cls.other_agent,
+                start_date=date(2024, 1, 1), rent_amount=900
+            )
+        cls.payment = Payment.objects.create(
+            assignment=cls.assignment, amount=800, due_date=date(2024, 2, 1), kind='rent'
+        )
+        cls.other_payment = Payment.objects.create(
+            assignment=cls.other_assignment, amount=900, due_date=date(2024, 2, 1), kind='rent'
+        )
+
+    def test_admin_scope_has_no_filter(self):
+        for model in SCOPED_MODELS:
+            with self.subTest(model=model.__name__):
+                query = model.objects.for_user(self.admin).query
+                self.assertFalse(query.has_filters())
+
+    def test_scope_filters_on_foreign_keys_without_joining_users(self):
+        for model, columns in SCOPED_MODELS.items():
+            for role, user in (('agent', self.agent), ('tenant', self.tenant)):
+                with self.subTest(model=model.__name__, role=role):
+                    queryset = model.objects.for_user(user)
+                    if columns[role] is None:
+                        self.assertTrue(queryset.query.is_empty())
+                        continue
+                    sql = str(queryset.query)
+                    where = sql.split(' WHERE ', 1)[1]
+                    self.assertIn(columns[role], where)
+                    self.assertNotIn('JOIN "accounts_user"', sql)
+
+    def test_agent_sees_only_own_rows(self):
+        self.assertEqual(
+            list(Property.objects.for_user(self.agent)), [self.property]
+        )
+        self.assertEqual(
+            list(TenantAssignment.objects.for_user(self.agent)), [self.assignment]
+        )
+        self.assertEqual(list(Payment.objects.for_user(self.agent)), [self.payment])
+        self.assertEqual(
+            list(User.objects.for_user(self.agent).filter(role='tenant')), [self.tenant]
+        )
+        self.assertTrue(
+            AgentTenantAccess.objects.filter(agent=self.agent, tenant=self.tenant).exists()
+        )
+
+    def test_tenant_cannot_see_other_tenant_rows(self):
+        self.assertEqual(list(User.objects.for_user(self.tenant)), [self.tenant])
+        self.assertEqual(list(Property.objects.for_user(self.tenant)), [self.property])
+        self.assertEqual(
+            list(TenantAssignment.objects.for_user(self.tenant)), [self.assignment]
+        )
+        self.assertEqual(list(Payment.objects.for_user(self.tenant)), [self.payment])
+        self.assertFalse(PropertyPhoto.objects.for_user(self.tenant).exists())
+
+    def test_scope_is_memoized_per_user(self):
+        with self.assertNumQueries(1):
+            list(Payment.objects.for_user(self.agent))
+        first = Payment.objects.for_user(self.agent)
+        self.assertIsNot(first, Payment.objects.for_user(self.agent))
+        self.assertEqual(len(self.agent.__dict__['_scoped_querysets']), 1)
+
+    def test_agent_cannot_create_payment_outside_scope(self):
+        self.client.force_authenticate(self.agent)
+        url = reverse('payments:payment_create')
+        data = {'kind': 'rent', 'amount': '100.00', 'due_date': '2024-03-01'}
+
+        response = self.client.post(url, {**data, 'assignment': self.other_assignment.pk})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('assignment', response.data)
+        self.assertFalse(
+            Payment.objects.filter(assignment=self.other_assignment, amount=100).exists()
+        )
+
+        response = self.client.post(url, {**data, 'assignment': self.assignment.pk})
+        self.assertEqual(response.status_code, 201)
+
+
+class LoginAccountThrottleTests(APITestCase):
+    """Seau d'échecs par email, alimenté depuis plusieurs adresses IP."""
+
+    BUCKETS = {
+        'login_ip': {'capacity': 100, 'refill': 1},
+        'login_email': {'capacity': 2, 'refill': 1 / 60},
+        'login_account': {'capacity': 4, 'refill': 1 / 120},
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='victim@test.local', password='secret', first_name='Test',
+            last_name='Agent', role='agent'
+        )
+
+    def setUp(self):
+        caches[throttling.THROTTLE_CACHE].clear()
+        patcher = mock.patch.dict(throttling.BUCKETS, self.BUCKETS)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(caches[throttling.THROTTLE_CACHE].clear)
+
+    def login(self, password, ip, email='victim@test.local'):
+        return self.client.post(
+            reverse('accounts:login'), {'email': email, 'password': password},
+            REMOTE_ADDR=ip
+        )
+
+    def test_failures_from_several_ips_drain_the_email_bucket(self):
+        # Moins d'échecs par adresse que la capacité du seau (email, adresse IP)
+        for index in range(4):
+            response = self.login('wrong', f'10.0.0.{index + 1}')
+            self.assertEqual(response.status_code, 401)
+
+        response = self.login('secret', '10.0.0.99')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+    def test_other_emails_are_not_limited(self):
+        for index in range(4):
+            self.login('wrong', f'10.0.0.{index + 1}')
+        User.objects.create_user(
+            email='other@test.local', password='secret', first_name='Test',
+            last_name='Agent', role='agent'
+        )
+        response = self.login('secret', '10.0.0.1', email='other@test.local')
+        self.assertEqual(response.status_code, 200)
+
+    def test_successful_logins_do_not_drain_the_email_bucket(self):
+        for index in range(6):
+            response = self.login('secret', f'10.0.1.{index + 1}')
+            self.assertEqual(response.status_code, 200)
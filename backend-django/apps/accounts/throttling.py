@@ -0,0 +1,172 @@
+"""
+Limitation des tentatives de connexion par seau à jetons.
+
+Chaque seau contient au plus `capacity` jetons et se remplit de `refill`
+jetons par seconde ; une requête consomme un jeton et est refusée (429)
+quand le seau est vide (les seaux d'échecs ne sont consommés que par les
+connexions refusées). Les classes de limitation s'exécutent dans
+`APIView.initial()`, donc avant la validation du sérialiseur : une requête
+refusée ne déclenche aucun hachage de mot de passe ni aucune requête SQL.
+
+Les seaux sont stockés dans le cache LOGIN_THROTTLE_CACHE : cache local au
+processus par défaut, backend partagé (Redis, Memcached) pour appliquer les
+limites sur l'ensemble des processus. La lecture puis l'écriture d'un seau
+ne sont pas atomiques : sous forte concurrence, quelques requêtes de plus
+que la capacité peuvent passer.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+# Alias du cache des seaux
+THROTTLE_CACHE = getattr(settings, 'LOGIN_THROTTLE_CACHE', 'default')
+
+# Capacité (jetons) et remplissage (jetons par seconde) de chaque seau
+DEFAULT_BUCKETS = {
+    # 20 tentatives d'affilée par adresse IP, puis 1 toutes les 3 secondes
+    'login_ip': {'capacity': 20, 'refill': 1 / 3},
+    # 5 échecs d'affilée par email et adresse IP, puis 1 par minute
+    'login_email': {'capacity': 5, 'refill': 1 / 60},
+    # 50 échecs d'affilée par email toutes adresses confondues, puis 1 toutes les 2 minutes
+    'login_account': {'capacity': 50, 'refill': 1 / 120},
+    # 30 rafraîchissements d'affilée par adresse IP, puis 1 par seconde
+    'refresh_ip': {'capacity': 30, 'refill': 1},
+}
+BUCKETS = {**DEFAULT_BUCKETS, **getattr(settings, 'LOGIN_THROTTLE_BUCKETS', {})}
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Limitation par seau à jetons, identifié par `scope` et `get_key()`.
+
+    Attributes:
+        scope: Nom du seau dans BUCKETS
+        charge_on_failure: Ne consomme un jeton que sur échec (voir charge()) ;
+            la requête est seulement refusée quand le seau est vide
+    """
+
+    scope = None
+    charge_on_failure = False
+
+    def __init__(self):
+        bucket = BUCKETS[self.scope]
+        self.capacity = float(bucket['capacity'])
+        self.refill = float(bucket['refill'])
+        self.cache = caches[THROTTLE_CACHE]
+        self._wait = None
+
+    def get_key(self, request, view):
+        """Retourne l'identifiant du seau (None : pas de limitation)."""
+        raise NotImplementedError
+
+    def _bucket(self, request, view):
+        """Retourne (clé de cache, jetons disponibles, instant), None sans limitation."""
+        key = self.get_key(request, view)
+        if key is None:
+            return None
+        # Empreinte courte : clés de longueur fixe pour tous les backends
+        digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+        cache_key = f"throttle:{self.scope}:{digest}"
+
+        now = time.time()
+        entry = self.cache.get(cache_key)
+        if entry is None:
+            return cache_key, self.capacity, now
+        tokens, updated = entry
+        return cache_key, min(self.capacity, tokens + (now - updated) * self.refill), now
+
+    def _take(self, cache_key, tokens, now):
+        tokens = max(0.0, tokens - 1)
+        # Le seau expire une fois plein : sa suppression équivaut à un seau plein
+        timeout = (self.capacity - tokens) / self.refill
+        self.cache.set(cache_key, (tokens, now), int(timeout) + 1)
+
+    def allow_request(self, request, view):
+        bucket = self._bucket(request, view)
+        if bucket is None:
+            return True
+        cache_key, tokens, now = bucket
+        if tokens < 1:
+            self._wait = (1 - tokens) / self.refill
+            return False
+        if not self.charge_on_failure:
+            self._take(cache_key, tokens, now)
+        return True
+
+    def charge(self, request, view):
+        """Consomme un jeton après un échec (charge_on_failure)."""
+        bucket = self._bucket(request, view)
+        if bucket is not None:
+            self._take(*bucket)
+
+    def wait(self):
+        return self._wait
+
+
+class IPThrottle(TokenBucketThrottle):
+    """
+    Seau par adresse IP cliente.
+
+    L'adresse est REMOTE_ADDR, ou l'entrée de X-Forwarded-For ajoutée par le
+    dernier proxy de confiance (REST_FRAMEWORK['NUM_PROXIES']) : un client ne
+    peut pas changer de seau en modifiant l'en-tête.
+    """
+
+    def get_key(self, request, view):
+        return self.get_ident(request)
+
+
+class LoginIPThrottle(IPThrottle):
+    scope = 'login_ip'
+
+
+class RefreshIPThrottle(IPThrottle):
+    scope = 'refresh_ip'
+
+
+def _login_email(request):
+    """Email visé par une connexion, normalisé (None si absent)."""
+    email = request.data.get('email') if hasattr(request.data, 'get') else None
+    if not isinstance(email, str) or not email.strip():
+        return None
+    return email.strip().lower()
+
+
+class LoginEmailThrottle(TokenBucketThrottle):
+    """
+    Seau par couple (email visé, adresse IP), alimenté par les échecs.
+
+    Seules les connexions refusées consomment un jeton, et le seau est propre
+    à l'adresse du client : un tiers ne peut pas bloquer le compte d'un
+    utilisateur légitime en épuisant son seau depuis une autre adresse.
+    """
+
+    scope = 'login_email'
+    charge_on_failure = True
+
+    def get_key(self, request, view):
+        email = _login_email(request)
+        if email is None:
+            return None
+        return f"{email}|{self.get_ident(request)}"
+
+
+class LoginAccountThrottle(TokenBucketThrottle):
+    """
+    Seau par email visé, toutes adresses IP confondues, alimenté par les échecs.
+
+    Limite les attaques distribuées (changement d'adresse à chaque essai)
+    contre un même compte ; sa capacité, plus large que celle du seau
+    (email, adresse IP), laisse un utilisateur légitime se connecter tant
+    que l'attaque reste modérée.
+    """
+
+    scope = 'login_account'
+    charge_on_failure = True
+
+    def get_key(self, request, view):
+        return _login_email(request)
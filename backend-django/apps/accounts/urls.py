@@ -4,18 +4,23 @@ Définit tous les endpoints liés à l'authentification et la gestion des utilis
 """
 
 from django.urls import path
-from rest_framework_simplejwt.views import TokenRefreshView
 
 from .views import (
     CustomTokenObtainPairView,
+    CustomTokenRefreshView,
     UserProfileView,
     ChangePasswordView,
     UserListView,
     AgentListView,
     AgentCreateView,
     TenantCreateView,
+    TenantProvisionView,
+    TenantCredentialsView,
     UserDetailView,
     DashboardStatsView,
+    DashboardOverviewView,
+    ProfileListView,
+    ProfileDetailView,
 )
 
 app_name = 'accounts'
@@ -31,7 +36,7 @@ urlpatterns = [
     
     # POST /api/accounts/refresh/
     # Rafraîchissement du token d'accès
-    path('refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('refresh/', CustomTokenRefreshView.as_view(), name='token_refresh'),
     
     # ==========================================================================
     # PROFIL UTILISATEUR
@@ -73,6 +78,14 @@ urlpatterns = [
     # Créer un compte locataire
     path('tenants/create/', TenantCreateView.as_view(), name='tenant_create'),
     
+    # POST /api/accounts/tenants/provision/
+    # Créer des comptes locataires en masse (CSV / NDJSON)
+    path('tenants/provision/', TenantProvisionView.as_view(), name='tenant_provision'),
+    
+    # GET /api/accounts/tenants/provision/<jeton>/
+    # Télécharger les identifiants générés (une seule fois)
+    path('tenants/provision/<slug:token>/', TenantCredentialsView.as_view(), name='tenant_credentials'),
+    
     # ==========================================================================
     # STATISTIQUES
     # ==========================================================================
@@ -80,4 +93,20 @@ urlpatterns = [
     # GET /api/accounts/stats/
     # Statistiques du dashboard selon le rôle
     path('stats/', DashboardStatsView.as_view(), name='stats'),
+    
+    # GET /api/accounts/dashboard/
+    # Tableau de bord composite (statistiques, locataires, paiements récents)
+    path('dashboard/', DashboardOverviewView.as_view(), name='dashboard'),
+    
+    # ==========================================================================
+    # PROFILAGE (ADMIN)
+    # ==========================================================================
+    
+    # GET /api/accounts/profiles/
+    # Derniers profils de requêtes (en-tête X-Profile ou échantillonnage)
+    path('profiles/', ProfileListView.as_view(), name='profile_list'),
+    
+    # GET /api/accounts/profiles/<id>/
+    # Profil d'une requête (cProfile et requêtes SQL)
+    path('profiles/<slug:profile_id>/', ProfileDetailView.as_view(), name='profile_detail'),
 ]
@@ -3,11 +3,17 @@ Vues API pour la gestion des comptes utilisateurs.
 Fournit les endpoints d'authentification et de gestion des utilisateurs.
 """
 
+import logging
+
 from rest_framework import generics, status, permissions
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.contrib.auth import get_user_model
+from django.http import FileResponse
+from django.urls import reverse
 
 from .serializers import (
     UserSerializer,
@@ -16,10 +22,32 @@ from .serializers import (
     ChangePasswordSerializer,
     CustomTokenObtainPairSerializer,
 )
+from .dashboard import get_dashboard
+from .overview import DEFAULT_LIMIT, SECTIONS, get_overview
 from .permissions import IsAdmin, IsAdminOrAgent, IsOwnerOrAdmin
+from .throttling import (
+    LoginAccountThrottle,
+    LoginEmailThrottle,
+    LoginIPThrottle,
+    RefreshIPThrottle,
+)
+from .provisioning import (
+    MAX_UPLOAD_ROWS,
+    TenantProvisioner,
+    count_lines,
+    discard_credentials,
+    open_credentials,
+    purge_credentials,
+    take_credentials,
+)
+from apps.payments.revenue import parse_month
+from immogest.profiling import get_profile, recent_profiles
+from apps.properties.importers import FORMAT_CSV, SUPPORTED_FORMATS, detect_format
 
 User = get_user_model()
 
+logger = logging.getLogger(__name__)
+
 
 class CustomTokenObtainPairView(TokenObtainPairView):
     """
@@ -46,9 +74,35 @@ class CustomTokenObtainPairView(TokenObtainPairView):
                 ...
             }
         }
+    
+    Limité par adresse IP et, pour les échecs, par couple (email, adresse IP)
+    et par email (429 + Retry-After), avant tout hachage de mot de passe.
     """
     
     serializer_class = CustomTokenObtainPairSerializer
+    throttle_classes = [LoginIPThrottle, LoginEmailThrottle, LoginAccountThrottle]
+    
+    def post(self, request, *args, **kwargs):
+        """Consomme les seaux d'échecs lorsque les identifiants sont refusés."""
+        try:
+            return super().post(request, *args, **kwargs)
+        except AuthenticationFailed:
+            for throttle in self.get_throttles():
+                if throttle.charge_on_failure:
+                    throttle.charge(request, self)
+            raise
+
+
+class CustomTokenRefreshView(TokenRefreshView):
+    """
+    Endpoint de rafraîchissement du token d'accès.
+    
+    POST /api/accounts/refresh/
+    
+    Limité par adresse IP (429 + Retry-After).
+    """
+    
+    throttle_classes = [RefreshIPThrottle]
 
 
 class UserProfileView(generics.RetrieveUpdateAPIView):
@@ -248,6 +302,112 @@ class TenantCreateView(generics.CreateAPIView):
         serializer.save(role='tenant')
 
 
+class TenantProvisionView(APIView):
+    """
+    Endpoint pour créer des comptes locataires en masse.
+    
+    POST /api/accounts/tenants/provision/
+    
+    Accepte un fichier CSV ou NDJSON (multipart, champ "file") avec les
+    colonnes email, first_name, last_name et phone (optionnel). Les mots de
+    passe sont générés et hachés en parallèle, les comptes insérés par lots.
+    Les identifiants sont téléchargeables une seule fois via `credentials_url`.
+    
+    Request body (multipart):
+        - file: Fichier .csv, .ndjson ou .jsonl
+        - format: Format explicite (csv, ndjson) si l'extension est ambiguë
+    
+    Response:
+        {
+            "total_rows": 3,
+            "created": 2,
+            "error_count": 1,
+            "errors": [
+                {"line": 3, "errors": {"email": ["Un utilisateur avec cet email existe déjà."]}}
+            ],
+            "credentials_url": "/api/accounts/tenants/provision/<jeton>/"
+        }
+    """
+    
+    permission_classes = [IsAdminOrAgent]
+    parser_classes = [MultiPartParser, FormParser]
+    
+    def post(self, request):
+        """Crée les comptes du fichier envoyé."""
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response(
+                {'error': 'Aucun fichier fourni (champ "file")'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        file_format = request.data.get('format') or detect_format(
+            upload.name, upload.content_type
+        )
+        if file_format not in SUPPORTED_FORMATS:
+            return Response(
+                {'error': 'Format non supporté (csv ou ndjson attendu)'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        rows = count_lines(upload.file) - (1 if file_format == FORMAT_CSV else 0)
+        if rows > MAX_UPLOAD_ROWS:
+            return Response(
+                {'error': f'Fichier limité à {MAX_UPLOAD_ROWS} lignes '
+                          '(utilisez la commande provision_tenants)'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        purge_credentials()
+        with open_credentials(request.user) as (token, credentials):
+            provisioner = TenantProvisioner(credentials)
+            try:
+                report = provisioner.run(upload.file, file_format)
+            except Exception:
+                # Comptes déjà créés : leurs identifiants restent téléchargeables
+                if not provisioner.created:
+                    discard_credentials(request.user, token)
+                    raise
+                logger.exception("Création de locataires en masse interrompue")
+                report = provisioner.report()
+                report['error'] = 'Création interrompue : seuls les comptes du rapport ont été créés.'
+        
+        if not report['created']:
+            discard_credentials(request.user, token)
+            return Response(report, status=status.HTTP_400_BAD_REQUEST)
+        
+        report['credentials_url'] = reverse('accounts:tenant_credentials', args=[token])
+        return Response(report, status=status.HTTP_201_CREATED)
+
+
+class TenantCredentialsView(APIView):
+    """
+    Endpoint pour télécharger les identifiants d'une création en masse.
+    
+    GET /api/accounts/tenants/provision/<jeton>/
+    
+    Le fichier CSV (email, password, first_name, last_name) n'est disponible
+    qu'une fois, pour l'utilisateur qui a lancé la création.
+    """
+    
+    permission_classes = [IsAdminOrAgent]
+    
+    def get(self, request, token):
+        """Retourne le fichier d'identifiants puis le supprime."""
+        handle = take_credentials(request.user, token)
+        if handle is None:
+            return Response(
+                {'error': 'Fichier introuvable ou déjà téléchargé'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return FileResponse(
+            handle,
+            as_attachment=True,
+            filename='identifiants-locataires.csv',
+            content_type='text/csv'
+        )
+
+
 class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
     """
     Endpoint pour gérer un utilisateur spécifique.
@@ -278,6 +438,9 @@ class DashboardStatsView(APIView):
     
     GET /api/accounts/stats/
     
+    Calculé en un nombre fixe de requêtes agrégées et mis en cache par
+    utilisateur (voir apps.accounts.dashboard).
+    
     Response (selon le rôle):
         Admin:
             {
@@ -289,8 +452,23 @@ class DashboardStatsView(APIView):
         Agent:
             {
                 "total_properties": 25,
+                "occupied_properties": 21,
+                "occupancy_rate": 84.0,
                 "total_tenants": 45,
-                "occupancy_rate": 0.85
+                "month": "2024-06",
+                "month_due": 31500.0,
+                "month_collected": 27000.0,
+                "collection_rate": 85.71,
+                "overdue_count": 3,
+                "overdue_total": 2850.0
+            }
+        
+        Tenant:
+            {
+                "current_lease": {"id": 4, "property": {...}, "rent_amount": 850.0, ...},
+                "next_payment": {"id": 31, "amount": 950.0, "due_date": "2024-07-05", ...},
+                "balance": 950.0,
+                "overdue_total": 0.0
             }
     """
     
@@ -298,24 +476,112 @@ class DashboardStatsView(APIView):
     
     def get(self, request):
         """Retourne les statistiques selon le rôle de l'utilisateur."""
-        user = request.user
+        return Response(get_dashboard(request.user))
+
+
+class DashboardOverviewView(APIView):
+    """
+    Endpoint composite du tableau de bord (admin, agent).
+    
+    GET /api/accounts/dashboard/
+    
+    Remplace les appels séparés du frontend au chargement du tableau de bord,
+    avec une seule authentification et un seul calcul du périmètre. Chaque
+    section est mise en cache (voir apps.accounts.overview).
+    
+    Query params:
+        - sections: Sections demandées, séparées par des virgules
+          (properties, payments, accounts, tenants, recent_payments ; défaut : toutes)
+        - month: Mois des statistiques de paiement (YYYY-MM, défaut : mois en cours)
+        - limit: Nombre de locataires et de paiements récents (défaut : 5, max : 50)
+    
+    Response:
+        {
+            "properties": {"total_properties": 25, ...},
+            "payments": {"month": "2024-06", "total_payments": 21, ...},
+            "accounts": {"total_properties": 25, "occupancy_rate": 84.0, ...},
+            "tenants": {"count": 45, "results": [...]},
+            "recent_payments": [...]
+        }
+    """
+    
+    permission_classes = [IsAdminOrAgent]
+    
+    def get(self, request):
+        """Retourne les sections demandées du tableau de bord."""
+        params = request.query_params
         
-        if user.role == 'admin':
-            # Statistiques admin
-            stats = {
-                'total_users': User.objects.count(),
-                'total_agents': User.objects.filter(role='agent').count(),
-                'total_tenants': User.objects.filter(role='tenant').count(),
-            }
-        elif user.role == 'agent':
-            # Statistiques agent (sera complété avec les autres modèles)
-            stats = {
-                'message': 'Statistiques agent - À implémenter avec les modèles properties'
-            }
+        sections = params.get('sections')
+        if sections:
+            sections = list(dict.fromkeys(name.strip() for name in sections.split(',') if name.strip()))
+            unknown = [name for name in sections if name not in SECTIONS]
+            if unknown:
+                return Response(
+                    {'error': f"Sections inconnues : {', '.join(unknown)}. "
+                              f"Sections disponibles : {', '.join(SECTIONS)}."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
         else:
-            # Statistiques tenant
-            stats = {
-                'message': 'Statistiques locataire - À implémenter'
-            }
+            sections = list(SECTIONS)
+        
+        month = None
+        if params.get('month'):
+            try:
+                month = parse_month(params['month'])
+            except ValueError:
+                return Response(
+                    {'error': "Le paramètre month doit être au format YYYY-MM."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
         
-        return Response(stats)
+        try:
+            limit = int(params.get('limit', DEFAULT_LIMIT))
+        except ValueError:
+            return Response(
+                {'error': "Le paramètre limit doit être un entier."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response(get_overview(request.user, sections, month=month, limit=limit))
+
+
+class ProfileListView(APIView):
+    """
+    Endpoint admin - derniers profils de requêtes.
+    
+    GET /api/accounts/profiles/
+    
+    Requêtes profilées à la demande (en-tête X-Profile) ou par
+    échantillonnage (voir immogest.profiling), de la plus récente à la plus
+    ancienne : chemin, statut, durée, nombre et durée des requêtes SQL.
+    """
+    
+    permission_classes = [IsAdmin]
+    
+    def get(self, request):
+        """Retourne les résumés des derniers profils."""
+        return Response(recent_profiles())
+
+
+class ProfileDetailView(APIView):
+    """
+    Endpoint admin - profil d'une requête.
+    
+    GET /api/accounts/profiles/<id>/
+    
+    L'identifiant est renvoyé dans l'en-tête X-Profile-Id de la réponse
+    profilée. Retourne le résumé, les requêtes SQL avec leur durée et les
+    fonctions les plus coûteuses (cProfile, durée cumulée).
+    """
+    
+    permission_classes = [IsAdmin]
+    
+    def get(self, request, profile_id):
+        """Retourne le profil demandé."""
+        profile = get_profile(profile_id)
+        if profile is None:
+            return Response(
+                {'error': 'Profil introuvable ou expiré.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(profile)
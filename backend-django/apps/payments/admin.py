@@ -14,10 +14,10 @@ class PaymentAdmin(admin.ModelAdmin):
     
     list_display = [
         'reference', 'get_tenant', 'get_property',
-        'amount', 'due_date', 'status', 'payment_date'
+        'kind', 'amount', 'due_date', 'status', 'payment_date'
     ]
     
-    list_filter = ['status', 'payment_method', 'due_date']
+    list_filter = ['status', 'kind', 'payment_method', 'due_date']
     
     search_fields = [
         'reference', 'receipt_number',
@@ -31,7 +31,7 @@ class PaymentAdmin(admin.ModelAdmin):
     
     fieldsets = (
         ('Informations principales', {
-            'fields': ('assignment', 'amount', 'reference')
+            'fields': ('assignment', 'kind', 'amount', 'reference')
         }),
         ('Dates', {
             'fields': ('due_date', 'payment_date')
@@ -0,0 +1,81 @@
+"""
+Commande de génération des échéanciers de loyer.
+
+Génère les loyers manquants de tous les baux actifs sur un horizon
+(12 mois par défaut), avec prorata des premiers et derniers mois.
+
+Usage :
+    python manage.py generate_rent_schedule
+    python manage.py generate_rent_schedule --from 2024-07 --months 6 --day 31
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.payments.revenue import add_months, parse_month
+from apps.payments.schedule import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_DUE_DAY,
+    MAX_MONTHS,
+    generate_schedule,
+)
+from apps.tenants.models import TenantAssignment
+
+
+class Command(BaseCommand):
+    """Génère les loyers manquants des baux actifs."""
+
+    help = "Génère les échéanciers de loyer des baux actifs sur un horizon."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--from',
+            dest='first_month',
+            help="Premier mois au format YYYY-MM (mois en cours par défaut)"
+        )
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=12,
+            help="Nombre de mois générés"
+        )
+        parser.add_argument(
+            '--day',
+            type=int,
+            default=DEFAULT_DUE_DAY,
+            help="Jour d'échéance (31 = dernier jour du mois)"
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Nombre de baux traités par lot"
+        )
+
+    def handle(self, *args, **options):
+        first_month = date.today().replace(day=1)
+        if options['first_month']:
+            try:
+                first_month = parse_month(options['first_month'])
+            except ValueError:
+                raise CommandError("Mois invalide (format attendu : YYYY-MM)")
+
+        months = options['months']
+        if not 1 <= months <= MAX_MONTHS:
+            raise CommandError(f"--months doit être compris entre 1 et {MAX_MONTHS}")
+        if not 1 <= options['day'] <= 31:
+            raise CommandError("--day doit être compris entre 1 et 31")
+
+        result = generate_schedule(
+            TenantAssignment.objects.filter(is_active=True),
+            first_month,
+            months=months,
+            day=options['day'],
+            batch_size=options['batch_size']
+        )
+        last_month = add_months(first_month, months - 1)
+        self.stdout.write(self.style.SUCCESS(
+            f"{first_month:%Y-%m} → {last_month:%Y-%m} : "
+            f"{result['created']} loyers créés, {result['skipped']} déjà existants"
+        ))
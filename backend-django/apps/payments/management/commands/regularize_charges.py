@@ -0,0 +1,74 @@
+"""
+Commande de régularisation annuelle des charges.
+
+Compare les provisions sur charges facturées aux charges réelles des biens
+(décomptes annuels) et crée les échéances de régularisation.
+
+Usage :
+    python manage.py regularize_charges --year 2024 --dry-run
+    python manage.py regularize_charges --year 2024 --agent agent@example.com
+"""
+
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.payments.regularization import regularize_charges
+from apps.tenants.models import TenantAssignment
+
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """Régularise les charges d'une année."""
+
+    help = "Crée les échéances de régularisation des charges d'une année."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, required=True, help="Année régularisée")
+        parser.add_argument(
+            '--agent',
+            help="Email de l'agent (tout le parc par défaut)"
+        )
+        parser.add_argument(
+            '--due-date',
+            help="Échéance des régularisations (YYYY-MM-DD, dans 30 jours par défaut)"
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Calcule les soldes sans créer d'échéances"
+        )
+
+    def handle(self, *args, **options):
+        assignments = TenantAssignment.objects.all()
+        if options['agent']:
+            try:
+                agent = User.objects.get(email=options['agent'], role='agent')
+            except User.DoesNotExist:
+                raise CommandError(f"Agent introuvable : {options['agent']}")
+            assignments = assignments.filter(property__agent=agent)
+
+        due_date = None
+        if options['due_date']:
+            try:
+                due_date = date.fromisoformat(options['due_date'])
+            except ValueError:
+                raise CommandError("Date invalide (format attendu : YYYY-MM-DD)")
+
+        summary = regularize_charges(
+            assignments,
+            options['year'],
+            due_date=due_date,
+            dry_run=options['dry_run']
+        )
+
+        prefix = "[simulation] " if options['dry_run'] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{summary['leases']} baux, {summary['regularized']} régularisations "
+            f"(à payer : {summary['total_due']:.2f} €, à rembourser : "
+            f"{summary['total_refund']:.2f} €), {summary['missing_statement']} sans décompte, "
+            f"{summary['already_regularized']} déjà régularisés"
+        ))
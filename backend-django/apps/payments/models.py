@@ -5,11 +5,46 @@ Gère les échéances, paiements et reçus.
 
 from django.db import models
 from django.conf import settings
+from apps.accounts.dashboard import invalidate_dashboards
+from apps.accounts.scoping import ScopedQuerySetMixin
 from apps.tenants.models import TenantAssignment
 from datetime import date
 import uuid
 
 
+class PaymentQuerySet(ScopedQuerySetMixin, models.QuerySet):
+    """
+    QuerySet des paiements.
+    
+    for_user : paiements des baux des biens de l'agent, ou du locataire.
+    
+    Les opérations en masse ne passent pas par save() ni par les signaux :
+    elles invalident elles-mêmes les tableaux de bord des baux concernés.
+    """
+    
+    agent_lookup = 'assignment__property__agent_id'
+    tenant_lookup = 'assignment__tenant_id'
+    
+    def update(self, **kwargs):
+        """Met à jour en masse et invalide les tableaux de bord concernés."""
+        assignment_ids = set(self.values_list('assignment_id', flat=True).distinct())
+        rows = super().update(**kwargs)
+        invalidate_dashboards(assignments=assignment_ids, using=self.db)
+        return rows
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        """Crée en masse et invalide les tableaux de bord des baux concernés."""
+        objs = super().bulk_create(objs, *args, **kwargs)
+        invalidate_dashboards(assignments={obj.assignment_id for obj in objs}, using=self.db)
+        return objs
+    
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        """Met à jour en masse et invalide les tableaux de bord des baux concernés."""
+        rows = super().bulk_update(objs, fields, *args, **kwargs)
+        invalidate_dashboards(assignments={obj.assignment_id for obj in objs}, using=self.db)
+        return rows
+
+
 class Payment(models.Model):
     """
     Modèle représentant un paiement de loyer.
@@ -21,9 +56,11 @@ class Payment(models.Model):
         assignment: Assignation locataire-bien concernée
         amount: Montant du paiement
         due_date: Date d'échéance du loyer
+        period: Mois couvert par un loyer, année d'une régularisation (1er janvier)
         payment_date: Date effective du paiement
         status: Statut du paiement (paid, pending, overdue)
         payment_method: Méthode de paiement utilisée
+        kind: Nature de l'échéance (loyer, dépôt de garantie)
         reference: Référence unique du paiement
         receipt_number: Numéro de reçu (généré après paiement)
         notes: Notes sur le paiement
@@ -35,6 +72,12 @@ class Payment(models.Model):
         PENDING = 'pending', 'En attente'
         OVERDUE = 'overdue', 'En retard'
     
+    class Kind(models.TextChoices):
+        """Énumération des natures d'échéance."""
+        RENT = 'rent', 'Loyer'
+        DEPOSIT = 'deposit', 'Dépôt de garantie'
+        REGULARIZATION = 'regularization', 'Régularisation des charges'
+    
     class PaymentMethod(models.TextChoices):
         """Énumération des méthodes de paiement."""
         BANK_TRANSFER = 'bank_transfer', 'Virement bancaire'
@@ -63,6 +106,12 @@ class Payment(models.Model):
         'Date d\'échéance',
         help_text="Date limite de paiement"
     )
+    period = models.DateField(
+        'Période',
+        null=True,
+        blank=True,
+        help_text="Mois du loyer (1er du mois) ou année de la régularisation (1er janvier)"
+    )
     payment_date = models.DateField(
         'Date de paiement',
         null=True,
@@ -70,6 +119,15 @@ class Payment(models.Model):
         help_text="Date effective du paiement"
     )
     
+    # Nature de l'échéance
+    kind = models.CharField(
+        'Nature',
+        max_length=20,
+        choices=Kind.choices,
+        default=Kind.RENT,
+        help_text="Loyer, dépôt de garantie ou régularisation des charges"
+    )
+    
     # Statut et méthode
     status = models.CharField(
         'Statut',
@@ -113,6 +171,8 @@ class Payment(models.Model):
     created_at = models.DateTimeField('Date de création', auto_now_add=True)
     updated_at = models.DateTimeField('Dernière modification', auto_now=True)
     
+    objects = PaymentQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Paiement'
         verbose_name_plural = 'Paiements'
@@ -123,6 +183,20 @@ class Payment(models.Model):
             models.Index(fields=['status', 'due_date']),
             models.Index(fields=['assignment', 'due_date']),
         ]
+        
+        # Un seul loyer par bail et par mois, une seule régularisation par an
+        constraints = [
+            models.UniqueConstraint(
+                fields=['assignment', 'period'],
+                condition=models.Q(kind='rent'),
+                name='unique_assignment_period'
+            ),
+            models.UniqueConstraint(
+                fields=['assignment', 'period'],
+                condition=models.Q(kind='regularization'),
+                name='unique_assignment_regularization'
+            ),
+        ]
     
     def __str__(self):
         """Représentation textuelle du paiement."""
@@ -0,0 +1,259 @@
+"""
+Régularisation annuelle des charges.
+
+Pour chaque bail ayant occupé un bien pendant l'année, les provisions sur
+charges facturées (part charges des loyers de l'année) sont comparées aux
+charges réelles du bien (ChargeStatement), au prorata des jours d'occupation.
+Le solde donne lieu à une échéance de régularisation (positive : complément
+dû par le locataire, négative : remboursement).
+
+Les données d'un portefeuille sont chargées en quelques requêtes, les soldes
+sont calculés sur des tableaux NumPy et les échéances insérées en masse.
+"""
+
+import calendar
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import Coalesce, TruncMonth
+
+from apps.properties.models import ChargeStatement
+from .models import Payment
+
+
+# Première année régularisable
+MIN_YEAR = 2000
+
+# Délai de paiement par défaut d'une régularisation (jours)
+DEFAULT_DUE_DELAY = 30
+
+# Nombre maximal de lignes détaillées retournées en simulation
+PREVIEW_LIMIT = 100
+
+# Nombre d'échéances insérées par requête
+DEFAULT_BATCH_SIZE = 1000
+
+
+def _regularized_ids(assignment_ids, period):
+    """Retourne les baux déjà régularisés pour une année (1 requête)."""
+    return set(
+        Payment.objects.filter(
+            assignment_id__in=assignment_ids,
+            kind=Payment.Kind.REGULARIZATION,
+            period=period
+        ).values_list('assignment_id', flat=True)
+    )
+
+
+def _totals(balances):
+    """Totaux dus et remboursés d'un ensemble de soldes."""
+    return {
+        'total_due': round(float(balances[balances > 0].sum()), 2),
+        'total_refund': round(abs(float(balances[balances < 0].sum())), 2),
+    }
+
+
+def _load(assignments, year):
+    """
+    Charge les baux, provisions facturées, décomptes et régularisations
+    existantes d'une année, en quatre requêtes.
+
+    Returns:
+        dict: Colonnes NumPy et correspondances par identifiant
+    """
+    year_start = date(year, 1, 1)
+    year_end = date(year, 12, 31)
+
+    leases = (
+        assignments
+        .filter(start_date__lte=year_end)
+        .exclude(end_date__lt=year_start)
+    )
+    lease_ids = leases.values('id')
+
+    rows = list(
+        leases.values_list(
+            'id', 'property_id', 'start_date', 'end_date',
+            'rent_amount', 'property__charges'
+        ).order_by('id')
+    )
+    billed = dict(
+        Payment.objects.filter(assignment_id__in=lease_ids, kind=Payment.Kind.RENT)
+        .annotate(month=Coalesce('period', TruncMonth('due_date')))
+        .filter(month__gte=year_start, month__lte=year_end)
+        .values('assignment_id')
+        .annotate(total=Sum('amount'))
+        .values_list('assignment_id', 'total')
+        .order_by()
+    )
+    statements = dict(
+        ChargeStatement.objects.filter(
+            year=year,
+            property_id__in=leases.values('property_id')
+        ).values_list('property_id', 'amount')
+    )
+    done = _regularized_ids(lease_ids, year_start)
+
+    count = len(rows)
+    end_ordinal = year_end.toordinal()
+    return {
+        'ids': np.fromiter((row[0] for row in rows), dtype=np.int64, count=count),
+        'property_ids': np.fromiter((row[1] for row in rows), dtype=np.int64, count=count),
+        'start': np.fromiter((row[2].toordinal() for row in rows), dtype=np.int64, count=count),
+        'end': np.fromiter(
+            (row[3].toordinal() if row[3] else end_ordinal for row in rows),
+            dtype=np.int64,
+            count=count
+        ),
+        'rent': np.fromiter((row[4] for row in rows), dtype=np.float64, count=count),
+        'charges': np.fromiter((row[5] for row in rows), dtype=np.float64, count=count),
+        'billed': np.fromiter(
+            (billed.get(row[0]) or 0 for row in rows), dtype=np.float64, count=count
+        ),
+        'actual': np.fromiter(
+            (statements.get(row[1], np.nan) for row in rows), dtype=np.float64, count=count
+        ),
+        'done': np.fromiter((row[0] in done for row in rows), dtype=bool, count=count),
+    }
+
+
+def compute_balances(data, year):
+    """
+    Calcule le solde de charges de chaque bail (calcul vectorisé).
+
+    - Jours occupés dans l'année : [max(début, 1er janvier), min(fin, 31 décembre)]
+    - Charges dues : charges réelles du bien × jours occupés / jours de l'année
+    - Provisions : loyers facturés × charges / (loyer + charges)
+
+    Returns:
+        dict: Colonnes calculées (jours, charges dues, provisions, solde)
+    """
+    year_start = date(year, 1, 1).toordinal()
+    year_end = date(year, 12, 31).toordinal()
+    days_in_year = 366 if calendar.isleap(year) else 365
+
+    occupied = np.clip(
+        np.minimum(data['end'], year_end) - np.maximum(data['start'], year_start) + 1,
+        0,
+        None
+    )
+    share = data['actual'] * occupied / days_in_year
+
+    monthly = data['rent'] + data['charges']
+    ratio = np.divide(
+        data['charges'], monthly,
+        out=np.zeros_like(monthly),
+        where=monthly > 0
+    )
+    provisions = data['billed'] * ratio
+    balance = np.round(share - provisions, 2)
+
+    return {
+        'occupied': occupied,
+        'due': np.round(share, 2),
+        'provisions': np.round(provisions, 2),
+        'balance': balance,
+    }
+
+
+def regularize_charges(assignments, year, due_date=None, dry_run=False,
+                       batch_size=DEFAULT_BATCH_SIZE, today=None):
+    """
+    Régularise les charges d'une année pour un portefeuille de baux.
+
+    Args:
+        assignments: QuerySet des baux du portefeuille (actifs ou terminés)
+        year: Année régularisée
+        due_date: Échéance des régularisations (dans 30 jours par défaut)
+        dry_run: Calcule sans rien enregistrer
+        batch_size: Nombre d'échéances insérées par requête
+        today: Date de référence
+
+    Returns:
+        dict: Résumé (baux, régularisations, totaux, baux ignorés, aperçu)
+    """
+    today = today or date.today()
+    due_date = due_date or today + timedelta(days=DEFAULT_DUE_DELAY)
+    period = date(year, 1, 1)
+
+    data = _load(assignments, year)
+    result = compute_balances(data, year)
+
+    has_statement = ~np.isnan(data['actual'])
+    eligible = (
+        has_statement
+        & ~data['done']
+        & (result['occupied'] > 0)
+        & (np.abs(result['balance']) >= 0.01)
+    )
+    indexes = np.flatnonzero(eligible)
+    balances = result['balance'][indexes]
+
+    summary = {
+        'year': year,
+        'dry_run': dry_run,
+        'leases': int(len(data['ids'])),
+        'regularized': int(len(indexes)),
+        **_totals(balances),
+        'missing_statement': int((~has_statement).sum()),
+        'already_regularized': int(data['done'].sum()),
+    }
+
+    if dry_run:
+        summary['preview'] = [
+            {
+                'assignment_id': int(data['ids'][index]),
+                'property_id': int(data['property_ids'][index]),
+                'occupied_days': int(result['occupied'][index]),
+                'charges_due': float(result['due'][index]),
+                'provisions': float(result['provisions'][index]),
+                'balance': float(result['balance'][index]),
+            }
+            for index in indexes[:PREVIEW_LIMIT].tolist()
+        ]
+        return summary
+
+    status = Payment.Status.OVERDUE if due_date < today else Payment.Status.PENDING
+    payments = [
+        Payment(
+            assignment_id=int(data['ids'][index]),
+            kind=Payment.Kind.REGULARIZATION,
+            period=period,
+            amount=Decimal(f"{result['balance'][index]:.2f}"),
+            due_date=due_date,
+            status=status,
+            notes=(
+                f"Régularisation des charges {year} : "
+                f"charges réelles {result['due'][index]:.2f} €, "
+                f"provisions {result['provisions'][index]:.2f} €"
+            )
+        )
+        for index in indexes.tolist()
+    ]
+    attempted = [payment.assignment_id for payment in payments]
+    with transaction.atomic():
+        # Verrou des baux (dans l'ordre des identifiants) : les régularisations
+        # concurrentes des mêmes baux sont sérialisées
+        list(
+            assignments.model.objects.select_for_update()
+            .filter(id__in=attempted).order_by('id').values_list('id')
+        )
+        existing = _regularized_ids(attempted, period)
+        # La contrainte unique_assignment_regularization écarte les doublons restants
+        Payment.objects.bulk_create(
+            [payment for payment in payments if payment.assignment_id not in existing],
+            batch_size=batch_size,
+            ignore_conflicts=True
+        )
+        # Relecture : seules les régularisations effectivement insérées sont comptées
+        inserted = (_regularized_ids(attempted, period) - existing) & set(attempted)
+
+    if len(inserted) != len(attempted):
+        written = np.isin(data['ids'][indexes], np.fromiter(inserted, dtype=np.int64))
+        summary['regularized'] = int(written.sum())
+        summary['already_regularized'] += len(attempted) - summary['regularized']
+        summary.update(_totals(balances[written]))
+    return summary
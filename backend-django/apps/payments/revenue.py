@@ -0,0 +1,153 @@
+"""
+Séries temporelles de revenus (montants facturés et encaissés par mois).
+
+Tous les mois d'une période sont calculés en une seule requête agrégée,
+groupée par mois (date_trunc) et, si demandé, par bien ou par agent.
+"""
+
+import hashlib
+import json
+from datetime import date
+
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import TruncMonth
+
+from .models import Payment
+
+
+# Nombre maximal de mois par requête
+MAX_MONTHS = 120
+
+# Regroupements disponibles : champs ajoutés au GROUP BY
+GROUPINGS = {
+    'month': [],
+    'property': ['assignment__property_id', 'assignment__property__name'],
+    'agent': ['assignment__property__agent_id'],
+}
+
+
+def parse_month(value):
+    """
+    Convertit "YYYY-MM" en date (premier jour du mois).
+
+    Raises:
+        ValueError: Si le format est invalide
+    """
+    year, month = value.split('-')
+    return date(int(year), int(month), 1)
+
+
+def add_months(month, count):
+    """Ajoute un nombre de mois à une date de début de mois."""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_range(start, end):
+    """Retourne la liste des mois de start à end inclus."""
+    months = []
+    current = start
+    while current <= end:
+        months.append(current)
+        current = add_months(current, 1)
+    return months
+
+
+def is_closed(end, today=None):
+    """Une période est close si elle se termine avant le mois en cours."""
+    today = today or date.today()
+    return end < today.replace(day=1)
+
+
+def compute_etag(*parts):
+    """Calcule une empreinte stable à partir des paramètres fournis."""
+    payload = json.dumps(parts, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha1(payload).hexdigest()
+
+
+def data_version(queryset, start, end, group_by='month'):
+    """
+    Retourne la version des paiements d'une période (1 requête).
+
+    Change avec tout ajout, suppression ou modification d'un paiement de la
+    période, y compris par une mise à jour en masse (qui ne touche pas
+    updated_at) de son statut ou de son montant.
+    """
+    aggregates = {
+        'count': Count('id'),
+        'updated': Max('updated_at'),
+        'billed': Sum('amount'),
+        'paid': Count('id', filter=Q(status=Payment.Status.PAID)),
+        'collected': Sum('amount', filter=Q(status=Payment.Status.PAID)),
+    }
+    if group_by == 'property':
+        # Nom du bien repris dans la série
+        aggregates['property_updated'] = Max('assignment__property__updated_at')
+    return queryset.filter(
+        due_date__gte=start, due_date__lt=add_months(end, 1)
+    ).aggregate(**aggregates)
+
+
+def _empty_point(month):
+    return {'month': month.strftime('%Y-%m'), 'billed': 0.0, 'collected': 0.0, 'count': 0}
+
+
+def revenue_series(queryset, start, end, group_by='month'):
+    """
+    Calcule les montants facturés et encaissés par mois.
+
+    Args:
+        queryset: Paiements accessibles (déjà restreints selon le rôle)
+        start: Premier mois (date au premier jour)
+        end: Dernier mois inclus (date au premier jour)
+        group_by: 'month', 'property' ou 'agent'
+
+    Returns:
+        list: Séries complètes (les mois sans paiement valent zéro)
+    """
+    group_fields = GROUPINGS[group_by]
+    rows = (
+        queryset
+        .filter(due_date__gte=start, due_date__lt=add_months(end, 1))
+        .annotate(month=TruncMonth('due_date'))
+        .values('month', *group_fields)
+        .annotate(
+            billed=Sum('amount'),
+            collected=Sum('amount', filter=Q(status=Payment.Status.PAID)),
+            count=Count('id'),
+        )
+        .order_by()
+    )
+
+    months = month_range(start, end)
+    series = {}
+    for row in rows:
+        key = tuple(row[field] for field in group_fields)
+        if key not in series:
+            series[key] = {month: _empty_point(month) for month in months}
+        month = row['month']
+        if hasattr(month, 'date'):
+            month = month.date()
+        series[key][month] = {
+            'month': month.strftime('%Y-%m'),
+            'billed': float(row['billed'] or 0),
+            'collected': float(row['collected'] or 0),
+            'count': row['count'],
+        }
+
+    if group_by == 'month':
+        points = series.get((), {month: _empty_point(month) for month in months})
+        return [{'points': list(points.values())}]
+
+    results = []
+    for key, points in series.items():
+        if group_by == 'property':
+            entry = {'property_id': key[0], 'property_name': key[1]}
+        else:
+            entry = {'agent_id': key[0]}
+        entry['points'] = list(points.values())
+        results.append(entry)
+    results.sort(key=lambda entry: tuple(
+        value for name, value in entry.items() if name != 'points'
+    ))
+    return results
@@ -0,0 +1,211 @@
+"""
+Génération des échéanciers de loyer.
+
+Les loyers sont générés mois par mois sur un horizon donné pour un ensemble
+de baux. Le premier et le dernier mois sont calculés au prorata des jours
+occupés (start_date / end_date). Seuls les couples (bail, période) absents
+sont insérés, en masse, sous verrou des baux du lot ; la contrainte
+unique_assignment_period garantit l'absence de doublons en cas d'écritures
+concurrentes, et seuls les loyers effectivement insérés sont comptés.
+"""
+
+import calendar
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import transaction
+from django.db.models.functions import Coalesce, TruncMonth
+
+from .models import Payment
+from .revenue import add_months
+
+
+# Jour d'échéance par défaut
+DEFAULT_DUE_DAY = 5
+
+# Horizon maximal d'une génération (mois)
+MAX_MONTHS = 24
+
+# Nombre de baux traités par lot
+DEFAULT_BATCH_SIZE = 500
+
+CENT = Decimal('0.01')
+
+
+def days_in_month(month):
+    """Retourne le nombre de jours du mois."""
+    return calendar.monthrange(month.year, month.month)[1]
+
+
+def due_date_for(month, day):
+    """
+    Retourne la date d'échéance d'un mois.
+
+    Un jour supérieur à la longueur du mois correspond au dernier jour
+    (31 → 28/29 février, 30 avril...).
+    """
+    return month.replace(day=min(day, days_in_month(month)))
+
+
+def prorated_amount(monthly_amount, month, start_date, end_date=None):
+    """
+    Calcule le montant dû pour un mois au prorata des jours occupés.
+
+    Args:
+        monthly_amount: Montant mensuel (loyer + charges)
+        month: Premier jour du mois
+        start_date: Début du bail
+        end_date: Fin du bail (incluse), None si indéterminée
+
+    Returns:
+        Decimal: Montant arrondi au centime (0 si le bail ne couvre pas le mois)
+    """
+    length = days_in_month(month)
+    first = max(month, start_date)
+    last = month.replace(day=length)
+    if end_date is not None:
+        last = min(last, end_date)
+    occupied = (last - first).days + 1
+    if occupied <= 0:
+        return Decimal('0.00')
+    if occupied == length:
+        return Decimal(monthly_amount).quantize(CENT)
+    return (Decimal(monthly_amount) * occupied / length).quantize(CENT, ROUND_HALF_UP)
+
+
+def lease_schedule(lease, first_month, months, day=DEFAULT_DUE_DAY, today=None):
+    """
+    Construit les loyers d'un bail sur un horizon (instances non enregistrées).
+
+    Args:
+        lease: Tuple (id, start_date, end_date, rent_amount, charges)
+        first_month: Premier mois de l'horizon (premier jour)
+        months: Nombre de mois
+        day: Jour d'échéance
+        today: Date de référence pour le statut en retard
+
+    Returns:
+        list: Instances de Payment (une par mois couvert par le bail)
+    """
+    today = today or date.today()
+    assignment_id, start_date, end_date, rent_amount, charges = lease
+    monthly_amount = rent_amount + charges
+
+    payments = []
+    for index in range(months):
+        month = add_months(first_month, index)
+        amount = prorated_amount(monthly_amount, month, start_date, end_date)
+        if amount <= 0:
+            continue
+
+        # Le premier loyer est exigible au plus tôt à l'entrée dans les lieux
+        due_date = max(due_date_for(month, day), start_date)
+        prorated = amount != Decimal(monthly_amount).quantize(CENT)
+        notes = f"Loyer {month.strftime('%m/%Y')}"
+        if prorated:
+            notes += " (prorata)"
+
+        payments.append(Payment(
+            assignment_id=assignment_id,
+            kind=Payment.Kind.RENT,
+            period=month,
+            amount=amount,
+            due_date=due_date,
+            # bulk_create ne passe pas par Payment.save() : statut calculé ici
+            status=Payment.Status.OVERDUE if due_date < today else Payment.Status.PENDING,
+            notes=notes
+        ))
+    return payments
+
+
+def existing_periods(assignment_ids, first_month, last_month):
+    """
+    Retourne les couples (bail, période) déjà facturés, en une requête.
+
+    Les loyers antérieurs au champ period sont rattachés au mois de leur
+    échéance.
+    """
+    return set(
+        Payment.objects.filter(
+            assignment_id__in=assignment_ids,
+            kind=Payment.Kind.RENT
+        )
+        .annotate(month=Coalesce('period', TruncMonth('due_date')))
+        .filter(month__gte=first_month, month__lte=last_month)
+        .values_list('assignment_id', 'month')
+        .order_by()
+    )
+
+
+def generate_schedule(assignments, first_month, months=1, day=DEFAULT_DUE_DAY,
+                      batch_size=DEFAULT_BATCH_SIZE, today=None):
+    """
+    Génère les loyers manquants d'un ensemble de baux sur un horizon.
+
+    Args:
+        assignments: QuerySet des baux concernés
+        first_month: Premier mois de l'horizon (premier jour)
+        months: Nombre de mois
+        day: Jour d'échéance (1 à 31)
+        batch_size: Nombre de baux traités par lot
+        today: Date de référence pour le statut en retard
+
+    Returns:
+        dict: Nombre de loyers créés et de loyers déjà existants (y compris
+        ceux insérés par une génération concurrente)
+    """
+    last_month = add_months(first_month, months - 1)
+    period_end = last_month.replace(day=days_in_month(last_month))
+
+    # Seuls les baux qui couvrent au moins un jour de l'horizon
+    leases = (
+        assignments
+        .filter(start_date__lte=period_end)
+        .exclude(end_date__lt=first_month)
+        .values_list('id', 'start_date', 'end_date', 'rent_amount', 'property__charges')
+        .order_by('id')
+    )
+
+    created = 0
+    skipped = 0
+    batch = []
+
+    def flush():
+        nonlocal created, skipped
+        assignment_ids = [lease[0] for lease in batch]
+        with transaction.atomic():
+            # Verrou des baux du lot (dans l'ordre des identifiants) : les
+            # générations concurrentes sur les mêmes baux sont sérialisées
+            list(
+                assignments.model.objects.select_for_update()
+                .filter(id__in=assignment_ids).order_by('id').values_list('id')
+            )
+            existing = existing_periods(assignment_ids, first_month, last_month)
+            payments = []
+            for lease in batch:
+                for payment in lease_schedule(lease, first_month, months, day, today):
+                    if (payment.assignment_id, payment.period) in existing:
+                        skipped += 1
+                    else:
+                        payments.append(payment)
+            if not payments:
+                return
+            Payment.objects.bulk_create(payments, ignore_conflicts=True)
+            # Les conflits ignorés par bulk_create ne sont pas comptés :
+            # relecture des couples (bail, période) effectivement insérés
+            keys = {(payment.assignment_id, payment.period) for payment in payments}
+            inserted = len(
+                (existing_periods(assignment_ids, first_month, last_month) - existing) & keys
+            )
+        created += inserted
+        skipped += len(payments) - inserted
+
+    for lease in leases.iterator(chunk_size=batch_size):
+        batch.append(lease)
+        if len(batch) >= batch_size:
+            flush()
+            batch = []
+    if batch:
+        flush()
+
+    return {'created': created, 'skipped': skipped}
@@ -5,6 +5,7 @@ Gère la conversion des paiements en JSON.
 
 from rest_framework import serializers
 from .models import Payment, PaymentReminder
+from apps.tenants.models import TenantAssignment
 from apps.tenants.serializers import TenantAssignmentSerializer
 from apps.accounts.serializers import UserSerializer
 
@@ -32,7 +33,7 @@ class PaymentSerializer(serializers.ModelSerializer):
         model = Payment
         fields = [
             'id', 'assignment', 'tenant_name', 'property_name', 'property_address',
-            'amount', 'due_date', 'payment_date',
+            'kind', 'amount', 'due_date', 'payment_date',
             'status', 'status_display', 'is_late',
             'payment_method', 'payment_method_display',
             'reference', 'receipt_number', 'notes',
@@ -60,7 +61,15 @@ class PaymentCreateSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Payment
-        fields = ['assignment', 'amount', 'due_date', 'notes']
+        fields = ['assignment', 'kind', 'amount', 'due_date', 'notes']
+    
+    def get_fields(self):
+        """Limite les assignations sélectionnables au périmètre de l'utilisateur."""
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is not None:
+            fields['assignment'].queryset = TenantAssignment.objects.for_user(request.user)
+        return fields
     
     def validate_assignment(self, value):
         """Vérifie que l'assignation est active."""
@@ -114,7 +123,7 @@ class PaymentListSerializer(serializers.ModelSerializer):
         model = Payment
         fields = [
             'id', 'tenant_name', 'property_name',
-            'amount', 'due_date', 'payment_date',
+            'kind', 'amount', 'due_date', 'payment_date',
             'status', 'status_display', 'is_late', 'reference'
         ]
     
@@ -137,7 +146,7 @@ class TenantPaymentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Payment
         fields = [
-            'id', 'property_name', 'amount',
+            'id', 'property_name', 'kind', 'amount',
             'due_date', 'payment_date',
             'status', 'status_display',
             'receipt_number', 'can_download_receipt'
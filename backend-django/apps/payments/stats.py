@@ -0,0 +1,27 @@
+"""
+Statistiques de paiement d'un mois (nombre et montants par statut, taux
+d'encaissement).
+
+Utilisées par /api/payments/stats/ et par la section payments du tableau de
+bord composite (apps.accounts.overview).
+"""
+
+from django.db.models import Count, Q, Sum
+
+
+def payment_stats(payments, year, month):
+    """Statistiques de paiement d'un mois (1 requête)."""
+    stats = payments.filter(due_date__year=year, due_date__month=month).aggregate(
+        total_payments=Count('id'),
+        paid_count=Count('id', filter=Q(status='paid')),
+        pending_count=Count('id', filter=Q(status='pending')),
+        overdue_count=Count('id', filter=Q(status='overdue')),
+        total_collected=Sum('amount', filter=Q(status='paid')),
+        total_pending=Sum('amount', filter=~Q(status='paid'))
+    )
+    total = stats['total_payments'] or 0
+    paid = stats['paid_count'] or 0
+    stats['collection_rate'] = round(paid / total * 100, 2) if total > 0 else 0
+    stats['total_collected'] = float(stats['total_collected'] or 0)
+    stats['total_pending'] = float(stats['total_pending'] or 0)
+    return stats
@@ -0,0 +1,137 @@
+"""
+Tests de l'application payments.
+
+ETag des séries de revenus d'une période close : il change avec les
+paiements de la période (encaissement, ajout). Régularisation des charges :
+seules les échéances effectivement insérées sont comptées.
+"""
+
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.properties.models import ChargeStatement, Property
+from apps.tenants.models import TenantAssignment
+from . import regularization
+from .models import Payment
+
+User = get_user_model()
+
+
+class RevenueETagTests(APITestCase):
+    """ETag des périodes closes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = User.objects.create_user(
+            email='agent@test.local', password='test', first_name='Agent',
+            last_name='Test', role='agent'
+        )
+        tenant = User.objects.create_user(
+            email='tenant@test.local', password='test', first_name='Locataire',
+            last_name='Test', role='tenant'
+        )
+        prop = Property.objects.create(
+            name='Bien A', address='1 rue A', city='Paris', postal_code='75001',
+            monthly_rent=800, agent=cls.agent
+        )
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.assignment = TenantAssignment.objects.create(
+                tenant=tenant, property=prop, agent=cls.agent,
+                start_date=date(2020, 1, 1), rent_amount=800
+            )
+        cls.payment = Payment.objects.create(
+            assignment=cls.assignment, amount=800, due_date=date(2020, 2, 5), kind='rent'
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.agent)
+        self.url = reverse('payments:revenue_series') + '?from=2020-01&to=2020-12'
+
+    def get_etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+        return response['ETag']
+
+    def test_unchanged_period_is_not_modified(self):
+        etag = self.get_etag()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_when_old_payment_is_paid(self):
+        etag = self.get_etag()
+        Payment.objects.filter(pk=self.payment.pk).update(
+            status=Payment.Status.PAID, payment_date=date(2020, 2, 6)
+        )
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_changes_when_past_payment_is_added(self):
+        etag = self.get_etag()
+        Payment.objects.create(
+            assignment=self.assignment, amount=800, due_date=date(2020, 3, 5), kind='rent'
+        )
+        self.assertNotEqual(self.get_etag(), etag)
+
+
+class RegularizationCountTests(APITestCase):
+    """Nombre de régularisations rapporté après insertion."""
+
+    @classmethod
+    def setUpTestData(cls):
+        agent = User.objects.create_user(
+            email='agent@test.local', password='test', first_name='Agent',
+            last_name='Test', role='agent'
+        )
+        prop = Property.objects.create(
+            name='Bien A', address='1 rue A', city='Paris', postal_code='75001',
+            monthly_rent=800, charges=100, agent=agent
+        )
+        with cls.captureOnCommitCallbacks(execute=True):
+            for index in range(2):
+                tenant = User.objects.create_user(
+                    email=f'tenant{index}@test.local', password='test',
+                    first_name='Locataire', last_name=str(index), role='tenant'
+                )
+                TenantAssignment.objects.create(
+                    tenant=tenant, property=prop, agent=agent,
+                    start_date=date(2023, 1, 1), rent_amount=800, is_active=index == 0
+                )
+        ChargeStatement.objects.create(property=prop, year=2023, amount=1500)
+        cls.assignments = TenantAssignment.objects.all()
+
+    def regularize(self):
+        return regularization.regularize_charges(
+            self.assignments, 2023, due_date=date(2024, 3, 31), today=date(2024, 3, 1)
+        )
+
+    def test_rerun_reports_already_regularized(self):
+        first = self.regularize()
+        self.assertEqual(first['regularized'], 2)
+        second = self.regularize()
+        self.assertEqual(second['regularized'], 0)
+        self.assertEqual(second['already_regularized'], 2)
+
+    def test_concurrent_run_counts_only_inserted_rows(self):
+        self.regularize()
+        regularized_ids = regularization._regularized_ids
+        calls = []
+
+        def stale_on_load(*args):
+            # Lecture de _load antérieure à la validation de l'autre exécution
+            calls.append(args)
+            return set() if len(calls) == 1 else regularized_ids(*args)
+
+        with mock.patch.object(regularization, '_regularized_ids', stale_on_load):
+            summary = self.regularize()
+
+        self.assertEqual(summary['regularized'], 0)
+        self.assertEqual(summary['already_regularized'], 2)
+        self.assertEqual(summary['total_due'], 0)
+        self.assertEqual(summary['total_refund'], 0)
+        self.assertEqual(Payment.objects.filter(kind='regularization').count(), 2)
@@ -10,7 +10,9 @@ from .views import (
     PaymentDetailView,
     RecordPaymentView,
     GenerateMonthlyPaymentsView,
+    ChargeRegularizationView,
     PaymentStatsView,
+    RevenueTimeSeriesView,
     MyPaymentsView,
     MyCurrentPaymentView,
     MakePaymentView,
@@ -43,10 +45,18 @@ urlpatterns = [
     # Générer les échéances mensuelles
     path('generate-monthly/', GenerateMonthlyPaymentsView.as_view(), name='generate_monthly'),
     
+    # POST /api/payments/regularization/
+    # Régularisation annuelle des charges (simulation possible)
+    path('regularization/', ChargeRegularizationView.as_view(), name='charge_regularization'),
+    
     # GET /api/payments/stats/
     # Statistiques de paiement
     path('stats/', PaymentStatsView.as_view(), name='payment_stats'),
     
+    # GET /api/payments/revenue/
+    # Revenus facturés et encaissés par mois (par bien ou par agent)
+    path('revenue/', RevenueTimeSeriesView.as_view(), name='revenue_series'),
+    
     # ==========================================================================
     # INTERFACE LOCATAIRE
     # ==========================================================================
@@ -6,11 +6,24 @@ Fournit les endpoints pour gérer les échéances et paiements de loyer.
 from rest_framework import generics, status, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.db.models import Sum, Count, Q
 from django.utils import timezone
-from datetime import date, timedelta
+from django.utils.http import parse_etags, quote_etag
+from datetime import date
 
 from .models import Payment
+from .revenue import (
+    GROUPINGS,
+    MAX_MONTHS,
+    add_months,
+    compute_etag,
+    data_version,
+    is_closed,
+    parse_month,
+    revenue_series,
+)
+from .regularization import MIN_YEAR, regularize_charges
+from .schedule import DEFAULT_DUE_DAY, generate_schedule
+from .schedule import MAX_MONTHS as SCHEDULE_MAX_MONTHS
 from .serializers import (
     PaymentSerializer,
     PaymentCreateSerializer,
@@ -19,6 +32,7 @@ from .serializers import (
     TenantPaymentSerializer,
     PaymentStatsSerializer,
 )
+from .stats import payment_stats
 from apps.accounts.permissions import IsAdminOrAgent, IsTenant
 from apps.tenants.models import TenantAssignment
 
@@ -41,15 +55,7 @@ class PaymentListView(generics.ListAPIView):
     
     def get_queryset(self):
         """Retourne les paiements selon le rôle."""
-        user = self.request.user
-        
-        if user.role == 'admin':
-            queryset = Payment.objects.all()
-        else:
-            # Agent : paiements de ses biens
-            queryset = Payment.objects.filter(
-                assignment__property__agent=user
-            )
+        queryset = Payment.objects.for_user(self.request.user)
         
         # Filtres
         params = self.request.query_params
@@ -117,11 +123,7 @@ class PaymentDetailView(generics.RetrieveUpdateAPIView):
     permission_classes = [IsAdminOrAgent]
     
     def get_queryset(self):
-        user = self.request.user
-        
-        if user.role == 'admin':
-            return Payment.objects.all()
-        return Payment.objects.filter(assignment__property__agent=user)
+        return Payment.objects.for_user(self.request.user)
     
     def get_serializer_class(self):
         if self.request.method in ['PUT', 'PATCH']:
@@ -150,13 +152,7 @@ class RecordPaymentView(APIView):
     def post(self, request, pk):
         """Enregistre le paiement."""
         try:
-            if request.user.role == 'admin':
-                payment = Payment.objects.get(pk=pk)
-            else:
-                payment = Payment.objects.get(
-                    pk=pk,
-                    assignment__property__agent=request.user
-                )
+            payment = Payment.objects.for_user(request.user).get(pk=pk)
         except Payment.DoesNotExist:
             return Response(
                 {'error': 'Paiement non trouvé'},
@@ -182,13 +178,15 @@ class GenerateMonthlyPaymentsView(APIView):
     
     POST /api/payments/generate-monthly/
     
-    Génère automatiquement les paiements pour tous les baux actifs
-    pour le mois suivant.
+    Génère les loyers de tous les baux actifs sur un ou plusieurs mois
+    (mois suivant par défaut). Le premier et le dernier mois d'un bail sont
+    calculés au prorata ; les mois déjà générés sont ignorés.
     
     Request body (optionnel):
         {
-            "month": "2024-03",  // Mois cible (défaut: mois suivant)
-            "day": 5             // Jour d'échéance (défaut: 5)
+            "month": "2024-03",  // Premier mois (défaut: mois suivant)
+            "months": 12,        // Nombre de mois (défaut: 1, max: 24)
+            "day": 5             // Jour d'échéance, 31 = fin de mois (défaut: 5)
         }
     """
     
@@ -199,64 +197,112 @@ class GenerateMonthlyPaymentsView(APIView):
         user = request.user
         
         # Récupérer les paramètres
-        today = date.today()
-        default_month = today.replace(day=1) + timedelta(days=32)
-        default_month = default_month.replace(day=1)
+        default_month = add_months(date.today().replace(day=1), 1)
         
         month_str = request.data.get('month')
         if month_str:
             try:
-                year, month = month_str.split('-')
-                target_date = date(int(year), int(month), 1)
+                target_date = parse_month(month_str)
             except ValueError:
                 target_date = default_month
         else:
             target_date = default_month
         
-        day = int(request.data.get('day', 5))
-        due_date = target_date.replace(day=min(day, 28))  # Éviter les problèmes de février
+        try:
+            day = int(request.data.get('day', DEFAULT_DUE_DAY))
+            months = int(request.data.get('months', 1))
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'Les paramètres day et months doivent être des entiers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not 1 <= day <= 31 or not 1 <= months <= SCHEDULE_MAX_MONTHS:
+            return Response(
+                {'error': f'day doit être entre 1 et 31, months entre 1 et {SCHEDULE_MAX_MONTHS}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
         # Récupérer les assignations actives
-        if user.role == 'admin':
-            assignments = TenantAssignment.objects.filter(is_active=True)
-        else:
-            assignments = TenantAssignment.objects.filter(
-                is_active=True,
-                property__agent=user
-            )
+        assignments = TenantAssignment.objects.for_user(user).filter(is_active=True)
         
-        created_count = 0
-        skipped_count = 0
-        
-        for assignment in assignments:
-            # Vérifier si le paiement existe déjà pour ce mois
-            existing = Payment.objects.filter(
-                assignment=assignment,
-                due_date__year=due_date.year,
-                due_date__month=due_date.month
-            ).exists()
-            
-            if existing:
-                skipped_count += 1
-                continue
-            
-            # Créer le paiement
-            Payment.objects.create(
-                assignment=assignment,
-                amount=assignment.rent_amount + assignment.property.charges,
-                due_date=due_date,
-                notes=f"Loyer {due_date.strftime('%B %Y')}"
-            )
-            created_count += 1
+        result = generate_schedule(assignments, target_date, months=months, day=day)
         
         return Response({
-            'message': f'Génération terminée',
-            'created': created_count,
-            'skipped': skipped_count,
-            'due_date': due_date.isoformat()
+            'message': 'Génération terminée',
+            'created': result['created'],
+            'skipped': result['skipped'],
+            'from': target_date.strftime('%Y-%m'),
+            'to': add_months(target_date, months - 1).strftime('%Y-%m'),
         })
 
 
+class ChargeRegularizationView(APIView):
+    """
+    Endpoint de régularisation annuelle des charges.
+    
+    POST /api/payments/regularization/
+    
+    Compare, pour chaque bail ayant occupé un bien dans l'année, les
+    provisions sur charges facturées aux charges réelles du bien (décompte
+    annuel), au prorata des jours d'occupation, et crée une échéance de
+    régularisation par bail (négative en cas de remboursement).
+    
+    Request body:
+        {
+            "year": 2024,
+            "due_date": "2025-03-31",  // optionnel (dans 30 jours par défaut)
+            "dry_run": true            // optionnel, calcule sans enregistrer
+        }
+    
+    Response:
+        {
+            "year": 2024,
+            "dry_run": true,
+            "leases": 120,
+            "regularized": 97,
+            "total_due": 5320.18,
+            "total_refund": 1204.50,
+            "missing_statement": 12,
+            "already_regularized": 0,
+            "preview": [...]
+        }
+    """
+    
+    permission_classes = [IsAdminOrAgent]
+    
+    def post(self, request):
+        """Calcule et enregistre (ou simule) les régularisations."""
+        user = request.user
+        
+        try:
+            year = int(request.data.get('year'))
+            due_date = request.data.get('due_date')
+            due_date = date.fromisoformat(due_date) if due_date else None
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'Paramètres invalides (year : YYYY, due_date : YYYY-MM-DD)'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if year >= date.today().year:
+            return Response(
+                {'error': 'Seule une année close peut être régularisée'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if year < MIN_YEAR:
+            return Response(
+                {'error': f'Année invalide (à partir de {MIN_YEAR})'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true')
+        
+        assignments = TenantAssignment.objects.for_user(user)
+        
+        return Response(regularize_charges(
+            assignments, year, due_date=due_date, dry_run=dry_run
+        ))
+
+
 class PaymentStatsView(APIView):
     """
     Endpoint pour les statistiques de paiement.
@@ -288,40 +334,135 @@ class PaymentStatsView(APIView):
             target_year = today.year
             target_month = today.month
         
-        # Base queryset
-        if user.role == 'admin':
-            queryset = Payment.objects.all()
-        else:
-            queryset = Payment.objects.filter(
-                assignment__property__agent=user
+        # Statistiques du mois sur les paiements accessibles
+        stats = payment_stats(Payment.objects.for_user(user), target_year, target_month)
+        
+        return Response(stats)
+
+
+class RevenueTimeSeriesView(APIView):
+    """
+    Endpoint pour la série mensuelle des revenus facturés et encaissés.
+    
+    GET /api/payments/revenue/
+    
+    Tous les mois de la période sont calculés en une seule requête.
+    Pour une période close (antérieure au mois en cours), l'ETag est calculé
+    sur les paramètres et la version des données de la période (une requête
+    agrégée) : un If-None-Match correspondant renvoie 304 sans calculer la
+    série.
+    
+    Query params:
+        - from: Premier mois (YYYY-MM, défaut: 11 mois avant le mois en cours)
+        - to: Dernier mois inclus (YYYY-MM, défaut: mois en cours)
+        - group_by: month (défaut), property ou agent (admin)
+        - property_id: Restreindre à un bien
+        - agent_id: Restreindre à un agent (admin)
+    
+    Response:
+        {
+            "from": "2024-01",
+            "to": "2024-12",
+            "group_by": "property",
+            "series": [
+                {
+                    "property_id": 3,
+                    "property_name": "Appartement Haussmann",
+                    "points": [
+                        {"month": "2024-01", "billed": 1650.0, "collected": 1650.0, "count": 1},
+                        ...
+                    ]
+                }
+            ]
+        }
+    """
+    
+    permission_classes = [IsAdminOrAgent]
+    
+    def get(self, request):
+        """Retourne la série de revenus."""
+        user = request.user
+        params = request.query_params
+        current_month = date.today().replace(day=1)
+        
+        try:
+            end = parse_month(params['to']) if params.get('to') else current_month
+            start = parse_month(params['from']) if params.get('from') else add_months(end, -11)
+        except ValueError:
+            return Response(
+                {'error': 'Format de mois invalide (YYYY-MM attendu)'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if start > end or add_months(start, MAX_MONTHS) <= end:
+            return Response(
+                {'error': f'Période invalide (1 à {MAX_MONTHS} mois)'},
+                status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Filtrer par mois
-        queryset = queryset.filter(
-            due_date__year=target_year,
-            due_date__month=target_month
-        )
+        group_by = params.get('group_by', 'month')
+        if group_by not in GROUPINGS or (group_by == 'agent' and user.role != 'admin'):
+            return Response(
+                {'error': 'Regroupement non supporté'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # Calculer les statistiques
-        stats = queryset.aggregate(
-            total_payments=Count('id'),
-            paid_count=Count('id', filter=Q(status='paid')),
-            pending_count=Count('id', filter=Q(status='pending')),
-            overdue_count=Count('id', filter=Q(status='overdue')),
-            total_collected=Sum('amount', filter=Q(status='paid')),
-            total_pending=Sum('amount', filter=~Q(status='paid'))
-        )
+        try:
+            property_id = int(params['property_id']) if params.get('property_id') else None
+            agent_id = (
+                int(params['agent_id'])
+                if params.get('agent_id') and user.role == 'admin' else None
+            )
+        except ValueError:
+            return Response(
+                {'error': 'Identifiant invalide (property_id, agent_id : entiers)'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # Calculer le taux de recouvrement
-        total = stats['total_payments'] or 0
-        paid = stats['paid_count'] or 0
-        collection_rate = (paid / total * 100) if total > 0 else 0
+        queryset = Payment.objects.for_user(user)
+        if property_id is not None:
+            queryset = queryset.filter(assignment__property_id=property_id)
+        if agent_id is not None:
+            queryset = queryset.filter(assignment__property__agent_id=agent_id)
         
-        stats['collection_rate'] = round(collection_rate, 2)
-        stats['total_collected'] = float(stats['total_collected'] or 0)
-        stats['total_pending'] = float(stats['total_pending'] or 0)
+        # Période close : ETag calculé sur les paramètres et la version des
+        # données (un paiement ancien peut encore être encaissé ou ajouté)
+        etag = None
+        if is_closed(end):
+            scope = 'all' if user.role == 'admin' else f'agent-{user.pk}'
+            etag = quote_etag(compute_etag(
+                scope, start, end, group_by, property_id, agent_id,
+                data_version(queryset, start, end, group_by)
+            ))
+            if etag in parse_etags(request.headers.get('If-None-Match', '')):
+                return self._not_modified(etag)
         
-        return Response(stats)
+        data = {
+            'from': start.strftime('%Y-%m'),
+            'to': end.strftime('%Y-%m'),
+            'group_by': group_by,
+            'series': revenue_series(queryset, start, end, group_by),
+        }
+        
+        # Période en cours : ETag calculé sur le contenu
+        if etag is None:
+            etag = quote_etag(compute_etag(data))
+            if etag in parse_etags(request.headers.get('If-None-Match', '')):
+                return self._not_modified(etag)
+        
+        response = Response(data)
+        self._set_cache_headers(response, etag)
+        return response
+    
+    def _not_modified(self, etag):
+        """Réponse 304 avec les mêmes en-têtes de cache."""
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        self._set_cache_headers(response, etag)
+        return response
+    
+    def _set_cache_headers(self, response, etag):
+        """Ajoute ETag et Cache-Control (revalidation à chaque requête)."""
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
 
 
 # =============================================================================
@@ -342,9 +483,7 @@ class MyPaymentsView(generics.ListAPIView):
     
     def get_queryset(self):
         """Retourne les paiements du locataire connecté."""
-        return Payment.objects.filter(
-            assignment__tenant=self.request.user
-        ).select_related(
+        return Payment.objects.for_user(self.request.user).select_related(
             'assignment__property'
         ).order_by('-due_date')
 
@@ -362,8 +501,7 @@ class MyCurrentPaymentView(APIView):
     
     def get(self, request):
         """Retourne le paiement courant."""
-        payment = Payment.objects.filter(
-            assignment__tenant=request.user,
+        payment = Payment.objects.for_user(request.user).filter(
             status__in=['pending', 'overdue']
         ).select_related(
             'assignment__property'
@@ -397,10 +535,7 @@ class MakePaymentView(APIView):
     def post(self, request, pk):
         """Enregistre le paiement par le locataire."""
         try:
-            payment = Payment.objects.get(
-                pk=pk,
-                assignment__tenant=request.user
-            )
+            payment = Payment.objects.for_user(request.user).get(pk=pk)
         except Payment.DoesNotExist:
             return Response(
                 {'error': 'Paiement non trouvé'},
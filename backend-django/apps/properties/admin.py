@@ -3,7 +3,16 @@ Configuration de l'interface d'administration Django pour les biens.
 """
 
 from django.contrib import admin
-from .models import Property
+from .models import ChargeStatement, Property, PhotoAsset, PropertyPhoto
+
+
+class PropertyPhotoInline(admin.TabularInline):
+    """Photos affichées dans la fiche d'un bien."""
+    
+    model = PropertyPhoto
+    extra = 0
+    fields = ['asset', 'position']
+    raw_id_fields = ['asset']
 
 
 @admin.register(Property)
@@ -12,6 +21,8 @@ class PropertyAdmin(admin.ModelAdmin):
     Configuration de l'admin pour le modèle Property.
     """
     
+    inlines = [PropertyPhotoInline]
+    
     # Colonnes affichées dans la liste
     list_display = [
         'name', 'city', 'property_type', 'monthly_rent',
@@ -52,3 +63,27 @@ class PropertyAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+
+@admin.register(PhotoAsset)
+class PhotoAssetAdmin(admin.ModelAdmin):
+    """
+    Configuration de l'admin pour les fichiers photo.
+    """
+    
+    list_display = ['sha256', 'content_type', 'size', 'status', 'created_at']
+    list_filter = ['status', 'content_type']
+    search_fields = ['sha256']
+    readonly_fields = ['sha256', 'original', 'variants', 'created_at', 'updated_at']
+
+
+@admin.register(ChargeStatement)
+class ChargeStatementAdmin(admin.ModelAdmin):
+    """
+    Configuration de l'admin pour les décomptes annuels de charges.
+    """
+    
+    list_display = ['property', 'year', 'amount', 'updated_at']
+    list_filter = ['year']
+    search_fields = ['property__name', 'property__city']
+    raw_id_fields = ['property']
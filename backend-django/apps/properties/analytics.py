@@ -0,0 +1,275 @@
+"""
+Statistiques de marché des loyers (loyer au m² par code postal et type de bien).
+
+Les biens sont chargés une fois dans un instantané en colonnes (tableaux NumPy)
+propre au processus, puis rafraîchi de manière incrémentale à partir de
+updated_at (avec une marge de relecture pour les transactions validées
+tardivement). Les suppressions sont signalées par un compteur dans le cache
+RENT_SNAPSHOT_CACHE, partagé entre processus en production. Les percentiles de chaque groupe sont calculés en une passe
+vectorisée et conservés jusqu'au prochain changement de l'instantané.
+"""
+
+import threading
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Property
+
+
+# Intervalle minimal entre deux rafraîchissements de l'instantané (secondes)
+REFRESH_INTERVAL = 30
+
+# Marge de relecture : couvre les transactions validées après un rafraîchissement
+REFRESH_MARGIN = timedelta(seconds=60)
+
+# Percentiles calculés
+PERCENTILES = (10, 50, 90)
+
+# Alias du cache du compteur de suppressions (partagé entre processus)
+SNAPSHOT_CACHE = getattr(settings, 'RENT_SNAPSHOT_CACHE', 'default')
+
+# Clé de cache incrémentée à chaque suppression de bien (rechargement complet)
+DELETIONS_KEY = 'rent_snapshot:deletions'
+
+
+def _increment_deletions():
+    cache = caches[SNAPSHOT_CACHE]
+    try:
+        cache.incr(DELETIONS_KEY)
+    except ValueError:
+        cache.set(DELETIONS_KEY, 1, timeout=None)
+
+
+def note_property_deleted():
+    """Signale une suppression : l'instantané sera rechargé entièrement."""
+    # Après validation : un rechargement antérieur verrait encore le bien
+    transaction.on_commit(_increment_deletions)
+
+
+class _Dictionary:
+    """Encodage des chaînes (codes postaux, types) en entiers."""
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class RentSnapshot:
+    """
+    Instantané en colonnes des biens utilisé pour les statistiques de loyer.
+
+    Attributes:
+        ids: Identifiants des biens (triés)
+        postal: Code postal encodé de chaque bien
+        types: Type de bien encodé de chaque bien
+        rent_per_m2: Loyer au m² (NaN si la surface est inconnue)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.ids = np.empty(0, dtype=np.int64)
+        self.postal = np.empty(0, dtype=np.int32)
+        self.types = np.empty(0, dtype=np.int32)
+        self.rent_per_m2 = np.empty(0, dtype=np.float64)
+        self.postal_codes = _Dictionary()
+        self.property_types = _Dictionary()
+        self.watermark = None
+        self.deletions = None
+        self.checked_at = 0.0
+        self.refreshed_at = None
+        self.generation = 0
+        self._stats = None
+
+    def _load(self, since=None):
+        """Retourne les lignes modifiées depuis le filigrane (toutes si None)."""
+        queryset = Property.objects.all()
+        if since is not None:
+            queryset = queryset.filter(updated_at__gte=since)
+        return list(queryset.values_list(
+            'id', 'postal_code', 'property_type', 'monthly_rent', 'surface', 'updated_at'
+        ).order_by())
+
+    def _merge(self, rows):
+        """
+        Fusionne des lignes (nouvelles ou modifiées) dans les colonnes.
+
+        Returns:
+            bool: True si les colonnes ont changé (les lignes relues dans la
+            marge sont le plus souvent identiques)
+        """
+        count = len(rows)
+        ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=count)
+        postal = np.fromiter(
+            (self.postal_codes.encode(row[1]) for row in rows), dtype=np.int32, count=count
+        )
+        types = np.fromiter(
+            (self.property_types.encode(row[2]) for row in rows), dtype=np.int32, count=count
+        )
+        rents = np.fromiter((row[3] for row in rows), dtype=np.float64, count=count)
+        surfaces = np.fromiter(
+            (row[4] if row[4] is not None else np.nan for row in rows),
+            dtype=np.float64,
+            count=count
+        )
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rent_per_m2 = np.where(surfaces > 0, rents / surfaces, np.nan)
+
+        # Lignes déjà présentes : mise à jour sur place
+        positions = np.searchsorted(self.ids, ids)
+        if len(self.ids):
+            clipped = np.minimum(positions, len(self.ids) - 1)
+            existing = (positions < len(self.ids)) & (self.ids[clipped] == ids)
+        else:
+            existing = np.zeros(count, dtype=bool)
+        target = positions[existing]
+        old_rents = self.rent_per_m2[target]
+        new_rents = rent_per_m2[existing]
+        changed = bool(
+            (self.postal[target] != postal[existing]).any()
+            or (self.types[target] != types[existing]).any()
+            or ((old_rents != new_rents) & ~(np.isnan(old_rents) & np.isnan(new_rents))).any()
+        )
+        self.postal[target] = postal[existing]
+        self.types[target] = types[existing]
+        self.rent_per_m2[target] = rent_per_m2[existing]
+
+        # Nouvelles lignes : ajout puis tri par identifiant
+        new = ~existing
+        if new.any():
+            merged_ids = np.concatenate([self.ids, ids[new]])
+            order = np.argsort(merged_ids, kind='stable')
+            self.ids = merged_ids[order]
+            self.postal = np.concatenate([self.postal, postal[new]])[order]
+            self.types = np.concatenate([self.types, types[new]])[order]
+            self.rent_per_m2 = np.concatenate([self.rent_per_m2, rent_per_m2[new]])[order]
+            changed = True
+
+        latest = max(row[5] for row in rows)
+        if self.watermark is None or latest > self.watermark:
+            self.watermark = latest
+        return changed
+
+    def refresh(self, force=False):
+        """
+        Rafraîchit l'instantané (au plus une fois par REFRESH_INTERVAL).
+
+        Seules les lignes modifiées depuis le dernier rafraîchissement (moins
+        REFRESH_MARGIN) sont lues ; une suppression de bien provoque un
+        rechargement complet.
+        """
+        now = time.monotonic()
+        if not force and now - self.checked_at < REFRESH_INTERVAL:
+            return
+        with self._lock:
+            if not force and now - self.checked_at < REFRESH_INTERVAL:
+                return
+
+            deletions = caches[SNAPSHOT_CACHE].get(DELETIONS_KEY)
+            if deletions != self.deletions:
+                self._reset()
+                self.deletions = deletions
+
+            since = self.watermark - REFRESH_MARGIN if self.watermark is not None else None
+            rows = self._load(since=since)
+            if rows and self._merge(rows):
+                self.generation += 1
+                self._stats = None
+            self.checked_at = now
+            self.refreshed_at = timezone.now()
+
+    def _compute(self):
+        """Calcule les statistiques de tous les groupes en une passe vectorisée."""
+        valid = ~np.isnan(self.rent_per_m2)
+        values = self.rent_per_m2[valid]
+        n_types = max(len(self.property_types.values), 1)
+        keys = self.postal[valid].astype(np.int64) * n_types + self.types[valid]
+        if not len(values):
+            return []
+
+        # Tri par groupe puis par valeur
+        order = np.lexsort((values, keys))
+        keys = keys[order]
+        values = values[order]
+
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(keys)) + 1])
+        counts = np.diff(np.concatenate([starts, [len(values)]]))
+        means = np.add.reduceat(values, starts) / counts
+
+        # Percentiles par interpolation linéaire entre rangs (méthode "linear")
+        percentiles = {}
+        for percentile in PERCENTILES:
+            rank = starts + (counts - 1) * (percentile / 100.0)
+            lower = np.floor(rank).astype(np.int64)
+            upper = np.ceil(rank).astype(np.int64)
+            weight = rank - lower
+            percentiles[percentile] = values[lower] + (values[upper] - values[lower]) * weight
+
+        group_keys = keys[starts]
+        postal_codes = self.postal_codes.values
+        property_types = self.property_types.values
+        results = []
+        for index, key in enumerate(group_keys.tolist()):
+            result = {
+                'postal_code': postal_codes[key // n_types],
+                'property_type': property_types[key % n_types],
+                'count': int(counts[index]),
+                'mean': round(float(means[index]), 2),
+            }
+            for percentile in PERCENTILES:
+                result[f'p{percentile}'] = round(float(percentiles[percentile][index]), 2)
+            results.append(result)
+        return results
+
+    def stats(self, postal_code=None, property_type=None):
+        """
+        Retourne les statistiques par code postal et type de bien.
+
+        Args:
+            postal_code: Restreindre à un code postal
+            property_type: Restreindre à un type de bien
+
+        Returns:
+            list: Statistiques de chaque groupe
+        """
+        self.refresh()
+        stats = self._stats
+        if stats is None:
+            with self._lock:
+                if self._stats is None:
+                    self._stats = self._compute()
+                stats = self._stats
+
+        return [
+            group for group in stats
+            if (postal_code is None or group['postal_code'] == postal_code)
+            and (property_type is None or group['property_type'] == property_type)
+        ]
+
+
+# Instantané partagé par les requêtes du processus
+rent_snapshot = RentSnapshot()
+
+
+def rent_market_stats(postal_code=None, property_type=None):
+    """Retourne les statistiques de loyer au m² et la date de l'instantané."""
+    results = rent_snapshot.stats(postal_code, property_type)
+    return {
+        'generated_at': rent_snapshot.refreshed_at,
+        'results': results,
+    }
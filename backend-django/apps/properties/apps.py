@@ -9,3 +9,7 @@ class PropertiesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.properties'
     verbose_name = 'Gestion des biens immobiliers'
+    
+    def ready(self):
+        """Enregistre les signaux de l'application."""
+        from . import signals  # noqa: F401
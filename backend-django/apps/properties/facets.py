@@ -0,0 +1,171 @@
+"""
+Calcul des facettes de la liste des biens (compteurs du panneau de filtres).
+
+Chaque facette est comptée avec tous les filtres actifs sauf le sien, pour que
+le panneau affiche les choix possibles. Les facettes qui partagent le même
+ensemble de filtres sont calculées dans une seule requête agrégée.
+Les résultats sont mis en cache par périmètre et jeu de filtres normalisé.
+"""
+
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from apps.accounts.dashboard import cache_timeout
+from .filters import filter_properties, normalize_filters
+from .models import Property
+
+
+# Tranches de loyer (bornes inférieures, la dernière tranche est ouverte)
+RENT_BUCKETS = [0, 500, 750, 1000, 1500, 2000, 3000]
+
+# Nombre maximal de villes retournées
+CITY_FACET_LIMIT = 50
+
+# Durée de vie des facettes en cache (secondes), réduite avec un cache local
+# au processus : l'invalidation par VERSION_KEY ne touche que ce processus
+FACETS_CACHE_TIMEOUT = 300
+
+VERSION_KEY = 'property_facets:version'
+
+
+def get_facets_version():
+    """Retourne la version courante des facettes."""
+    return cache.get_or_set(VERSION_KEY, 1, timeout=None)
+
+
+def invalidate_facets():
+    """Invalide toutes les facettes en cache (après une écriture sur les biens)."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, timeout=None)
+
+
+def _cache_key(scope, filters):
+    """Construit la clé de cache d'un jeu de filtres normalisé."""
+    digest = hashlib.sha1(
+        json.dumps(filters, sort_keys=True).encode('utf-8')
+    ).hexdigest()
+    return f"property_facets:{get_facets_version()}:{scope}:{digest}"
+
+
+def _rent_bucket_bounds():
+    """Retourne les tranches de loyer sous forme de couples (min, max)."""
+    upper_bounds = RENT_BUCKETS[1:] + [None]
+    return list(zip(RENT_BUCKETS, upper_bounds))
+
+
+def _aggregate_facets(queryset, facet_names):
+    """Calcule les facettes disponibilité et loyer en une requête."""
+    aggregates = {}
+    if 'is_available' in facet_names:
+        aggregates['available'] = Count('id', filter=Q(is_available=True))
+        aggregates['unavailable'] = Count('id', filter=Q(is_available=False))
+    if 'rent' in facet_names:
+        for index, (lower, upper) in enumerate(_rent_bucket_bounds()):
+            condition = Q(monthly_rent__gte=lower)
+            if upper is not None:
+                condition &= Q(monthly_rent__lt=upper)
+            aggregates[f'rent_{index}'] = Count('id', filter=condition)
+    return queryset.aggregate(**aggregates)
+
+
+def compute_facets(base_queryset, params):
+    """
+    Calcule toutes les facettes d'une requête de liste.
+
+    Args:
+        base_queryset: Biens accessibles à l'utilisateur
+        params: Paramètres de requête de la liste
+
+    Returns:
+        dict: Compteurs par ville, type, disponibilité et tranche de loyer
+    """
+    filters = normalize_filters(params)
+
+    def scoped(*exclude):
+        own = {name: value for name, value in filters.items() if name not in exclude}
+        return filter_properties(base_queryset, own)
+
+    # Ville et type : une requête groupée chacune
+    cities = (
+        scoped('city')
+        .values('city')
+        .annotate(count=Count('id'))
+        .order_by('-count', 'city')[:CITY_FACET_LIMIT]
+    )
+    types = (
+        scoped('property_type')
+        .values('property_type')
+        .annotate(count=Count('id'))
+        .order_by('-count')
+    )
+
+    # Disponibilité et loyer : une seule requête si leurs filtres sont absents
+    availability_excluded = {'is_available'}
+    rent_excluded = {'min_rent', 'max_rent'}
+    if not (set(filters) & (availability_excluded | rent_excluded)):
+        counters = _aggregate_facets(scoped(), {'is_available', 'rent'})
+    else:
+        counters = _aggregate_facets(scoped(*availability_excluded), {'is_available'})
+        counters.update(_aggregate_facets(scoped(*rent_excluded), {'rent'}))
+
+    # Le total se déduit de la facette disponibilité (calculée sans son filtre ;
+    # normalize_filters ne laisse que "true" ou "false")
+    if filters.get('is_available') == 'true':
+        total = counters['available']
+    elif filters.get('is_available') == 'false':
+        total = counters['unavailable']
+    else:
+        total = counters['available'] + counters['unavailable']
+
+    labels = dict(Property.PropertyType.choices)
+
+    return {
+        'filters': filters,
+        'total': total,
+        'city': [
+            {'value': row['city'], 'count': row['count']}
+            for row in cities
+        ],
+        'property_type': [
+            {
+                'value': row['property_type'],
+                'label': labels.get(row['property_type'], row['property_type']),
+                'count': row['count'],
+            }
+            for row in types
+        ],
+        'is_available': {
+            'true': counters['available'],
+            'false': counters['unavailable'],
+        },
+        'rent': [
+            {'min': lower, 'max': upper, 'count': counters[f'rent_{index}']}
+            for index, (lower, upper) in enumerate(_rent_bucket_bounds())
+        ],
+    }
+
+
+def get_facets(user, base_queryset, params):
+    """
+    Retourne les facettes depuis le cache ou les calcule.
+
+    Args:
+        user: Utilisateur connecté (détermine le périmètre)
+        base_queryset: Biens accessibles à l'utilisateur
+        params: Paramètres de requête de la liste
+
+    Returns:
+        dict: Facettes
+    """
+    scope = 'all' if user.role == 'admin' else f'agent-{user.pk}'
+    key = _cache_key(scope, normalize_filters(params))
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(base_queryset, params)
+        cache.set(key, facets, cache_timeout(FACETS_CACHE_TIMEOUT))
+    return facets
@@ -0,0 +1,120 @@
+"""
+Filtres de la liste des biens immobiliers.
+Partagés entre la liste paginée et le calcul des facettes.
+"""
+
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Q
+
+
+# Paramètres de requête reconnus par la liste des biens
+FILTER_PARAMS = (
+    'city', 'property_type', 'is_available', 'search', 'min_rent', 'max_rent',
+)
+
+# Valeurs acceptées pour un filtre booléen (en minuscules)
+TRUE_VALUES = {'true', '1', 'yes', 'oui', 'on'}
+FALSE_VALUES = {'false', '0', 'no', 'non', 'off'}
+
+
+def _normalize_decimal(value):
+    """Normalise un montant ("1500.0" et "1500" donnent la même clé)."""
+    try:
+        return str(Decimal(value).normalize())
+    except (InvalidOperation, ValueError):
+        return value
+
+
+def _normalize_boolean(value):
+    """Normalise un booléen en "true" / "false" (None si la valeur est inconnue)."""
+    value = value.lower()
+    if value in TRUE_VALUES:
+        return 'true'
+    if value in FALSE_VALUES:
+        return 'false'
+    return None
+
+
+def normalize_filters(params, exclude=()):
+    """
+    Extrait et normalise les filtres reconnus d'une requête.
+
+    Deux requêtes équivalentes ("Paris" / " paris ", "1500" / "1500.00",
+    "1" / "True") produisent le même dictionnaire, utilisable comme clé de
+    cache. Une disponibilité non reconnue est ignorée.
+
+    Args:
+        params: Paramètres de requête (QueryDict ou dict)
+        exclude: Filtres à ignorer
+
+    Returns:
+        dict: Filtres normalisés, triés par nom
+    """
+    filters = {}
+    for name in FILTER_PARAMS:
+        if name in exclude:
+            continue
+        value = params.get(name)
+        if value is None:
+            continue
+        value = value.strip()
+        if not value:
+            continue
+        if name in ('city', 'search'):
+            value = value.lower()
+        elif name == 'is_available':
+            value = _normalize_boolean(value)
+            if value is None:
+                continue
+        elif name in ('min_rent', 'max_rent'):
+            value = _normalize_decimal(value)
+        filters[name] = value
+    return dict(sorted(filters.items()))
+
+
+def filter_properties(queryset, filters):
+    """
+    Applique les filtres normalisés à un queryset de biens.
+
+    Args:
+        queryset: Queryset de biens (déjà restreint selon le rôle)
+        filters: Filtres issus de normalize_filters
+
+    Returns:
+        QuerySet: Biens filtrés
+    """
+    # Filtre par ville
+    city = filters.get('city')
+    if city:
+        queryset = queryset.filter(city__icontains=city)
+
+    # Filtre par type de bien
+    property_type = filters.get('property_type')
+    if property_type:
+        queryset = queryset.filter(property_type=property_type)
+
+    # Filtre par disponibilité
+    is_available = filters.get('is_available')
+    if is_available is not None:
+        queryset = queryset.filter(is_available=is_available == 'true')
+
+    # Recherche textuelle
+    search = filters.get('search')
+    if search:
+        queryset = queryset.filter(
+            Q(name__icontains=search) |
+            Q(address__icontains=search) |
+            Q(city__icontains=search)
+        )
+
+    # Filtre par fourchette de loyer
+    min_rent = filters.get('min_rent')
+    if min_rent:
+        queryset = queryset.filter(monthly_rent__gte=min_rent)
+
+    max_rent = filters.get('max_rent')
+    if max_rent:
+        queryset = queryset.filter(monthly_rent__lte=max_rent)
+
+    return queryset
@@ -0,0 +1,218 @@
+"""
+Import en masse de biens immobiliers.
+Lit des fichiers CSV ou NDJSON ligne par ligne, valide chaque ligne avec les
+règles de PropertyCreateSerializer et insère les biens valides par lots.
+"""
+
+import csv
+import io
+import json
+
+from django.db import transaction
+from rest_framework import serializers
+
+from apps.accounts.dashboard import invalidate_dashboards
+from .facets import invalidate_facets
+from .models import Property
+from .serializers import PropertyCreateSerializer
+
+
+# Taille par défaut des lots d'insertion
+DEFAULT_BATCH_SIZE = 1000
+
+# Formats de fichiers acceptés
+FORMAT_CSV = 'csv'
+FORMAT_NDJSON = 'ndjson'
+SUPPORTED_FORMATS = (FORMAT_CSV, FORMAT_NDJSON)
+
+
+def detect_format(filename, content_type=None):
+    """
+    Détermine le format d'un fichier à partir de son nom ou de son type MIME.
+
+    Args:
+        filename: Nom du fichier envoyé
+        content_type: Type MIME éventuel
+
+    Returns:
+        str: 'csv' ou 'ndjson', None si le format n'est pas reconnu
+    """
+    name = (filename or '').lower()
+    if name.endswith(('.ndjson', '.jsonl')):
+        return FORMAT_NDJSON
+    if name.endswith('.csv'):
+        return FORMAT_CSV
+
+    content_type = (content_type or '').lower()
+    if 'ndjson' in content_type or 'jsonl' in content_type:
+        return FORMAT_NDJSON
+    if 'csv' in content_type:
+        return FORMAT_CSV
+    return None
+
+
+def _read_error(exc):
+    """Construit l'erreur de ligne d'un fichier illisible."""
+    if isinstance(exc, UnicodeDecodeError):
+        message = "Fichier illisible : encodage UTF-8 attendu (lecture interrompue)."
+    else:
+        message = f"CSV invalide : {exc}"
+    return {'non_field_errors': [message]}
+
+
+def iter_records(stream, file_format):
+    """
+    Parcourt un fichier binaire ligne par ligne sans le charger en mémoire.
+
+    Une ligne CSV mal formée est signalée puis ignorée ; un contenu qui n'est
+    pas en UTF-8 (export Latin-1 d'un tableur...) est signalé à la ligne où
+    le décodage échoue et interrompt la lecture.
+
+    Args:
+        stream: Fichier ouvert en mode binaire
+        file_format: 'csv' ou 'ndjson'
+
+    Yields:
+        tuple: (numéro de ligne, dictionnaire de valeurs ou None, erreur ou None)
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+    if file_format == FORMAT_CSV:
+        reader = csv.DictReader(text)
+        rows = iter(reader)
+        while True:
+            try:
+                row = next(rows)
+            except StopIteration:
+                return
+            except UnicodeDecodeError as exc:
+                # line_num n'est pas encore incrémenté pour la ligne en erreur
+                yield reader.line_num + 1, None, _read_error(exc)
+                return
+            except csv.Error as exc:
+                yield reader.line_num + 1, None, _read_error(exc)
+                continue
+            # Les cellules vides sont traitées comme des valeurs absentes
+            record = {
+                key.strip(): value
+                for key, value in row.items()
+                if key and value not in (None, '')
+            }
+            yield reader.line_num, record, None
+    else:
+        line_number = 0
+        while True:
+            try:
+                line = next(text)
+            except StopIteration:
+                return
+            except UnicodeDecodeError as exc:
+                yield line_number + 1, None, _read_error(exc)
+                return
+            line_number += 1
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield line_number, None, {'non_field_errors': [f"JSON invalide : {exc}"]}
+                continue
+            if not isinstance(record, dict):
+                yield line_number, None, {'non_field_errors': ["Chaque ligne doit être un objet JSON."]}
+                continue
+            yield line_number, record, None
+
+
+class PropertyImporter:
+    """
+    Importe des biens par lots en réutilisant les règles du sérialiseur.
+
+    Le sérialiseur est instancié une seule fois : ses champs sont construits
+    au premier accès puis réutilisés pour valider chaque ligne, ce qui évite
+    le coût de construction d'un ModelSerializer par ligne.
+
+    Attributes:
+        agent: Agent assigné aux biens importés (comme dans perform_create)
+        batch_size: Nombre de biens insérés par requête
+        created: Nombre de biens créés
+        errors: Rapport d'erreurs ligne par ligne
+    """
+
+    def __init__(self, agent, batch_size=DEFAULT_BATCH_SIZE):
+        self.agent = agent
+        self.batch_size = batch_size
+        self.created = 0
+        self.total_rows = 0
+        self.errors = []
+        self._serializer = PropertyCreateSerializer()
+        self._pending = []
+
+    def validate(self, record):
+        """
+        Valide une ligne avec les règles de PropertyCreateSerializer.
+
+        Returns:
+            dict: Données validées
+
+        Raises:
+            serializers.ValidationError: Si la ligne est invalide
+        """
+        return self._serializer.run_validation(record)
+
+    def add(self, line_number, record):
+        """Valide une ligne et la place dans le lot courant."""
+        self.total_rows += 1
+        try:
+            validated_data = self.validate(record)
+        except serializers.ValidationError as exc:
+            self.errors.append({
+                'line': line_number,
+                'errors': serializers.as_serializer_error(exc),
+            })
+            return
+
+        self._pending.append(Property(agent=self.agent, **validated_data))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Insère le lot courant en une seule requête."""
+        if not self._pending:
+            return
+        with transaction.atomic():
+            Property.objects.bulk_create(self._pending, batch_size=self.batch_size)
+        self.created += len(self._pending)
+        self._pending = []
+        # bulk_create n'émet pas post_save
+        invalidate_facets()
+        invalidate_dashboards(users=[self.agent.pk])
+
+    def run(self, stream, file_format):
+        """
+        Importe l'intégralité d'un fichier.
+
+        Args:
+            stream: Fichier ouvert en mode binaire
+            file_format: 'csv' ou 'ndjson'
+
+        Returns:
+            dict: Rapport d'import
+        """
+        for line_number, record, error in iter_records(stream, file_format):
+            if error is not None:
+                self.total_rows += 1
+                self.errors.append({'line': line_number, 'errors': error})
+                continue
+            self.add(line_number, record)
+        self.flush()
+        return self.report()
+
+    def report(self):
+        """Retourne le rapport d'import."""
+        return {
+            'total_rows': self.total_rows,
+            'created': self.created,
+            'error_count': len(self.errors),
+            'errors': self.errors,
+        }
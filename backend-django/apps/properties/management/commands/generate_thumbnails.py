@@ -0,0 +1,46 @@
+"""
+Commande de (re)génération des miniatures des photos.
+
+Traite les fichiers en attente ou en échec, par exemple après un
+redémarrage du serveur pendant une génération.
+
+Usage :
+    python manage.py generate_thumbnails
+    python manage.py generate_thumbnails --all
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.properties.models import PhotoAsset
+from apps.properties.photos import schedule_thumbnails, shutdown_executor
+
+
+class Command(BaseCommand):
+    """Génère les miniatures manquantes avec le pool de processus."""
+
+    help = "Génère les miniatures des photos en attente ou en échec."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help="Régénère les miniatures de toutes les photos"
+        )
+
+    def handle(self, *args, **options):
+        assets = PhotoAsset.objects.all()
+        if not options['all']:
+            assets = assets.exclude(status=PhotoAsset.Status.READY)
+
+        asset_ids = list(assets.values_list('pk', flat=True))
+        schedule_thumbnails(asset_ids)
+        # Attendre la fin des générations et l'enregistrement des résultats
+        shutdown_executor(wait=True)
+
+        failed = PhotoAsset.objects.filter(
+            pk__in=asset_ids,
+            status=PhotoAsset.Status.FAILED
+        ).count()
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(asset_ids) - failed} photos traitées, {failed} en échec"
+        ))
@@ -0,0 +1,81 @@
+"""
+Commande d'import en masse de biens immobiliers.
+
+Usage :
+    python manage.py import_properties biens.csv --agent agent@test.com
+    python manage.py import_properties biens.ndjson --agent agent@test.com --batch-size 2000
+"""
+
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.properties.importers import (
+    DEFAULT_BATCH_SIZE,
+    SUPPORTED_FORMATS,
+    PropertyImporter,
+    detect_format,
+)
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """Importe des biens depuis un fichier CSV ou NDJSON."""
+
+    help = "Importe des biens immobiliers depuis un fichier CSV ou NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Chemin du fichier à importer")
+        parser.add_argument(
+            '--agent',
+            required=True,
+            help="Email de l'agent responsable des biens importés"
+        )
+        parser.add_argument(
+            '--format',
+            choices=SUPPORTED_FORMATS,
+            help="Format du fichier (déduit de l'extension par défaut)"
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Nombre de biens insérés par requête"
+        )
+        parser.add_argument(
+            '--report',
+            help="Fichier JSON où écrire le rapport d'erreurs ligne par ligne"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            agent = User.objects.get(email=options['agent'])
+        except User.DoesNotExist:
+            raise CommandError(f"Utilisateur introuvable : {options['agent']}")
+        if agent.role not in ['admin', 'agent']:
+            raise CommandError("L'utilisateur doit être un agent ou un administrateur.")
+
+        file_format = options['format'] or detect_format(options['path'])
+        if file_format not in SUPPORTED_FORMATS:
+            raise CommandError("Format non reconnu, utilisez --format csv|ndjson.")
+
+        importer = PropertyImporter(agent=agent, batch_size=options['batch_size'])
+        started = time.monotonic()
+        with open(options['path'], 'rb') as stream:
+            report = importer.run(stream, file_format)
+        elapsed = time.monotonic() - started
+
+        if options['report']:
+            with open(options['report'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, ensure_ascii=False, indent=2)
+
+        for error in report['errors'][:20]:
+            self.stderr.write(f"Ligne {error['line']} : {json.dumps(error['errors'], ensure_ascii=False)}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['created']} biens créés, {report['error_count']} lignes en erreur "
+            f"sur {report['total_rows']} ({elapsed:.1f} s)"
+        ))
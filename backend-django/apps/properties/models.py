@@ -4,8 +4,30 @@ Définit les structures de données pour les propriétés et leurs caractéristi
 """
 
 from django.db import models
+from django.db.models import Q
 from django.conf import settings
 
+from apps.accounts.scoping import ScopedQuerySetMixin
+
+
+class PropertyQuerySet(ScopedQuerySetMixin, models.QuerySet):
+    """QuerySet des biens : un locataire voit le bien de son bail actif."""
+    
+    agent_lookup = 'agent_id'
+    
+    def scope_filter(self, user):
+        condition = super().scope_filter(user)
+        if condition is None and user.is_authenticated and user.role == 'tenant':
+            # Au plus un bail actif par couple (locataire, bien) : pas de doublon
+            return Q(tenant_assignments__tenant_id=user.pk, tenant_assignments__is_active=True)
+        return condition
+
+
+class PropertyPhotoQuerySet(ScopedQuerySetMixin, models.QuerySet):
+    """QuerySet des photos de biens."""
+    
+    agent_lookup = 'property__agent_id'
+
 
 class Property(models.Model):
     """
@@ -116,6 +138,8 @@ class Property(models.Model):
     created_at = models.DateTimeField('Date de création', auto_now_add=True)
     updated_at = models.DateTimeField('Dernière modification', auto_now=True)
     
+    objects = PropertyQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Bien immobilier'
         verbose_name_plural = 'Biens immobiliers'
@@ -125,6 +149,19 @@ class Property(models.Model):
         """Représentation textuelle du bien."""
         return f"{self.name} - {self.city}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Mémorise l'agent chargé pour détecter un changement d'agent."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_agent_id = instance.__dict__.get('agent_id')
+        return instance
+    
+    @property
+    def agent_changed(self):
+        """Indique si l'agent a changé depuis le chargement du bien."""
+        loaded = getattr(self, '_loaded_agent_id', None)
+        return loaded is not None and loaded != self.agent_id
+    
     @property
     def full_address(self):
         """Retourne l'adresse complète formatée."""
@@ -139,3 +176,143 @@ class Property(models.Model):
     def current_tenants_count(self):
         """Retourne le nombre de locataires actuels."""
         return self.tenant_assignments.filter(is_active=True).count()
+
+
+class PhotoAsset(models.Model):
+    """
+    Fichier image stocké une seule fois, identifié par son empreinte SHA-256.
+    
+    Plusieurs photos de biens peuvent partager le même fichier : un envoi
+    en double ne crée ni nouveau fichier ni nouvelles miniatures.
+    
+    Attributes:
+        sha256: Empreinte du contenu (identifiant du fichier)
+        original: Chemin du fichier original, relatif à MEDIA_ROOT
+        content_type: Type MIME envoyé
+        size: Taille du fichier en octets
+        width / height: Dimensions de l'original (renseignées après traitement)
+        variants: Chemins des miniatures {taille: {"jpeg": ..., "webp": ...}}
+        status: État de la génération des miniatures
+    """
+    
+    class Status(models.TextChoices):
+        """États de la génération des miniatures."""
+        PENDING = 'pending', 'En attente'
+        READY = 'ready', 'Prête'
+        FAILED = 'failed', 'Échec'
+    
+    sha256 = models.CharField('Empreinte SHA-256', max_length=64, unique=True)
+    original = models.CharField('Fichier original', max_length=255)
+    content_type = models.CharField('Type MIME', max_length=100, blank=True)
+    size = models.PositiveIntegerField('Taille (octets)', default=0)
+    width = models.PositiveIntegerField('Largeur', null=True, blank=True)
+    height = models.PositiveIntegerField('Hauteur', null=True, blank=True)
+    variants = models.JSONField('Miniatures', default=dict, blank=True)
+    status = models.CharField(
+        'Statut',
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING
+    )
+    
+    created_at = models.DateTimeField('Date de création', auto_now_add=True)
+    updated_at = models.DateTimeField('Dernière modification', auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Fichier photo'
+        verbose_name_plural = 'Fichiers photo'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status']),
+        ]
+    
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.get_status_display()})"
+
+
+class PropertyPhoto(models.Model):
+    """
+    Photo associée à un bien immobilier.
+    
+    Attributes:
+        property: Bien illustré
+        asset: Fichier image (partagé entre biens si identique)
+        position: Ordre d'affichage (0 = photo principale)
+    """
+    
+    property = models.ForeignKey(
+        Property,
+        on_delete=models.CASCADE,
+        related_name='photos',
+        verbose_name='Bien immobilier'
+    )
+    asset = models.ForeignKey(
+        PhotoAsset,
+        on_delete=models.PROTECT,
+        related_name='property_photos',
+        verbose_name='Fichier'
+    )
+    position = models.PositiveIntegerField('Position', default=0)
+    
+    created_at = models.DateTimeField('Date d\'ajout', auto_now_add=True)
+    
+    objects = PropertyPhotoQuerySet.as_manager()
+    
+    class Meta:
+        verbose_name = 'Photo de bien'
+        verbose_name_plural = 'Photos de biens'
+        ordering = ['position', 'id']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['property', 'asset'],
+                name='unique_property_photo_asset'
+            )
+        ]
+    
+    def __str__(self):
+        return f"Photo {self.position} - {self.property.name}"
+
+
+class ChargeStatement(models.Model):
+    """
+    Charges réelles d'un bien sur une année (décompte annuel).
+    
+    Sert à la régularisation des provisions sur charges versées par les
+    locataires (Property.charges est une provision mensuelle forfaitaire).
+    
+    Attributes:
+        property: Bien concerné
+        year: Année du décompte
+        amount: Montant total des charges récupérables de l'année
+    """
+    
+    property = models.ForeignKey(
+        Property,
+        on_delete=models.CASCADE,
+        related_name='charge_statements',
+        verbose_name='Bien immobilier'
+    )
+    year = models.PositiveSmallIntegerField('Année')
+    amount = models.DecimalField(
+        'Charges réelles (€)',
+        max_digits=12,
+        decimal_places=2,
+        help_text="Total des charges récupérables de l'année"
+    )
+    
+    created_at = models.DateTimeField('Date de création', auto_now_add=True)
+    updated_at = models.DateTimeField('Dernière modification', auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Décompte de charges'
+        verbose_name_plural = 'Décomptes de charges'
+        ordering = ['-year', 'property']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['property', 'year'],
+                name='unique_property_charge_year'
+            )
+        ]
+    
+    def __str__(self):
+        return f"Charges {self.year} - {self.property.name}"
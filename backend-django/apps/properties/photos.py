@@ -0,0 +1,232 @@
+"""
+Stockage des photos de biens et génération des miniatures hors requête.
+
+Les fichiers sont adressés par leur contenu (SHA-256) : un fichier déjà connu
+n'est ni réécrit ni retraité. Les miniatures sont calculées par un pool de
+processus, après la validation de la transaction qui a créé le fichier ; si
+elle est annulée, les fichiers écrits sont supprimés.
+"""
+
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, connections, transaction
+
+from .models import PhotoAsset, PropertyPhoto
+from .thumbnails import render_variants
+
+logger = logging.getLogger(__name__)
+
+# Tailles des miniatures (côté maximal en pixels)
+PHOTO_SIZES = getattr(settings, 'PROPERTY_PHOTO_SIZES', {
+    'small': 320,
+    'medium': 800,
+    'large': 1600,
+})
+
+# Nombre de processus du pool de génération
+PHOTO_WORKERS = getattr(settings, 'PROPERTY_PHOTO_WORKERS', 2)
+
+# Taille maximale d'un fichier envoyé
+PHOTO_MAX_SIZE = getattr(settings, 'PROPERTY_PHOTO_MAX_SIZE', 15 * 1024 * 1024)
+
+# Extensions acceptées selon le type MIME
+ALLOWED_CONTENT_TYPES = {
+    'image/jpeg': 'jpg',
+    'image/png': 'png',
+    'image/webp': 'webp',
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Retourne le pool de processus, créé au premier usage."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # "spawn" évite de dupliquer les threads du serveur web
+            _executor = ProcessPoolExecutor(
+                max_workers=PHOTO_WORKERS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _executor
+
+
+def shutdown_executor(wait=True):
+    """Arrête le pool (attend la fin des générations et de leurs rappels)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait)
+            _executor = None
+
+
+def _hash_upload(upload):
+    """Calcule l'empreinte SHA-256 d'un fichier envoyé, par blocs."""
+    digest = hashlib.sha256()
+    for chunk in upload.chunks():
+        digest.update(chunk)
+    upload.seek(0)
+    return digest.hexdigest()
+
+
+def _discard_files(names):
+    """Supprime les fichiers écrits par une transaction annulée (hors fichiers référencés)."""
+    for name in names:
+        # Un envoi concurrent du même fichier a pu le référencer entre-temps
+        if PhotoAsset.objects.filter(original=name).exists():
+            continue
+        try:
+            default_storage.delete(name)
+        except OSError:
+            logger.exception("Impossible de supprimer le fichier orphelin %s", name)
+
+
+def store_upload(upload, written=None):
+    """
+    Enregistre un fichier envoyé s'il n'est pas déjà connu.
+
+    Args:
+        upload: Fichier envoyé (UploadedFile)
+        written: Liste complétée avec le nom du fichier écrit, à supprimer si
+            la transaction englobante est annulée
+
+    Returns:
+        tuple: (PhotoAsset, bool indiquant si le fichier est nouveau)
+    """
+    sha256 = _hash_upload(upload)
+    asset = PhotoAsset.objects.filter(sha256=sha256).first()
+    if asset is not None:
+        return asset, False
+
+    extension = ALLOWED_CONTENT_TYPES[upload.content_type]
+    name = os.path.join('photos', 'originals', sha256[:2], f"{sha256}.{extension}")
+    saved = not default_storage.exists(name)
+    if saved:
+        name = default_storage.save(name, upload)
+        if written is not None:
+            written.append(name)
+
+    try:
+        with transaction.atomic():
+            asset = PhotoAsset.objects.create(
+                sha256=sha256,
+                original=name,
+                content_type=upload.content_type,
+                size=upload.size,
+            )
+    except IntegrityError:
+        # Envoi concurrent du même fichier (qui utilise le même nom)
+        if written is not None and saved:
+            written.remove(name)
+        return PhotoAsset.objects.get(sha256=sha256), False
+    except Exception:
+        if saved and written is None:
+            _discard_files([name])
+        raise
+
+    transaction.on_commit(lambda: schedule_thumbnails([asset.pk]))
+    return asset, True
+
+
+def add_photos(property_obj, uploads):
+    """
+    Ajoute des photos à un bien, à la suite des photos existantes.
+
+    Args:
+        property_obj: Bien concerné
+        uploads: Liste de fichiers envoyés
+
+    Returns:
+        list: Photos créées
+    """
+    photos = []
+    written = []
+    try:
+        with transaction.atomic():
+            existing = dict(
+                property_obj.photos.values_list('asset_id', 'position')
+            )
+            position = max(existing.values(), default=-1) + 1
+            for upload in uploads:
+                asset, _ = store_upload(upload, written)
+                if asset.pk in existing:
+                    continue
+                photos.append(PropertyPhoto(
+                    property=property_obj,
+                    asset=asset,
+                    position=position
+                ))
+                existing[asset.pk] = position
+                position += 1
+            PropertyPhoto.objects.bulk_create(photos)
+    except Exception:
+        # Transaction annulée : les fichiers écrits ne sont référencés par aucune photo
+        _discard_files(written)
+        raise
+    return photos
+
+
+def _store_result(asset_id, future):
+    """Enregistre le résultat de la génération (exécuté dans le processus web)."""
+    try:
+        result = future.result()
+    except Exception:
+        logger.exception("Échec de génération des miniatures (photo %s)", asset_id)
+        PhotoAsset.objects.filter(pk=asset_id).update(status=PhotoAsset.Status.FAILED)
+    else:
+        PhotoAsset.objects.filter(pk=asset_id).update(
+            status=PhotoAsset.Status.READY,
+            width=result['width'],
+            height=result['height'],
+            variants=result['variants'],
+        )
+    finally:
+        # Ce rappel s'exécute dans un thread du pool : libérer sa connexion
+        connections.close_all()
+
+
+def submit_asset(asset):
+    """Soumet la génération des miniatures d'un fichier au pool."""
+    future = get_executor().submit(
+        render_variants,
+        str(settings.MEDIA_ROOT),
+        asset.original,
+        asset.sha256,
+        PHOTO_SIZES,
+    )
+    future.add_done_callback(lambda done, asset_id=asset.pk: _store_result(asset_id, done))
+    return future
+
+
+def schedule_thumbnails(asset_ids):
+    """Planifie la génération des miniatures de plusieurs fichiers."""
+    assets = PhotoAsset.objects.filter(pk__in=asset_ids).only('pk', 'original', 'sha256')
+    return [submit_asset(asset) for asset in assets]
+
+
+def photo_urls(asset):
+    """
+    Construit les URLs d'un fichier et de ses miniatures sans requête SQL.
+
+    Returns:
+        dict: {"original": url, "thumbnails": {taille: {"jpeg": url, "webp": url}}}
+    """
+    return {
+        'original': default_storage.url(asset.original),
+        'thumbnails': {
+            size_name: {
+                image_format: default_storage.url(name)
+                for image_format, name in formats.items()
+            }
+            for size_name, formats in asset.variants.items()
+        },
+    }
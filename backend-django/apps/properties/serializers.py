@@ -4,10 +4,29 @@ Convertissent les modèles Property en JSON et valident les données entrantes.
 """
 
 from rest_framework import serializers
-from .models import Property
+from .models import Property, PropertyPhoto
+from .photos import photo_urls
 from apps.accounts.serializers import UserSerializer
 
 
+class PropertyPhotoSerializer(serializers.ModelSerializer):
+    """
+    Sérialiseur des photos d'un bien.
+    Les URLs sont construites à partir du fichier préchargé, sans requête.
+    """
+    
+    status = serializers.CharField(source='asset.status', read_only=True)
+    urls = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = PropertyPhoto
+        fields = ['id', 'position', 'status', 'urls']
+    
+    def get_urls(self, obj):
+        """Retourne les URLs de l'original et des miniatures."""
+        return photo_urls(obj.asset)
+
+
 class PropertySerializer(serializers.ModelSerializer):
     """
     Sérialiseur complet pour afficher les détails d'un bien.
@@ -22,6 +41,9 @@ class PropertySerializer(serializers.ModelSerializer):
     # Relation agent (lecture seule)
     agent_details = UserSerializer(source='agent', read_only=True)
     
+    # Photos et miniatures
+    photos = PropertyPhotoSerializer(many=True, read_only=True)
+    
     # Affichage du type de bien en français
     property_type_display = serializers.CharField(
         source='get_property_type_display',
@@ -35,7 +57,7 @@ class PropertySerializer(serializers.ModelSerializer):
             'property_type', 'property_type_display', 'surface', 'rooms',
             'monthly_rent', 'charges', 'total_rent', 'description',
             'agent', 'agent_details', 'is_available',
-            'current_tenants_count', 'created_at', 'updated_at'
+            'current_tenants_count', 'photos', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
 
@@ -82,6 +104,7 @@ class PropertyListSerializer(serializers.ModelSerializer):
         source='get_property_type_display',
         read_only=True
     )
+    photos = PropertyPhotoSerializer(many=True, read_only=True)
     
     class Meta:
         model = Property
@@ -89,8 +112,16 @@ class PropertyListSerializer(serializers.ModelSerializer):
             'id', 'name', 'full_address', 'city',
             'property_type', 'property_type_display',
             'monthly_rent', 'total_rent', 'is_available',
-            'current_tenants_count'
+            'current_tenants_count', 'photos'
         ]
+    
+    def to_representation(self, instance):
+        """Reflète la disponibilité à la date demandée (as_of) si calculée."""
+        data = super().to_representation(instance)
+        occupied = getattr(instance, 'occupied_as_of', None)
+        if occupied is not None:
+            data['is_available'] = not occupied
+        return data
 
 
 class PropertyStatsSerializer(serializers.Serializer):
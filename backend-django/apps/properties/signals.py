@@ -0,0 +1,24 @@
+"""
+Signaux de l'application properties.
+Invalident les données en cache dérivées des biens après chaque écriture.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .analytics import note_property_deleted
+from .facets import invalidate_facets
+from .models import Property
+
+
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+def property_changed(sender, **kwargs):
+    """Invalide les facettes lorsqu'un bien est créé, modifié ou supprimé."""
+    invalidate_facets()
+
+
+@receiver(post_delete, sender=Property)
+def property_deleted(sender, **kwargs):
+    """Force le rechargement de l'instantané des loyers après une suppression."""
+    note_property_deleted()
@@ -0,0 +1,26 @@
+"""
+Statistiques des biens (nombre, disponibilité, revenus, taux d'occupation).
+
+Utilisées par /api/properties/stats/ et par la section properties du tableau
+de bord composite (apps.accounts.overview).
+"""
+
+from django.db.models import Count, Q, Sum
+
+
+def property_stats(properties):
+    """Statistiques d'un ensemble de biens (1 requête)."""
+    totals = properties.aggregate(
+        total=Count('id'),
+        available=Count('id', filter=Q(is_available=True)),
+        revenue=Sum('monthly_rent', filter=Q(is_available=False)),
+    )
+    total = totals['total']
+    rented = total - totals['available']
+    return {
+        'total_properties': total,
+        'available_properties': totals['available'],
+        'rented_properties': rented,
+        'total_monthly_revenue': float(totals['revenue'] or 0),
+        'occupancy_rate': round(rented / total * 100, 2) if total > 0 else 0,
+    }
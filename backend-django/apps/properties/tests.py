@@ -0,0 +1,74 @@
+"""
+Tests de l'application properties.
+
+Import en masse de fichiers mal formés : encodage autre qu'UTF-8 et lignes
+CSV invalides sont signalés dans le rapport, sans erreur serveur.
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from .models import Property
+
+User = get_user_model()
+
+HEADER = 'name,address,city,postal_code,monthly_rent\n'
+
+
+class PropertyImportErrorTests(APITestCase):
+    """Fichiers d'import illisibles ou partiellement invalides."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = User.objects.create_user(
+            email='agent@test.local', password='test', first_name='Agent',
+            last_name='Test', role='agent'
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.agent)
+
+    def upload(self, name, content):
+        return self.client.post(
+            reverse('properties:property_import'),
+            {'file': SimpleUploadedFile(name, content)},
+            format='multipart'
+        )
+
+    def test_latin1_csv_is_reported(self):
+        content = (HEADER + 'Studio Gare,1 rue de la Gare,Orléans,45000,500\n').encode('latin-1')
+        response = self.upload('biens.csv', content)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['created'], 0)
+        self.assertEqual(response.data['error_count'], 1)
+        error = response.data['errors'][0]
+        self.assertEqual(error['line'], 1)
+        self.assertIn('UTF-8', error['errors']['non_field_errors'][0])
+
+    def test_latin1_ndjson_is_reported(self):
+        content = '{"name": "Château"}\n'.encode('latin-1')
+        response = self.upload('biens.ndjson', content)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('UTF-8', response.data['errors'][0]['errors']['non_field_errors'][0])
+
+    def test_invalid_csv_row_is_skipped(self):
+        content = (
+            HEADER
+            + 'Studio A,1 rue A,Paris,75001,500\n'
+            + 'Studio B,2 rue B,Paris,75001,"' + 'x' * 200_000 + '"\n'
+            + 'Studio C,3 rue C,Paris,75001,700\n'
+        ).encode('utf-8')
+        response = self.upload('biens.csv', content)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(response.data['error_count'], 1)
+        self.assertEqual(response.data['errors'][0]['line'], 3)
+        self.assertIn('CSV invalide', response.data['errors'][0]['errors']['non_field_errors'][0])
+        self.assertEqual(
+            set(Property.objects.values_list('name', flat=True)), {'Studio A', 'Studio C'}
+        )
@@ -0,0 +1,69 @@
+"""
+Génération des miniatures des photos de biens.
+
+Ce module est exécuté dans les processus du pool de génération : il ne dépend
+que de Pillow et du système de fichiers (aucun import Django), afin de pouvoir
+être chargé par un processus lancé en mode "spawn".
+"""
+
+import os
+
+
+# Qualité d'encodage des variantes
+JPEG_QUALITY = 82
+WEBP_QUALITY = 80
+
+
+def _save(image, path, image_format, **options):
+    """Écrit une variante de manière atomique (fichier temporaire puis renommage)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    image.save(tmp_path, image_format, **options)
+    os.replace(tmp_path, path)
+
+
+def render_variants(media_root, source_name, sha256, sizes):
+    """
+    Génère les miniatures JPEG et WebP d'une image.
+
+    Les noms des variantes sont dérivés de l'empreinte du fichier source :
+    une même image n'est donc jamais traitée ni stockée deux fois.
+
+    Args:
+        media_root: Racine des fichiers médias
+        source_name: Chemin du fichier original, relatif à media_root
+        sha256: Empreinte SHA-256 du fichier original
+        sizes: Dictionnaire {nom de la taille: côté maximal en pixels}
+
+    Returns:
+        dict: Dimensions de l'original et chemins relatifs des variantes
+    """
+    from PIL import Image, ImageOps
+
+    prefix = os.path.join('photos', 'thumbnails', sha256[:2], sha256)
+    variants = {}
+
+    with Image.open(os.path.join(media_root, source_name)) as source:
+        # Appliquer l'orientation EXIF avant de redimensionner
+        image = ImageOps.exif_transpose(source)
+        width, height = image.size
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+
+        for size_name, max_side in sorted(sizes.items(), key=lambda item: -item[1]):
+            thumbnail = image.copy()
+            thumbnail.thumbnail((max_side, max_side), Image.LANCZOS)
+
+            jpeg_name = f"{prefix}-{size_name}.jpg"
+            webp_name = f"{prefix}-{size_name}.webp"
+            _save(thumbnail, os.path.join(media_root, jpeg_name), 'JPEG',
+                  quality=JPEG_QUALITY, optimize=True, progressive=True)
+            _save(thumbnail, os.path.join(media_root, webp_name), 'WEBP',
+                  quality=WEBP_QUALITY, method=4)
+
+            variants[size_name] = {'jpeg': jpeg_name, 'webp': webp_name}
+
+            # Les tailles suivantes sont plus petites : repartir de la miniature
+            image = thumbnail
+
+    return {'width': width, 'height': height, 'variants': variants}
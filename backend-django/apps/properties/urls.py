@@ -6,9 +6,15 @@ Définit tous les endpoints de gestion des biens immobiliers.
 from django.urls import path
 from .views import (
     PropertyListView,
+    PropertyFacetsView,
     PropertyCreateView,
+    PropertyImportView,
     PropertyDetailView,
+    PropertyAvailabilityView,
+    PropertyPhotoListView,
+    PropertyPhotoDetailView,
     PropertyStatsView,
+    RentAnalyticsView,
 )
 
 app_name = 'properties'
@@ -22,10 +28,18 @@ urlpatterns = [
     # Liste des biens (filtrée selon le rôle)
     path('', PropertyListView.as_view(), name='property_list'),
     
+    # GET /api/properties/facets/
+    # Compteurs par ville, type, disponibilité et tranche de loyer
+    path('facets/', PropertyFacetsView.as_view(), name='property_facets'),
+    
     # POST /api/properties/create/
     # Créer un nouveau bien
     path('create/', PropertyCreateView.as_view(), name='property_create'),
     
+    # POST /api/properties/import/
+    # Importer des biens en masse (CSV ou NDJSON)
+    path('import/', PropertyImportView.as_view(), name='property_import'),
+    
     # ==========================================================================
     # DÉTAILS ET MODIFICATION
     # ==========================================================================
@@ -34,6 +48,30 @@ urlpatterns = [
     # Consulter, modifier ou supprimer un bien
     path('<int:pk>/', PropertyDetailView.as_view(), name='property_detail'),
     
+    # GET /api/properties/<id>/availability/?from=YYYY-MM-DD&to=YYYY-MM-DD
+    # Vérifier si le bien est libre sur une période
+    path(
+        '<int:pk>/availability/',
+        PropertyAvailabilityView.as_view(),
+        name='property_availability'
+    ),
+    
+    # ==========================================================================
+    # PHOTOS
+    # ==========================================================================
+    
+    # GET, POST /api/properties/<id>/photos/
+    # Consulter ou ajouter les photos d'un bien
+    path('<int:pk>/photos/', PropertyPhotoListView.as_view(), name='property_photos'),
+    
+    # DELETE /api/properties/<id>/photos/<photo_id>/
+    # Retirer une photo
+    path(
+        '<int:pk>/photos/<int:photo_id>/',
+        PropertyPhotoDetailView.as_view(),
+        name='property_photo_detail'
+    ),
+    
     # ==========================================================================
     # STATISTIQUES
     # ==========================================================================
@@ -41,4 +79,8 @@ urlpatterns = [
     # GET /api/properties/stats/
     # Statistiques des biens
     path('stats/', PropertyStatsView.as_view(), name='property_stats'),
+    
+    # GET /api/properties/analytics/rent/
+    # Loyer au m² par code postal et type de bien (p10, p50, p90, moyenne)
+    path('analytics/rent/', RentAnalyticsView.as_view(), name='rent_analytics'),
 ]
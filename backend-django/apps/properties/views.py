@@ -3,19 +3,30 @@ Vues API pour la gestion des biens immobiliers.
 Fournit les endpoints CRUD pour les propriétés.
 """
 
+from datetime import date
+
 from rest_framework import generics, status, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.db.models import Sum, Count, Q
+from rest_framework.parsers import MultiPartParser, FormParser
+from django.db.models import Exists, OuterRef
 
-from .models import Property
+from .models import Property, PropertyPhoto
 from .serializers import (
     PropertySerializer,
     PropertyCreateSerializer,
     PropertyListSerializer,
     PropertyStatsSerializer,
+    PropertyPhotoSerializer,
 )
+from .filters import filter_properties, normalize_filters
+from .facets import get_facets
+from .analytics import rent_market_stats
+from .importers import PropertyImporter, detect_format, SUPPORTED_FORMATS
+from .photos import ALLOWED_CONTENT_TYPES, PHOTO_MAX_SIZE, add_photos
+from .stats import property_stats
 from apps.accounts.permissions import IsAdminOrAgent, IsAgent
+from apps.tenants.periods import leases_as_of, overlapping_leases, parse_as_of
 
 
 class PropertyListView(generics.ListAPIView):
@@ -34,6 +45,7 @@ class PropertyListView(generics.ListAPIView):
         - is_available: Filtrer par disponibilité (true/false)
         - search: Rechercher par nom ou adresse
         - min_rent / max_rent: Filtrer par fourchette de loyer
+        - as_of: Date (YYYY-MM-DD) : biens existants et disponibilité à cette date
     """
     
     serializer_class = PropertyListSerializer
@@ -41,51 +53,98 @@ class PropertyListView(generics.ListAPIView):
     
     def get_queryset(self):
         """Retourne les biens selon le rôle de l'utilisateur."""
-        user = self.request.user
-        
         # Admin voit tout, agent voit seulement ses biens
-        if user.role == 'admin':
-            queryset = Property.objects.all()
-        else:
-            queryset = Property.objects.filter(agent=user)
+        queryset = Property.objects.for_user(self.request.user)
         
         # Application des filtres
-        params = self.request.query_params
-        
-        # Filtre par ville
-        city = params.get('city')
-        if city:
-            queryset = queryset.filter(city__icontains=city)
-        
-        # Filtre par type de bien
-        property_type = params.get('property_type')
-        if property_type:
-            queryset = queryset.filter(property_type=property_type)
-        
-        # Filtre par disponibilité
-        is_available = params.get('is_available')
-        if is_available is not None:
-            queryset = queryset.filter(is_available=is_available.lower() == 'true')
-        
-        # Recherche textuelle
-        search = params.get('search')
-        if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(address__icontains=search) |
-                Q(city__icontains=search)
+        filters = normalize_filters(self.request.query_params)
+        as_of = parse_as_of(self.request.query_params)
+        if as_of is None:
+            queryset = filter_properties(queryset, filters)
+        else:
+            # Disponibilité à la date demandée (bail en cours à cette date)
+            is_available = filters.pop('is_available', None)
+            queryset = filter_properties(queryset, filters).filter(
+                created_at__date__lte=as_of
+            ).annotate(
+                occupied_as_of=Exists(
+                    leases_as_of(as_of).filter(property_id=OuterRef('pk'))
+                )
             )
+            if is_available is not None:
+                queryset = queryset.filter(occupied_as_of=is_available != 'true')
         
-        # Filtre par fourchette de loyer
-        min_rent = params.get('min_rent')
-        if min_rent:
-            queryset = queryset.filter(monthly_rent__gte=min_rent)
-        
-        max_rent = params.get('max_rent')
-        if max_rent:
-            queryset = queryset.filter(monthly_rent__lte=max_rent)
-        
-        return queryset.select_related('agent')
+        return queryset.select_related('agent').prefetch_related('photos__asset')
+
+
+class PropertyFacetsView(APIView):
+    """
+    Endpoint pour les compteurs du panneau de filtres.
+    
+    GET /api/properties/facets/
+    
+    Accepte les mêmes query params que la liste des biens. Chaque facette
+    est comptée avec tous les filtres actifs sauf le sien.
+    
+    Response:
+        {
+            "filters": {"city": "paris"},
+            "total": 12,
+            "city": [{"value": "Paris", "count": 12}, ...],
+            "property_type": [{"value": "apartment", "label": "Appartement", "count": 8}, ...],
+            "is_available": {"true": 4, "false": 8},
+            "rent": [{"min": 0, "max": 500, "count": 1}, ..., {"min": 3000, "max": null, "count": 0}]
+        }
+    """
+    
+    permission_classes = [IsAdminOrAgent]
+    
+    def get(self, request):
+        """Retourne les facettes pour les filtres demandés."""
+        user = request.user
+        properties = Property.objects.for_user(user)
+        return Response(get_facets(user, properties, request.query_params))
+
+
+class RentAnalyticsView(APIView):
+    """
+    Endpoint pour les statistiques de marché des loyers.
+    
+    GET /api/properties/analytics/rent/
+    
+    Loyer au m² (hors charges) par code postal et type de bien, calculé sur
+    l'ensemble du parc dont la surface est renseignée.
+    
+    Query params:
+        - postal_code: Restreindre à un code postal
+        - property_type: Restreindre à un type de bien
+    
+    Response:
+        {
+            "generated_at": "2024-03-01T10:00:00Z",
+            "results": [
+                {
+                    "postal_code": "75002",
+                    "property_type": "apartment",
+                    "count": 42,
+                    "mean": 31.5,
+                    "p10": 24.1,
+                    "p50": 30.8,
+                    "p90": 39.2
+                }
+            ]
+        }
+    """
+    
+    permission_classes = [IsAdminOrAgent]
+    
+    def get(self, request):
+        """Retourne les statistiques de loyer au m²."""
+        params = request.query_params
+        return Response(rent_market_stats(
+            postal_code=params.get('postal_code') or None,
+            property_type=params.get('property_type') or None,
+        ))
 
 
 class PropertyCreateView(generics.CreateAPIView):
@@ -119,6 +178,59 @@ class PropertyCreateView(generics.CreateAPIView):
         serializer.save(agent=self.request.user)
 
 
+class PropertyImportView(APIView):
+    """
+    Endpoint pour importer des biens en masse.
+    
+    POST /api/properties/import/
+    
+    Accepte un fichier CSV ou NDJSON (multipart, champ "file"). Chaque ligne
+    est validée avec les mêmes règles que la création unitaire et les biens
+    valides sont insérés par lots. L'agent connecté est assigné aux biens.
+    
+    Request body (multipart):
+        - file: Fichier .csv, .ndjson ou .jsonl
+        - format: Format explicite (csv, ndjson) si l'extension est ambiguë
+    
+    Response:
+        {
+            "total_rows": 3,
+            "created": 2,
+            "error_count": 1,
+            "errors": [
+                {"line": 3, "errors": {"monthly_rent": ["Ce champ est obligatoire."]}}
+            ]
+        }
+    """
+    
+    permission_classes = [IsAdminOrAgent]
+    parser_classes = [MultiPartParser, FormParser]
+    
+    def post(self, request):
+        """Importe le fichier envoyé."""
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response(
+                {'error': 'Aucun fichier fourni (champ "file")'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        file_format = request.data.get('format') or detect_format(
+            upload.name, upload.content_type
+        )
+        if file_format not in SUPPORTED_FORMATS:
+            return Response(
+                {'error': 'Format non supporté (csv ou ndjson attendu)'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        importer = PropertyImporter(agent=request.user)
+        report = importer.run(upload.file, file_format)
+        
+        response_status = status.HTTP_201_CREATED if report['created'] else status.HTTP_400_BAD_REQUEST
+        return Response(report, status=response_status)
+
+
 class PropertyDetailView(generics.RetrieveUpdateDestroyAPIView):
     """
     Endpoint pour consulter, modifier ou supprimer un bien.
@@ -137,11 +249,7 @@ class PropertyDetailView(generics.RetrieveUpdateDestroyAPIView):
     
     def get_queryset(self):
         """Retourne les biens accessibles selon le rôle."""
-        user = self.request.user
-        
-        if user.role == 'admin':
-            return Property.objects.all()
-        return Property.objects.filter(agent=user)
+        return Property.objects.for_user(self.request.user).prefetch_related('photos__asset')
     
     def get_serializer_class(self):
         """Utilise le sérialiseur approprié selon la méthode."""
@@ -150,6 +258,159 @@ class PropertyDetailView(generics.RetrieveUpdateDestroyAPIView):
         return PropertySerializer
 
 
+class PropertyPhotoListView(APIView):
+    """
+    Endpoint pour consulter et ajouter les photos d'un bien.
+    
+    GET /api/properties/<id>/photos/
+        Liste des photos avec les URLs des miniatures
+    
+    POST /api/properties/<id>/photos/
+        Ajoute une ou plusieurs photos (multipart, champ "photos" répété).
+        Les miniatures (JPEG et WebP) sont générées en arrière-plan :
+        le statut de chaque photo passe de "pending" à "ready".
+    """
+    
+    permission_classes = [IsAdminOrAgent]
+    parser_classes = [MultiPartParser, FormParser]
+    
+    def get_property(self, request, pk):
+        """Retourne le bien s'il est accessible, None sinon."""
+        return Property.objects.for_user(request.user).filter(pk=pk).first()
+    
+    def get(self, request, pk):
+        """Liste les photos du bien."""
+        property_obj = self.get_property(request, pk)
+        if property_obj is None:
+            return Response(
+                {'error': 'Bien non trouvé'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        photos = property_obj.photos.select_related('asset')
+        return Response(PropertyPhotoSerializer(photos, many=True).data)
+    
+    def post(self, request, pk):
+        """Enregistre les photos envoyées."""
+        property_obj = self.get_property(request, pk)
+        if property_obj is None:
+            return Response(
+                {'error': 'Bien non trouvé'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        uploads = request.FILES.getlist('photos')
+        if not uploads:
+            return Response(
+                {'error': 'Aucune photo fournie (champ "photos")'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Valider tous les fichiers avant d'en stocker un seul
+        errors = {}
+        for upload in uploads:
+            if upload.content_type not in ALLOWED_CONTENT_TYPES:
+                errors[upload.name] = "Format non supporté (JPEG, PNG ou WebP attendu)."
+            elif upload.size > PHOTO_MAX_SIZE:
+                errors[upload.name] = "Fichier trop volumineux."
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+        
+        created = add_photos(property_obj, uploads)
+        photos = PropertyPhoto.objects.filter(
+            pk__in=[photo.pk for photo in created]
+        ).select_related('asset')
+        
+        return Response(
+            PropertyPhotoSerializer(photos, many=True).data,
+            status=status.HTTP_201_CREATED
+        )
+
+
+class PropertyAvailabilityView(APIView):
+    """
+    Endpoint pour vérifier si un bien est libre sur une période.
+    
+    GET /api/properties/<id>/availability/?from=2024-07-01&to=2025-06-30
+    
+    Query params:
+        - from: Premier jour de la période (YYYY-MM-DD)
+        - to: Dernier jour de la période (optionnel, période ouverte sinon)
+    
+    Response:
+        {
+            "property_id": 3,
+            "from": "2024-07-01",
+            "to": "2025-06-30",
+            "is_free": false,
+            "conflicts": [
+                {"id": 12, "tenant_id": 8, "start_date": "2024-01-01", "end_date": null}
+            ]
+        }
+    """
+    
+    permission_classes = [IsAdminOrAgent]
+    
+    # Nombre maximal de baux en conflit retournés
+    MAX_CONFLICTS = 10
+    
+    def get(self, request, pk):
+        """Retourne les baux actifs qui chevauchent la période."""
+        if not Property.objects.for_user(request.user).filter(pk=pk).exists():
+            return Response(
+                {'error': 'Bien non trouvé'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        try:
+            start = date.fromisoformat(request.query_params.get('from', ''))
+            end = request.query_params.get('to')
+            end = date.fromisoformat(end) if end else None
+        except ValueError:
+            return Response(
+                {'error': 'Dates invalides (format attendu : YYYY-MM-DD)'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if end is not None and end < start:
+            return Response(
+                {'error': 'La date de fin doit être postérieure à la date de début.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Une seule sonde sur l'index de la contrainte d'exclusion
+        conflicts = list(
+            overlapping_leases(pk, start, end)
+            .values('id', 'tenant_id', 'start_date', 'end_date')
+            .order_by('start_date')[:self.MAX_CONFLICTS]
+        )
+        return Response({
+            'property_id': pk,
+            'from': start,
+            'to': end,
+            'is_free': not conflicts,
+            'conflicts': conflicts,
+        })
+
+
+class PropertyPhotoDetailView(generics.DestroyAPIView):
+    """
+    Endpoint pour retirer une photo d'un bien.
+    
+    DELETE /api/properties/<id>/photos/<photo_id>/
+    
+    Le fichier reste stocké : il peut être partagé avec d'autres biens.
+    """
+    
+    permission_classes = [IsAdminOrAgent]
+    lookup_url_kwarg = 'photo_id'
+    
+    def get_queryset(self):
+        """Retourne les photos du bien accessibles selon le rôle."""
+        return PropertyPhoto.objects.for_user(self.request.user).filter(
+            property_id=self.kwargs['pk']
+        )
+
+
 class PropertyStatsView(APIView):
     """
     Endpoint pour les statistiques des biens.
@@ -170,35 +431,7 @@ class PropertyStatsView(APIView):
     
     def get(self, request):
         """Calcule et retourne les statistiques des biens."""
-        user = request.user
-        
         # Filtrer les biens selon le rôle
-        if user.role == 'admin':
-            properties = Property.objects.all()
-        else:
-            properties = Property.objects.filter(agent=user)
-        
-        # Calcul des statistiques
-        total = properties.count()
-        available = properties.filter(is_available=True).count()
-        rented = total - available
-        
-        # Revenu mensuel total (loyers des biens occupés)
-        total_revenue = properties.filter(
-            is_available=False
-        ).aggregate(
-            total=Sum('monthly_rent')
-        )['total'] or 0
-        
-        # Taux d'occupation
-        occupancy_rate = (rented / total * 100) if total > 0 else 0
-        
-        stats = {
-            'total_properties': total,
-            'available_properties': available,
-            'rented_properties': rented,
-            'total_monthly_revenue': float(total_revenue),
-            'occupancy_rate': round(occupancy_rate, 2)
-        }
+        stats = property_stats(Property.objects.for_user(request.user))
         
         return Response(stats)
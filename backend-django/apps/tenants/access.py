@@ -0,0 +1,74 @@
+"""
+Maintenance de la table d'accès agent → locataire (AgentTenantAccess).
+
+Un agent a accès à un locataire si celui-ci a une assignation (active ou
+terminée) sur un de ses biens. Les accès d'un ensemble de locataires sont
+recalculés en quelques requêtes ensemblistes, une fois par transaction.
+"""
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Q
+
+from .deferred import defer_per_transaction
+
+
+def sync_tenant_access(tenant_ids):
+    """
+    Recalcule les accès des locataires donnés.
+
+    Args:
+        tenant_ids: Identifiants des locataires
+
+    Returns:
+        tuple: (nombre d'accès créés, nombre d'accès supprimés)
+    """
+    from .models import AgentTenantAccess, TenantAssignment
+
+    tenant_ids = list(tenant_ids)
+    if not tenant_ids:
+        return 0, 0
+
+    expected = set(
+        TenantAssignment.objects.filter(tenant_id__in=tenant_ids)
+        .values_list('property__agent_id', 'tenant_id')
+        .distinct()
+        .order_by()
+    )
+    current = set(
+        AgentTenantAccess.objects.filter(tenant_id__in=tenant_ids)
+        .values_list('agent_id', 'tenant_id')
+    )
+
+    missing = expected - current
+    if missing:
+        AgentTenantAccess.objects.bulk_create(
+            [AgentTenantAccess(agent_id=agent_id, tenant_id=tenant_id)
+             for agent_id, tenant_id in missing],
+            ignore_conflicts=True
+        )
+
+    stale = current - expected
+    if stale:
+        condition = Q()
+        for agent_id, tenant_id in stale:
+            condition |= Q(agent_id=agent_id, tenant_id=tenant_id)
+        AgentTenantAccess.objects.filter(condition).delete()
+
+    return len(missing), len(stale)
+
+
+def schedule_access_sync(tenant_ids, using=DEFAULT_DB_ALIAS):
+    """Planifie le recalcul des accès à la fin de la transaction."""
+    defer_per_transaction(sync_tenant_access, tenant_ids, using=using)
+
+
+def tenant_ids_for_properties(property_ids):
+    """Retourne les locataires ayant une assignation sur les biens donnés."""
+    from .models import TenantAssignment
+
+    return set(
+        TenantAssignment.objects.filter(property_id__in=property_ids)
+        .values_list('tenant_id', flat=True)
+        .distinct()
+        .order_by()
+    )
@@ -3,7 +3,7 @@ Configuration de l'interface d'administration Django pour les locataires.
 """
 
 from django.contrib import admin
-from .models import TenantAssignment
+from .models import AgentTenantAccess, TenantAssignment
 
 
 @admin.register(TenantAssignment)
@@ -48,3 +48,20 @@ class TenantAssignmentAdmin(admin.ModelAdmin):
     )
     
     autocomplete_fields = ['tenant', 'property', 'agent']
+
+
+@admin.register(AgentTenantAccess)
+class AgentTenantAccessAdmin(admin.ModelAdmin):
+    """
+    Configuration de l'admin pour les accès agent-locataire (lecture seule).
+    """
+    
+    list_display = ['agent', 'tenant']
+    search_fields = ['agent__email', 'tenant__email']
+    raw_id_fields = ['agent', 'tenant']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -9,3 +9,13 @@ class TenantsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.tenants'
     verbose_name = 'Gestion des locataires'
+    
+    def ready(self):
+        """Enregistre les signaux de l'application."""
+        from django.db.models.signals import pre_migrate
+        
+        from . import signals  # noqa: F401
+        from .periods import create_btree_gist
+        
+        # La contrainte d'exclusion des baux requiert l'extension btree_gist
+        pre_migrate.connect(create_btree_gist, sender=self)
@@ -0,0 +1,70 @@
+"""
+Maintenance de la disponibilité des biens (Property.is_available).
+
+Un bien est disponible s'il n'a aucune assignation active. La disponibilité
+est recalculée par des requêtes ensemblistes, une fois par transaction et
+par bien touché, uniquement lorsque l'ensemble des baux actifs change.
+"""
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Exists, F, OuterRef
+
+from apps.properties.facets import invalidate_facets
+from apps.properties.models import Property
+from .deferred import defer_per_transaction
+
+
+def _active_assignments():
+    """Sous-requête des assignations actives d'un bien."""
+    from .models import TenantAssignment
+
+    return TenantAssignment.objects.filter(property=OuterRef('pk'), is_active=True)
+
+
+def find_drift(property_ids):
+    """
+    Retourne les biens dont la disponibilité ne correspond pas aux baux actifs.
+
+    Args:
+        property_ids: Identifiants des biens à vérifier
+
+    Returns:
+        list: Identifiants des biens incohérents
+    """
+    return list(
+        Property.objects.filter(pk__in=property_ids)
+        .annotate(has_active=Exists(_active_assignments()))
+        .filter(is_available=F('has_active'))
+        .values_list('pk', flat=True)
+    )
+
+
+def refresh_availability(property_ids):
+    """
+    Recalcule la disponibilité des biens en deux requêtes UPDATE.
+
+    Seules les lignes incohérentes sont réécrites.
+
+    Args:
+        property_ids: Identifiants des biens à recalculer
+
+    Returns:
+        int: Nombre de biens modifiés
+    """
+    property_ids = list(property_ids)
+    if not property_ids:
+        return 0
+
+    active = Exists(_active_assignments())
+    properties = Property.objects.filter(pk__in=property_ids)
+    changed = properties.filter(active, is_available=True).update(is_available=False)
+    changed += properties.filter(~active, is_available=False).update(is_available=True)
+
+    if changed:
+        invalidate_facets()
+    return changed
+
+
+def schedule_availability_refresh(property_ids, using=DEFAULT_DB_ALIAS):
+    """Planifie le recalcul de la disponibilité à la fin de la transaction."""
+    defer_per_transaction(refresh_availability, property_ids, using=using)
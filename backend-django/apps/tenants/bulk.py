@@ -0,0 +1,119 @@
+"""
+Opérations groupées sur les baux (fin et renouvellement).
+
+Chaque opération vérifie les droits en une requête, applique les
+modifications par des UPDATE ensemblistes dans une seule transaction, et la
+disponibilité des biens concernés est recalculée une seule fois à la fin de
+la transaction (voir TenantAssignmentQuerySet.update).
+"""
+
+from django.db import transaction
+from django.db.models import Case, DateField, DecimalField, F, Value, When
+from django.utils import timezone
+
+
+def _split_accessible(queryset, ids):
+    """
+    Sépare les identifiants accessibles des autres, en une requête.
+
+    Returns:
+        tuple: (états {id: (is_active, start_date)}, identifiants introuvables)
+    """
+    states = {
+        pk: (is_active, start_date)
+        for pk, is_active, start_date in queryset.filter(pk__in=ids)
+        .values_list('pk', 'is_active', 'start_date')
+        .order_by()
+    }
+    not_found = [pk for pk in ids if pk not in states]
+    return states, not_found
+
+
+@transaction.atomic
+def bulk_end(queryset, ids, end_date=None):
+    """
+    Termine plusieurs baux.
+
+    Args:
+        queryset: Assignations accessibles à l'utilisateur
+        ids: Identifiants des assignations
+        end_date: Date de fin enregistrée (aujourd'hui par défaut)
+
+    Returns:
+        dict: Résumé (terminés, déjà terminés, introuvables, invalides)
+    """
+    end_date = end_date or timezone.localdate()
+    states, not_found = _split_accessible(queryset, ids)
+
+    active = [pk for pk, (is_active, _) in states.items() if is_active]
+    already_ended = [pk for pk, (is_active, _) in states.items() if not is_active]
+    invalid = [pk for pk in active if states[pk][1] > end_date]
+    to_end = [pk for pk in active if states[pk][1] <= end_date]
+
+    ended = 0
+    if to_end:
+        ended = queryset.model.objects.filter(pk__in=to_end).update(
+            is_active=False, end_date=end_date, updated_at=timezone.now()
+        )
+
+    return {
+        'ended': ended,
+        'already_ended': already_ended,
+        'invalid': invalid,
+        'not_found': not_found,
+    }
+
+
+@transaction.atomic
+def bulk_renew(queryset, items):
+    """
+    Renouvelle plusieurs baux actifs (nouvelle date de fin, loyer éventuel).
+
+    Toutes les lignes sont modifiées par un seul UPDATE utilisant CASE/WHEN.
+
+    Args:
+        queryset: Assignations accessibles à l'utilisateur
+        items: Liste de {'id', 'end_date', 'rent_amount' (optionnel)}
+
+    Returns:
+        dict: Résumé (renouvelés, inactifs, introuvables, invalides)
+    """
+    items = {item['id']: item for item in items}
+    states, not_found = _split_accessible(queryset, list(items))
+
+    inactive = [pk for pk, (is_active, _) in states.items() if not is_active]
+    invalid = [
+        pk for pk, (is_active, start_date) in states.items()
+        if is_active and items[pk]['end_date'] < start_date
+    ]
+    to_renew = [
+        pk for pk, (is_active, start_date) in states.items()
+        if is_active and items[pk]['end_date'] >= start_date
+    ]
+
+    renewed = 0
+    if to_renew:
+        changes = {
+            'end_date': Case(
+                *[When(pk=pk, then=Value(items[pk]['end_date'])) for pk in to_renew],
+                output_field=DateField()
+            )
+        }
+        rents = [pk for pk in to_renew if items[pk].get('rent_amount') is not None]
+        if rents:
+            # Les baux sans nouveau loyer conservent leur montant
+            changes['rent_amount'] = Case(
+                *[When(pk=pk, then=Value(items[pk]['rent_amount'])) for pk in rents],
+                default=F('rent_amount'),
+                output_field=DecimalField(max_digits=10, decimal_places=2)
+            )
+        renewed = queryset.model.objects.filter(pk__in=to_renew).update(
+            updated_at=timezone.now(), **changes
+        )
+
+    return {
+        'renewed': renewed,
+        'inactive': inactive,
+        'invalid': invalid,
+        'not_found': not_found,
+    }
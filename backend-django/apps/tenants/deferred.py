@@ -0,0 +1,69 @@
+"""
+Recalculs différés à la fin de la transaction.
+
+Les écritures sur les assignations déclenchent des recalculs (disponibilité
+des biens, etc.). Plutôt que de les exécuter à chaque sauvegarde, les clés
+concernées sont accumulées et le recalcul est lancé une seule fois, après la
+validation de la transaction. Hors transaction, il est exécuté immédiatement.
+"""
+
+import threading
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+_local = threading.local()
+
+
+class _Flush:
+    """Rappel on_commit qui exécute un recalcul sur les clés accumulées."""
+
+    def __init__(self, func, using):
+        self.func = func
+        self.using = using
+        self.keys = set()
+
+    def __call__(self):
+        _slots().pop((self.using, self.func), None)
+        self.func(self.keys)
+
+
+def _slots():
+    """Retourne les recalculs en attente du thread courant."""
+    if not hasattr(_local, 'slots'):
+        _local.slots = {}
+    return _local.slots
+
+
+def _is_registered(connection, flush):
+    """Vérifie que le rappel est toujours planifié (pas annulé par un rollback)."""
+    return any(entry[1] is flush for entry in connection.run_on_commit)
+
+
+def defer_per_transaction(func, keys, using=DEFAULT_DB_ALIAS):
+    """
+    Planifie func(keys) une seule fois pour la transaction en cours.
+
+    Les clés passées par plusieurs appels au sein de la même transaction sont
+    fusionnées. Après un rollback, les clés accumulées sont abandonnées avec
+    la transaction.
+
+    Args:
+        func: Fonction appelée avec l'ensemble des clés
+        keys: Clés à recalculer (les valeurs None sont ignorées)
+        using: Alias de la base de données
+    """
+    keys = {key for key in keys if key is not None}
+    if not keys:
+        return
+
+    connection = connections[using]
+    if not connection.in_atomic_block:
+        func(keys)
+        return
+
+    slots = _slots()
+    flush = slots.get((using, func))
+    if flush is None or not _is_registered(connection, flush):
+        flush = slots[(using, func)] = _Flush(func, using)
+        transaction.on_commit(flush, using=using)
+    flush.keys.update(keys)
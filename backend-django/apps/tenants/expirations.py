@@ -0,0 +1,88 @@
+"""
+Échéances des baux : baux arrivant à terme et clôture des baux expirés.
+
+Les deux opérations s'appuient sur l'index partiel des baux actifs par
+date de fin (active_assignment_end_idx).
+"""
+
+from datetime import timedelta
+
+from django.db.models import F, Value
+from django.db.models.functions import Concat
+from django.utils import timezone
+
+from .models import TenantAssignment
+
+
+# Horizons de regroupement des échéances (jours)
+HORIZONS = (30, 60, 90)
+
+
+def upcoming_expirations(queryset, today=None, horizons=HORIZONS):
+    """
+    Regroupe les baux actifs arrivant à terme par horizon.
+
+    Un bail apparaît dans le premier horizon qui contient sa date de fin
+    (0-30 jours, 31-60 jours, 61-90 jours).
+
+    Args:
+        queryset: Assignations accessibles (déjà restreintes selon le rôle)
+        today: Date de référence (aujourd'hui par défaut)
+        horizons: Horizons croissants en jours
+
+    Returns:
+        dict: Date de référence, compteurs et baux par horizon
+    """
+    today = today or timezone.localdate()
+    limit = today + timedelta(days=horizons[-1])
+
+    rows = (
+        queryset
+        .filter(is_active=True, end_date__gte=today, end_date__lte=limit)
+        .annotate(
+            tenant_name=Concat(
+                F('tenant__first_name'), Value(' '), F('tenant__last_name')
+            ),
+            property_name=F('property__name'),
+        )
+        .values(
+            'id', 'tenant_id', 'tenant_name', 'property_id', 'property_name',
+            'rent_amount', 'end_date'
+        )
+        .order_by('end_date', 'id')
+    )
+
+    groups = {str(days): [] for days in horizons}
+    for row in rows:
+        row['days_left'] = (row['end_date'] - today).days
+        for days in horizons:
+            if row['days_left'] <= days:
+                groups[str(days)].append(row)
+                break
+
+    return {
+        'today': today,
+        'counts': {days: len(leases) for days, leases in groups.items()},
+        'horizons': groups,
+    }
+
+
+def expired_leases(today=None):
+    """Retourne les baux actifs dont la date de fin est dépassée."""
+    today = today or timezone.localdate()
+    return TenantAssignment.objects.filter(is_active=True, end_date__lt=today)
+
+
+def close_expired_leases(today=None):
+    """
+    Termine en masse les baux actifs dont la date de fin est dépassée.
+
+    La clôture est un UPDATE ensembliste : TenantAssignmentQuerySet.update
+    planifie le recalcul de la disponibilité des biens concernés (deux UPDATE)
+    à la fin de la transaction, sans save() ligne par ligne. updated_at est
+    renseigné comme dans bulk_end (update() ne passe pas par auto_now).
+
+    Returns:
+        int: Nombre de baux clôturés
+    """
+    return expired_leases(today).update(is_active=False, updated_at=timezone.now())
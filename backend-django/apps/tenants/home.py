@@ -0,0 +1,90 @@
+"""
+Page d'accueil du portail locataire.
+
+Regroupe en une réponse le logement, le contact de l'agent, la prochaine
+échéance, le solde et les derniers paiements, en deux requêtes :
+- le bail actif, avec le bien et l'agent joints
+- les derniers paiements et toutes les échéances impayées, avec leur bien
+
+Le solde et la prochaine échéance sont calculés sur les échéances impayées
+déjà chargées. Le résultat est mis en cache par locataire et invalidé avec
+ses tableaux de bord (bail, paiements, bien, coordonnées de l'agent).
+"""
+
+from datetime import date
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from apps.accounts.dashboard import cache_timeout, home_cache_key
+from apps.payments.models import Payment
+from apps.payments.serializers import TenantPaymentSerializer
+from .models import TenantAssignment
+from .serializers import TenantPropertyViewSerializer
+
+# Nombre de derniers paiements (défaut et maximum)
+DEFAULT_RECENT_PAYMENTS = 5
+MAX_RECENT_PAYMENTS = 50
+
+
+def build_tenant_home(tenant, limit=DEFAULT_RECENT_PAYMENTS, today=None):
+    """
+    Calcule la page d'accueil d'un locataire (2 requêtes).
+
+    Args:
+        tenant: Locataire connecté
+        limit: Nombre de derniers paiements
+        today: Date de référence (aujourd'hui par défaut)
+
+    Returns:
+        dict: Bail, prochaine échéance, solde et derniers paiements
+    """
+    today = today or date.today()
+
+    lease = TenantAssignment.objects.for_user(tenant).filter(
+        is_active=True
+    ).select_related('property__agent').order_by('-start_date').first()
+
+    payments = Payment.objects.for_user(tenant)
+    unpaid = ~Q(status=Payment.Status.PAID)
+    recent_ids = payments.order_by('-due_date', '-id').values('id')[:limit]
+    rows = list(
+        payments.filter(unpaid | Q(pk__in=recent_ids)).select_related('assignment__property')
+    )
+
+    recent = sorted(rows, key=lambda payment: (payment.due_date, payment.id), reverse=True)[:limit]
+    pending = sorted(
+        (payment for payment in rows if payment.status != Payment.Status.PAID),
+        key=lambda payment: (payment.due_date, payment.id)
+    )
+    next_payment = None
+    if pending:
+        next_payment = dict(TenantPaymentSerializer(pending[0]).data)
+        next_payment['is_late'] = pending[0].due_date < today
+
+    return {
+        'lease': TenantPropertyViewSerializer(lease).data if lease is not None else None,
+        'next_payment': next_payment,
+        'balance': float(sum(payment.amount for payment in pending)),
+        'overdue_total': float(sum(
+            payment.amount for payment in pending if payment.due_date < today
+        )),
+        'recent_payments': list(TenantPaymentSerializer(recent, many=True).data),
+    }
+
+
+def get_tenant_home(tenant, limit=DEFAULT_RECENT_PAYMENTS, today=None):
+    """Retourne la page d'accueil du locataire, depuis le cache si possible."""
+    today = today or date.today()
+    limit = max(1, min(limit, MAX_RECENT_PAYMENTS))
+
+    cache_key = home_cache_key(tenant.pk)
+    cached = cache.get(cache_key) or {}
+    entry = cached.get(limit)
+    if entry is not None and entry[0] == today:
+        return entry[1]
+
+    home = build_tenant_home(tenant, limit, today)
+    cached[limit] = (today, home)
+    cache.set(cache_key, cached, cache_timeout())
+    return home
@@ -0,0 +1,64 @@
+"""
+Commande de reconstruction de la table d'accès agent → locataire.
+
+Recalcule les accès à partir des assignations, par lots de locataires.
+À lancer après le déploiement de la table, puis en cas de doute.
+
+Usage :
+    python manage.py backfill_tenant_access
+    python manage.py backfill_tenant_access --batch-size 5000
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.tenants.access import sync_tenant_access
+from apps.tenants.models import AgentTenantAccess
+
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """Reconstruit les accès agent → locataire à partir des assignations."""
+
+    help = "Reconstruit la table d'accès agent → locataire."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help="Nombre de locataires traités par lot"
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_pk = 0
+        checked = 0
+        created = 0
+        deleted = 0
+
+        while True:
+            # Pagination par clé primaire sur les utilisateurs
+            batch = list(
+                User.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1]
+            checked += len(batch)
+
+            with transaction.atomic():
+                batch_created, batch_deleted = sync_tenant_access(batch)
+            created += batch_created
+            deleted += batch_deleted
+
+        total = AgentTenantAccess.objects.count()
+        self.stdout.write(self.style.SUCCESS(
+            f"{checked} utilisateurs vérifiés, {created} accès créés, "
+            f"{deleted} supprimés ({total} au total)"
+        ))
@@ -0,0 +1,63 @@
+"""
+Commande de vérification de la disponibilité des biens.
+
+Compare Property.is_available aux baux actifs, par lots d'identifiants,
+et corrige les écarts avec --fix.
+
+Usage :
+    python manage.py check_availability
+    python manage.py check_availability --fix --batch-size 5000
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.properties.models import Property
+from apps.tenants.availability import find_drift, refresh_availability
+
+
+class Command(BaseCommand):
+    """Détecte et corrige les incohérences de disponibilité des biens."""
+
+    help = "Vérifie (et corrige avec --fix) la disponibilité des biens."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help="Corrige les biens incohérents"
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help="Nombre de biens vérifiés par lot"
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_pk = 0
+        checked = 0
+        drifted = 0
+        fixed = 0
+
+        while True:
+            # Pagination par clé primaire : coût constant quel que soit le lot
+            batch = list(
+                Property.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1]
+            checked += len(batch)
+
+            drift = find_drift(batch)
+            drifted += len(drift)
+            if drift and options['fix']:
+                fixed += refresh_availability(drift)
+
+        message = f"{checked} biens vérifiés, {drifted} incohérents"
+        if options['fix']:
+            message += f", {fixed} corrigés"
+        self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,53 @@
+"""
+Commande de clôture des baux expirés.
+
+Termine tous les baux actifs dont la date de fin est dépassée et met à jour
+la disponibilité des biens, en requêtes ensemblistes. À planifier une fois
+par jour (cron, timer systemd...).
+
+Usage :
+    python manage.py close_expired_leases
+    python manage.py close_expired_leases --dry-run
+    python manage.py close_expired_leases --date 2024-07-01
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.tenants.expirations import close_expired_leases, expired_leases
+
+
+class Command(BaseCommand):
+    """Termine les baux actifs dont la date de fin est dépassée."""
+
+    help = "Clôture les baux expirés et met à jour la disponibilité des biens."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            help="Date de référence au format YYYY-MM-DD (aujourd'hui par défaut)"
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Affiche le nombre de baux concernés sans les modifier"
+        )
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            try:
+                today = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError("Date invalide (format attendu : YYYY-MM-DD)")
+
+        if options['dry_run']:
+            count = expired_leases(today).count()
+            self.stdout.write(f"{count} baux expirés seraient clôturés")
+            return
+
+        with transaction.atomic():
+            closed = close_expired_leases(today)
+        self.stdout.write(self.style.SUCCESS(f"{closed} baux expirés clôturés"))
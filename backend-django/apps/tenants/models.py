@@ -5,7 +5,111 @@ Gère la relation entre locataires et propriétés.
 
 from django.db import models
 from django.conf import settings
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.indexes import GistIndex
+from django.contrib.postgres.fields import RangeOperators
+from apps.accounts.dashboard import invalidate_dashboards
+from apps.accounts.scoping import ScopedQuerySetMixin
 from apps.properties.models import Property
+from .access import schedule_access_sync
+from .availability import schedule_availability_refresh
+from .periods import OVERLAP_CONSTRAINT, LeasePeriod
+
+
+# Champs dont la modification peut changer l'ensemble des baux actifs d'un bien
+AVAILABILITY_FIELDS = {'is_active', 'property', 'property_id'}
+
+# Champs dont la modification peut changer les accès agent → locataire
+ACCESS_FIELDS = {'tenant', 'tenant_id', 'property', 'property_id'}
+
+# Champs affichés dans les tableaux de bord (apps.accounts.dashboard)
+DASHBOARD_FIELDS = AVAILABILITY_FIELDS | ACCESS_FIELDS | {
+    'start_date', 'end_date', 'rent_amount', 'deposit'
+}
+
+
+def _pk(value):
+    """Retourne la clé primaire d'une instance ou la valeur elle-même."""
+    return getattr(value, 'pk', value)
+
+
+class TenantAssignmentQuerySet(ScopedQuerySetMixin, models.QuerySet):
+    """
+    QuerySet des assignations.
+    
+    for_user : baux des biens de l'agent, ou baux du locataire.
+    
+    Les opérations en masse (update, bulk_create, bulk_update) ne passent pas
+    par save() : elles planifient elles-mêmes le recalcul de la disponibilité
+    des biens et des accès agent → locataire concernés, et l'invalidation des
+    tableaux de bord.
+    """
+    
+    agent_lookup = 'property__agent_id'
+    tenant_lookup = 'tenant_id'
+    
+    def update(self, **kwargs):
+        """Met à jour en masse et recalcule les données dérivées si nécessaire."""
+        fields = set(kwargs)
+        if not DASHBOARD_FIELDS & fields:
+            return super().update(**kwargs)
+        
+        # Seules les lignes dont l'état actif change modifient la disponibilité
+        touched = self
+        if fields == {'is_active'}:
+            touched = self.exclude(is_active=kwargs['is_active'])
+        before = list(touched.values_list('property_id', 'tenant_id'))
+        
+        rows = super().update(**kwargs)
+        if not before:
+            return rows
+        
+        property_ids = {property_id for property_id, _ in before}
+        tenant_ids = {tenant_id for _, tenant_id in before}
+        property_ids.add(_pk(kwargs.get('property', kwargs.get('property_id'))))
+        tenant_ids.add(_pk(kwargs.get('tenant', kwargs.get('tenant_id'))))
+        
+        if AVAILABILITY_FIELDS & fields:
+            schedule_availability_refresh(property_ids, using=self.db)
+        if ACCESS_FIELDS & fields:
+            schedule_access_sync(tenant_ids, using=self.db)
+        invalidate_dashboards(users=tenant_ids, properties=property_ids, using=self.db)
+        return rows
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        """Crée en masse et recalcule les données dérivées des baux créés."""
+        objs = super().bulk_create(objs, *args, **kwargs)
+        schedule_availability_refresh(
+            {obj.property_id for obj in objs if obj.is_active},
+            using=self.db
+        )
+        schedule_access_sync({obj.tenant_id for obj in objs}, using=self.db)
+        invalidate_dashboards(
+            users={obj.tenant_id for obj in objs},
+            properties={obj.property_id for obj in objs},
+            using=self.db
+        )
+        return objs
+    
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        """Met à jour en masse et recalcule les données dérivées si nécessaire."""
+        rows = super().bulk_update(objs, fields, *args, **kwargs)
+        fields = set(fields)
+        if AVAILABILITY_FIELDS & fields:
+            property_ids = set()
+            for obj in objs:
+                property_ids.add(obj.property_id)
+                property_ids.add(getattr(obj, '_loaded_state', {}).get('property_id'))
+            schedule_availability_refresh(property_ids, using=self.db)
+        if ACCESS_FIELDS & fields:
+            tenant_ids = set()
+            for obj in objs:
+                tenant_ids.add(obj.tenant_id)
+                tenant_ids.add(getattr(obj, '_loaded_state', {}).get('tenant_id'))
+            schedule_access_sync(tenant_ids, using=self.db)
+        if DASHBOARD_FIELDS & fields:
+            invalidate_dashboards(assignments={obj.pk for obj in objs}, using=self.db)
+        return rows
 
 
 class TenantAssignment(models.Model):
@@ -101,6 +205,8 @@ class TenantAssignment(models.Model):
     created_at = models.DateTimeField('Date de création', auto_now_add=True)
     updated_at = models.DateTimeField('Dernière modification', auto_now=True)
     
+    objects = TenantAssignmentQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Assignation locataire'
         verbose_name_plural = 'Assignations locataires'
@@ -112,7 +218,27 @@ class TenantAssignment(models.Model):
                 fields=['tenant', 'property'],
                 condition=models.Q(is_active=True),
                 name='unique_active_tenant_property'
-            )
+            ),
+            # Deux baux actifs d'un même bien ne peuvent pas se chevaucher
+            ExclusionConstraint(
+                name=OVERLAP_CONSTRAINT,
+                expressions=[
+                    ('property', RangeOperators.EQUAL),
+                    (LeasePeriod(), RangeOperators.OVERLAPS),
+                ],
+                condition=models.Q(is_active=True)
+            ),
+        ]
+        
+        indexes = [
+            # Index partiel des baux actifs par date de fin (échéances, clôtures)
+            models.Index(
+                fields=['end_date'],
+                condition=models.Q(is_active=True),
+                name='active_assignment_end_idx'
+            ),
+            # Index d'intervalles sur les périodes (requêtes à une date donnée)
+            GistIndex(LeasePeriod(), name='assignment_period_gist_idx'),
         ]
     
     def __str__(self):
@@ -120,15 +246,85 @@ class TenantAssignment(models.Model):
         status = "actif" if self.is_active else "terminé"
         return f"{self.tenant.get_full_name()} → {self.property.name} ({status})"
     
+    # Champs mémorisés au chargement pour détecter les changements
+    TRACKED_FIELDS = ('is_active', 'property_id', 'tenant_id')
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Mémorise l'état chargé pour détecter les changements de bail."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_state = {
+            name: instance.__dict__.get(name) for name in cls.TRACKED_FIELDS
+        }
+        return instance
+    
     def save(self, *args, **kwargs):
         """
-        Surcharge de la sauvegarde pour mettre à jour la disponibilité du bien.
+        Surcharge de la sauvegarde pour maintenir les données dérivées.
+        
+        - Disponibilité du bien : recalculée uniquement si l'ensemble des baux
+          actifs change (création d'un bail actif, fin de bail, changement de bien)
+        - Accès agent → locataire : recalculés si le locataire ou le bien change
+        
+        Les recalculs sont exécutés une seule fois à la fin de la transaction.
         """
+        # État au chargement (vide pour une assignation non enregistrée)
+        loaded = getattr(self, '_loaded_state', {})
+        previous = loaded.get('property_id') if loaded.get('is_active') else None
+        
         super().save(*args, **kwargs)
         
-        # Mettre à jour la disponibilité du bien
-        has_active_tenants = self.property.tenant_assignments.filter(
-            is_active=True
-        ).exists()
-        self.property.is_available = not has_active_tenants
-        self.property.save(update_fields=['is_available'])
+        using = self._state.db
+        current = self.property_id if self.is_active else None
+        if previous != current:
+            schedule_availability_refresh({previous, current}, using=using)
+            
+            # Un bail actif rend le bien indisponible : refléter l'état en mémoire
+            if current is not None and 'property' in self._state.fields_cache:
+                self.property.is_available = False
+        
+        if (loaded.get('property_id'), loaded.get('tenant_id')) != (self.property_id, self.tenant_id):
+            schedule_access_sync({loaded.get('tenant_id'), self.tenant_id}, using=using)
+        
+        self._loaded_state = {
+            name: getattr(self, name) for name in self.TRACKED_FIELDS
+        }
+
+
+class AgentTenantAccess(models.Model):
+    """
+    Accès d'un agent à un locataire.
+    
+    Table dénormalisée : un couple (agent, locataire) existe dès que le
+    locataire a (ou a eu) une assignation sur un bien de l'agent. Elle est
+    maintenue à partir des assignations et des changements d'agent des biens,
+    et sert au filtrage des locataires visibles par un agent.
+    """
+    
+    agent = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='tenant_access',
+        verbose_name='Agent'
+    )
+    tenant = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='agent_access',
+        verbose_name='Locataire'
+    )
+    
+    class Meta:
+        verbose_name = 'Accès agent-locataire'
+        verbose_name_plural = 'Accès agent-locataire'
+        
+        # Index composite (agent, locataire) porté par la contrainte d'unicité
+        constraints = [
+            models.UniqueConstraint(
+                fields=['agent', 'tenant'],
+                name='unique_agent_tenant_access'
+            )
+        ]
+    
+    def __str__(self):
+        return f"Agent {self.agent_id} → locataire {self.tenant_id}"
@@ -0,0 +1,76 @@
+"""
+Arrivée d'un locataire en une seule transaction.
+
+Crée le compte du locataire, son bail et ses premières échéances (dépôt de
+garantie et premier loyer au prorata). En cas d'erreur, rien n'est enregistré.
+"""
+
+from datetime import date
+
+from django.db import transaction
+
+from apps.payments.models import Payment
+from apps.payments.schedule import lease_schedule
+from .models import TenantAssignment
+
+
+def initial_payments(assignment, today=None):
+    """
+    Construit les premières échéances d'un bail (non enregistrées).
+
+    - Dépôt de garantie (s'il est non nul), exigible à l'entrée
+    - Loyer du premier mois charges comprises, au prorata des jours occupés
+
+    Args:
+        assignment: Bail (bien préchargé)
+        today: Date de référence pour le statut en retard
+
+    Returns:
+        list: Instances de Payment
+    """
+    today = today or date.today()
+    start_date = assignment.start_date
+
+    payments = []
+    if assignment.deposit:
+        payments.append(Payment(
+            assignment=assignment,
+            kind=Payment.Kind.DEPOSIT,
+            amount=assignment.deposit,
+            due_date=start_date,
+            # bulk_create ne passe pas par Payment.save() : statut calculé ici
+            status=Payment.Status.OVERDUE if start_date < today else Payment.Status.PENDING,
+            notes="Dépôt de garantie"
+        ))
+
+    lease = (
+        assignment.pk, start_date, assignment.end_date,
+        assignment.rent_amount, assignment.property.charges
+    )
+    for payment in lease_schedule(lease, start_date.replace(day=1), 1, today=today):
+        payment.assignment = assignment
+        payments.append(payment)
+    return payments
+
+
+@transaction.atomic
+def onboard_tenant(agent, tenant_serializer, lease_data):
+    """
+    Crée le locataire, son bail et ses premières échéances.
+
+    Args:
+        agent: Agent créateur du bail
+        tenant_serializer: UserCreateSerializer déjà validé
+        lease_data: Données validées du bail (sans le locataire)
+
+    Returns:
+        tuple: (locataire, bail, échéances)
+    """
+    tenant = tenant_serializer.save(role='tenant')
+    assignment = TenantAssignment.objects.create(
+        tenant=tenant,
+        agent=agent,
+        **lease_data
+    )
+    payments = Payment.objects.bulk_create(initial_payments(assignment))
+    return tenant, assignment, payments
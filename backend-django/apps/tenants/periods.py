@@ -0,0 +1,186 @@
+"""
+Périodes de bail et détection des chevauchements (PostgreSQL).
+
+La période d'un bail est le intervalle daterange [start_date, end_date]
+(bornes incluses, fin ouverte si end_date est vide). Une contrainte
+d'exclusion GiST interdit deux baux actifs qui se chevauchent sur un même
+bien ; les vérifications de chevauchement utilisent le même index.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.postgres.fields import DateRangeField
+from django.db import connections
+from django.db.models import F, Func, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from psycopg2.extras import DateRange
+from rest_framework.exceptions import ValidationError
+
+
+# Nom de la contrainte d'exclusion des baux actifs qui se chevauchent
+OVERLAP_CONSTRAINT = 'exclude_overlapping_active_leases'
+
+# Message renvoyé au client en cas de chevauchement
+OVERLAP_MESSAGE = "Ce bien a déjà un bail actif sur cette période."
+
+# Contrainte d'unicité du bail actif d'un locataire sur un bien
+ACTIVE_LEASE_CONSTRAINT = 'unique_active_tenant_property'
+ACTIVE_LEASE_MESSAGE = "Ce locataire a déjà un bail actif pour ce bien."
+
+# Clé étrangère violée (bien, locataire ou agent supprimé entre-temps)
+MISSING_RELATION_MESSAGE = "Le bien, le locataire ou l'agent n'existe plus."
+
+# Codes SQLSTATE PostgreSQL des violations traduites
+FOREIGN_KEY_VIOLATION = '23503'
+UNIQUE_VIOLATION = '23505'
+
+
+class LeasePeriod(Func):
+    """Expression SQL daterange(start_date, end_date, '[]') d'un bail."""
+    
+    function = 'DATERANGE'
+    output_field = DateRangeField()
+    
+    def __init__(self, start='start_date', end='end_date', **extra):
+        super().__init__(F(start), F(end), Value('[]'), **extra)
+
+
+def lease_range(start, end=None):
+    """Retourne l'intervalle [start, end] (fin ouverte si end est None)."""
+    return DateRange(start, end, '[]')
+
+
+def overlapping_leases(property_id, start, end=None, exclude_pk=None):
+    """
+    Retourne les baux actifs d'un bien qui chevauchent [start, end].
+
+    La requête (property_id = ... AND période && intervalle, sur les baux
+    actifs) correspond exactement à l'index de la contrainte d'exclusion.
+    """
+    from .models import TenantAssignment
+
+    queryset = TenantAssignment.objects.annotate(period=LeasePeriod()).filter(
+        property_id=property_id,
+        is_active=True,
+        period__overlap=lease_range(start, end)
+    )
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+    return queryset
+
+
+def is_property_free(property_id, start, end=None):
+    """Indique si un bien n'a aucun bail actif sur [start, end]."""
+    return not overlapping_leases(property_id, start, end).exists()
+
+
+def parse_as_of(params):
+    """
+    Lit le paramètre as_of (YYYY-MM-DD) d'une requête.
+
+    Returns:
+        date: Date demandée, None si le paramètre est absent
+
+    Raises:
+        ValidationError: Si la date est invalide (réponse 400)
+    """
+    value = params.get('as_of')
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValidationError({'as_of': "Date invalide (format attendu : YYYY-MM-DD)."})
+
+
+def leases_as_of(as_of, queryset=None):
+    """
+    Retourne les baux en cours à une date donnée.
+
+    La condition période @> [as_of, as_of] utilise l'index GiST des périodes
+    (assignment_period_gist_idx) : seuls les baux concernés sont lus, quel
+    que soit le volume de l'historique. Un bail terminé sans date de fin
+    connue est exclu (sa période réelle est inconnue).
+    """
+    from .models import TenantAssignment
+
+    if queryset is None:
+        queryset = TenantAssignment.objects.all()
+    return queryset.annotate(period=LeasePeriod()).filter(
+        Q(is_active=True) | Q(end_date__isnull=False),
+        period__contains=lease_range(as_of, as_of)
+    )
+
+
+def outstanding_as_of(as_of):
+    """
+    Expression du montant restant dû d'un bail à une date donnée.
+
+    Somme des échéances arrivées à terme à cette date et non encore payées
+    à cette date (index (assignment, due_date) des paiements).
+    """
+    from apps.payments.models import Payment
+
+    outstanding = (
+        Payment.objects.filter(assignment=OuterRef('pk'), due_date__lte=as_of)
+        .filter(~Q(status=Payment.Status.PAID) | Q(payment_date__gt=as_of))
+        .values('assignment')
+        .annotate(total=Sum('amount'))
+        .values('total')
+    )
+    return Coalesce(Subquery(outstanding), Value(Decimal('0.00')))
+
+
+def is_overlap_violation(exc):
+    """Indique si une IntegrityError provient de la contrainte d'exclusion."""
+    cause = getattr(exc, '__cause__', None)
+    diag = getattr(cause, 'diag', None)
+    if diag is not None and getattr(diag, 'constraint_name', None):
+        return diag.constraint_name == OVERLAP_CONSTRAINT
+    return OVERLAP_CONSTRAINT in str(exc)
+
+
+def lease_integrity_message(exc):
+    """
+    Traduit une IntegrityError de l'enregistrement d'un bail en message client.
+
+    Couvre le chevauchement, l'unicité du bail actif et les clés étrangères
+    (suppression concurrente du bien ou du locataire). Les autres violations
+    (NOT NULL, CHECK) révèlent une erreur de validation et restent des 500.
+
+    Returns:
+        str: Message d'erreur, None si la violation n'est pas reconnue
+    """
+    if is_overlap_violation(exc):
+        return OVERLAP_MESSAGE
+    cause = getattr(exc, '__cause__', None)
+    code = getattr(cause, 'pgcode', None)
+    if code is not None:
+        if code == FOREIGN_KEY_VIOLATION:
+            return MISSING_RELATION_MESSAGE
+        constraint = getattr(getattr(cause, 'diag', None), 'constraint_name', None)
+        if code == UNIQUE_VIOLATION and constraint == ACTIVE_LEASE_CONSTRAINT:
+            return ACTIVE_LEASE_MESSAGE
+        return None
+    # SQLite : seul le texte de l'erreur est disponible
+    message = str(exc)
+    if 'FOREIGN KEY constraint failed' in message:
+        return MISSING_RELATION_MESSAGE
+    if 'UNIQUE constraint failed' in message and 'tenant_id' in message and 'property_id' in message:
+        return ACTIVE_LEASE_MESSAGE
+    return None
+
+
+def create_btree_gist(sender, using, **kwargs):
+    """
+    Installe l'extension btree_gist avant les migrations (PostgreSQL).
+
+    Elle est nécessaire pour combiner l'égalité sur property_id et le
+    chevauchement de périodes dans une même contrainte GiST.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
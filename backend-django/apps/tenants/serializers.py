@@ -5,8 +5,10 @@ Gère la conversion des assignations locataires en JSON.
 
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
 
 from .models import TenantAssignment
+from .periods import OVERLAP_MESSAGE, lease_integrity_message, overlapping_leases
 from apps.properties.serializers import PropertyListSerializer
 from apps.accounts.serializers import UserSerializer
 
@@ -35,6 +37,14 @@ class TenantAssignmentSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'agent', 'created_at', 'updated_at']
+    
+    def to_representation(self, instance):
+        """Ajoute le restant dû calculé pour une date donnée (as_of)."""
+        data = super().to_representation(instance)
+        outstanding = getattr(instance, 'outstanding', None)
+        if outstanding is not None:
+            data['outstanding'] = float(outstanding)
+        return data
 
 
 class TenantAssignmentCreateSerializer(serializers.ModelSerializer):
@@ -69,15 +79,66 @@ class TenantAssignmentCreateSerializer(serializers.ModelSerializer):
                     'property': "Vous ne pouvez assigner des locataires qu'à vos propres biens."
                 })
         
-        # Vérifier les dates
+        # Dates effectives (valeurs enregistrées pour une modification partielle)
+        instance = self.instance
         start_date = data.get('start_date')
         end_date = data.get('end_date')
+        if 'start_date' not in data and instance is not None:
+            start_date = instance.start_date
+        if 'end_date' not in data and instance is not None:
+            end_date = instance.end_date
+        
+        # Vérifier les dates
         if end_date and start_date and end_date < start_date:
             raise serializers.ValidationError({
                 'end_date': "La date de fin doit être postérieure à la date de début."
             })
         
+        # Vérifier l'absence de chevauchement avec un bail actif du bien
+        # (une sonde d'index ; la contrainte d'exclusion couvre les accès concurrents)
+        property_obj = data.get('property', getattr(instance, 'property', None))
+        is_active = instance.is_active if instance is not None else True
+        if property_obj and start_date and is_active:
+            conflicts = overlapping_leases(
+                property_obj.pk, start_date, end_date,
+                exclude_pk=getattr(instance, 'pk', None)
+            )
+            if conflicts.exists():
+                raise serializers.ValidationError({'non_field_errors': [OVERLAP_MESSAGE]})
+        
         return data
+    
+    def save(self, **kwargs):
+        """
+        Traduit les violations de contraintes d'un bail en erreur 400.
+
+        Chevauchement, bail actif en double et clé étrangère (bien ou locataire
+        supprimé entre la validation et l'écriture) ; les autres violations
+        sont relayées (voir lease_integrity_message).
+        """
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+        except IntegrityError as exc:
+            message = lease_integrity_message(exc)
+            if message is None:
+                raise
+            raise serializers.ValidationError({'non_field_errors': [message]})
+
+
+class OnboardingLeaseSerializer(TenantAssignmentCreateSerializer):
+    """
+    Bail d'un locataire en cours de création (le locataire n'existe pas encore).
+    
+    Reprend les validations de TenantAssignmentCreateSerializer.
+    """
+    
+    class Meta(TenantAssignmentCreateSerializer.Meta):
+        fields = [
+            'property',
+            'start_date', 'end_date',
+            'rent_amount', 'deposit', 'notes'
+        ]
 
 
 class TenantListSerializer(serializers.ModelSerializer):
@@ -95,8 +156,19 @@ class TenantListSerializer(serializers.ModelSerializer):
         ]
     
     def get_current_property(self, obj):
-        """Retourne le bien actuellement loué par le locataire."""
-        active_assignment = obj.tenant_assignments.filter(is_active=True).first()
+        """
+        Retourne le bien actuellement loué par le locataire.
+        
+        Utilise le bail actif préchargé (`active_assignments`) lorsqu'il est
+        disponible, sinon effectue une seule requête avec le bien joint.
+        """
+        active_assignments = getattr(obj, 'active_assignments', None)
+        if active_assignments is None:
+            active_assignments = obj.tenant_assignments.filter(
+                is_active=True
+            ).select_related('property')[:1]
+        
+        active_assignment = next(iter(active_assignments), None)
         if active_assignment:
             return {
                 'id': active_assignment.property.id,
@@ -146,3 +218,60 @@ class TenantPropertyViewSerializer(serializers.ModelSerializer):
             'email': agent.email,
             'phone': agent.phone
         }
+
+
+# Nombre maximal d'assignations traitées par requête groupée
+BULK_MAX_ITEMS = 1000
+
+
+class BulkEndSerializer(serializers.Serializer):
+    """
+    Sérialiseur pour terminer plusieurs baux en une requête.
+    """
+    
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=BULK_MAX_ITEMS
+    )
+    end_date = serializers.DateField(required=False)
+    
+    def validate_ids(self, value):
+        """Supprime les doublons en conservant l'ordre."""
+        return list(dict.fromkeys(value))
+
+
+class BulkRenewItemSerializer(serializers.Serializer):
+    """
+    Renouvellement d'un bail : nouvelle date de fin et loyer éventuel.
+    """
+    
+    id = serializers.IntegerField(min_value=1)
+    end_date = serializers.DateField()
+    rent_amount = serializers.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        min_value=0,
+        required=False
+    )
+
+
+class BulkRenewSerializer(serializers.Serializer):
+    """
+    Sérialiseur pour renouveler plusieurs baux en une requête.
+    """
+    
+    items = BulkRenewItemSerializer(
+        many=True,
+        allow_empty=False,
+        max_length=BULK_MAX_ITEMS
+    )
+    
+    def validate_items(self, value):
+        """Vérifie l'unicité des identifiants."""
+        ids = [item['id'] for item in value]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError(
+                "Chaque assignation ne peut apparaître qu'une fois."
+            )
+        return value
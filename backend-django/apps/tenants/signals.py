@@ -0,0 +1,32 @@
+"""
+Signaux de l'application tenants.
+Maintiennent les données dérivées des assignations lors des suppressions.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.properties.models import Property
+from .access import schedule_access_sync, tenant_ids_for_properties
+from .availability import schedule_availability_refresh
+from .models import TenantAssignment
+
+
+@receiver(post_delete, sender=TenantAssignment)
+def assignment_deleted(sender, instance, using, **kwargs):
+    """
+    Recalcule la disponibilité du bien après la suppression d'un bail actif.
+    
+    Couvre aussi les suppressions en cascade (suppression d'un locataire).
+    """
+    if instance.is_active:
+        schedule_availability_refresh({instance.property_id}, using=using)
+    schedule_access_sync({instance.tenant_id}, using=using)
+
+
+@receiver(post_save, sender=Property)
+def property_saved(sender, instance, created, using, **kwargs):
+    """Recalcule les accès des locataires d'un bien qui change d'agent."""
+    if not created and instance.agent_changed:
+        schedule_access_sync(tenant_ids_for_properties([instance.pk]), using=using)
+    instance._loaded_agent_id = instance.agent_id
@@ -0,0 +1,164 @@
+"""
+Tests de l'application tenants.
+
+Nombre de requêtes de la liste et du détail des locataires : constant quelle
+que soit la taille de la page (bail actif et bien préchargés en une requête).
+Violations de contraintes à l'enregistrement d'un bail traduites en 400.
+"""
+
+from datetime import date
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.urls import reverse
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.test import APITestCase
+
+from apps.properties.models import Property
+from .models import TenantAssignment
+from .periods import (
+    ACTIVE_LEASE_MESSAGE,
+    MISSING_RELATION_MESSAGE,
+    OVERLAP_CONSTRAINT,
+    OVERLAP_MESSAGE,
+    lease_integrity_message,
+)
+
+User = get_user_model()
+
+# Tailles de page testées (et nombre de locataires créés)
+PAGE_SIZES = (20, 200, 2000)
+
+
+class TenantListQueryCountTests(APITestCase):
+    """Liste et détail des locataires en un nombre fixe de requêtes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            email='admin@test.local', password='test', first_name='Admin',
+            last_name='Test', role='admin'
+        )
+        cls.agent = User.objects.create_user(
+            email='agent@test.local', password='test', first_name='Agent',
+            last_name='Test', role='agent'
+        )
+        count = max(PAGE_SIZES)
+        tenants = User.objects.bulk_create(
+            User(
+                email=f'tenant{index}@test.local', first_name='Locataire',
+                last_name=str(index), role='tenant'
+            )
+            for index in range(count)
+        )
+        properties = Property.objects.bulk_create(
+            Property(
+                name=f'Bien {index}', address=f'{index} rue du Test', city='Paris',
+                postal_code='75001', monthly_rent=800, agent=cls.agent
+            )
+            for index in range(count)
+        )
+        # Table d'accès agent → locataire alimentée après validation
+        with cls.captureOnCommitCallbacks(execute=True):
+            TenantAssignment.objects.bulk_create(
+                TenantAssignment(
+                    tenant=tenant, property=prop, start_date=date(2024, 1, 1),
+                    rent_amount=800
+                )
+                for tenant, prop in zip(tenants, properties)
+            )
+        cls.tenant = tenants[0]
+
+    def assertListQueries(self, user, expected):
+        self.client.force_authenticate(user)
+        for size in PAGE_SIZES:
+            with self.subTest(user=user.role, page_size=size), \
+                    mock.patch.object(PageNumberPagination, 'page_size', size):
+                # count, page, baux actifs et biens préchargés
+                with self.assertNumQueries(expected):
+                    response = self.client.get(reverse('tenants:tenant_list'))
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.data['results']), size)
+                self.assertTrue(all(
+                    row['current_property'] is not None for row in response.data['results']
+                ))
+
+    def test_list_query_count_is_constant_for_admin(self):
+        self.assertListQueries(self.admin, 3)
+
+    def test_list_query_count_is_constant_for_agent(self):
+        self.assertListQueries(self.agent, 3)
+
+    def test_detail_query_count(self):
+        for user in (self.admin, self.agent):
+            self.client.force_authenticate(user)
+            with self.subTest(user=user.role), self.assertNumQueries(2):
+                response = self.client.get(
+                    reverse('tenants:tenant_detail', args=[self.tenant.pk])
+                )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['current_property']['name'], 'Bien 0')
+
+
+def postgres_error(code, constraint):
+    """IntegrityError portant l'erreur psycopg2 d'origine (code SQLSTATE, contrainte)."""
+    cause = Exception(constraint)
+    cause.pgcode = code
+    cause.diag = SimpleNamespace(constraint_name=constraint)
+    exc = IntegrityError(constraint)
+    exc.__cause__ = cause
+    return exc
+
+
+class LeaseIntegrityErrorTests(APITestCase):
+    """Violations de contraintes à la création d'un bail."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = User.objects.create_user(
+            email='agent@test.local', password='test', first_name='Agent',
+            last_name='Test', role='agent'
+        )
+        cls.tenant = User.objects.create_user(
+            email='tenant@test.local', password='test', first_name='Locataire',
+            last_name='Test', role='tenant'
+        )
+        cls.property = Property.objects.create(
+            name='Bien A', address='1 rue A', city='Paris', postal_code='75001',
+            monthly_rent=800, agent=cls.agent
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.agent)
+        self.data = {
+            'tenant': self.tenant.pk, 'property': self.property.pk,
+            'start_date': '2024-01-01', 'rent_amount': '800.00',
+        }
+
+    def create_with_error(self, exc):
+        with mock.patch.object(TenantAssignment, 'save', side_effect=exc):
+            return self.client.post(reverse('tenants:assignment_create'), self.data)
+
+    def test_foreign_key_violation_is_a_validation_error(self):
+        response = self.create_with_error(IntegrityError('FOREIGN KEY constraint failed'))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['non_field_errors'], [MISSING_RELATION_MESSAGE])
+
+    def test_unrecognized_violation_is_not_hidden(self):
+        with self.assertRaises(IntegrityError):
+            self.create_with_error(IntegrityError('NOT NULL constraint failed: rent_amount'))
+
+    def test_postgresql_violations(self):
+        cases = [
+            (postgres_error('23P01', OVERLAP_CONSTRAINT), OVERLAP_MESSAGE),
+            (postgres_error('23505', 'unique_active_tenant_property'), ACTIVE_LEASE_MESSAGE),
+            (postgres_error('23503', 'tenants_tenantassignment_property_id_fkey'),
+             MISSING_RELATION_MESSAGE),
+            (postgres_error('23505', 'accounts_user_email_key'), None),
+            (postgres_error('23502', 'rent_amount'), None),
+        ]
+        for exc, message in cases:
+            with self.subTest(code=exc.__cause__.pgcode, constraint=str(exc)):
+                self.assertEqual(lease_integrity_message(exc), message)
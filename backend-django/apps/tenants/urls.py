@@ -7,11 +7,16 @@ from django.urls import path
 from .views import (
     TenantListView,
     TenantDetailView,
+    TenantOnboardingView,
     AssignmentListView,
     AssignmentCreateView,
     AssignmentDetailView,
     EndAssignmentView,
+    BulkEndAssignmentsView,
+    BulkRenewAssignmentsView,
+    ExpiringLeasesView,
     MyPropertyView,
+    TenantHomeView,
 )
 
 app_name = 'tenants'
@@ -29,6 +34,10 @@ urlpatterns = [
     # Détails d'un locataire
     path('<int:pk>/', TenantDetailView.as_view(), name='tenant_detail'),
     
+    # POST /api/tenants/onboard/
+    # Créer locataire, bail et premières échéances en une requête
+    path('onboard/', TenantOnboardingView.as_view(), name='tenant_onboard'),
+    
     # ==========================================================================
     # GESTION DES ASSIGNATIONS (AGENT/ADMIN)
     # ==========================================================================
@@ -37,6 +46,10 @@ urlpatterns = [
     # Liste des assignations
     path('assignments/', AssignmentListView.as_view(), name='assignment_list'),
     
+    # GET /api/tenants/assignments/expiring/
+    # Baux arrivant à terme (30 / 60 / 90 jours)
+    path('assignments/expiring/', ExpiringLeasesView.as_view(), name='assignment_expiring'),
+    
     # POST /api/tenants/assignments/create/
     # Créer une assignation
     path('assignments/create/', AssignmentCreateView.as_view(), name='assignment_create'),
@@ -49,6 +62,14 @@ urlpatterns = [
     # Terminer un bail
     path('assignments/<int:pk>/end/', EndAssignmentView.as_view(), name='assignment_end'),
     
+    # POST /api/tenants/assignments/bulk-end/
+    # Terminer plusieurs baux
+    path('assignments/bulk-end/', BulkEndAssignmentsView.as_view(), name='assignment_bulk_end'),
+    
+    # POST /api/tenants/assignments/bulk-renew/
+    # Renouveler plusieurs baux
+    path('assignments/bulk-renew/', BulkRenewAssignmentsView.as_view(), name='assignment_bulk_renew'),
+    
     # ==========================================================================
     # INTERFACE LOCATAIRE
     # ==========================================================================
@@ -56,4 +77,8 @@ urlpatterns = [
     # GET /api/tenants/my-property/
     # Consulter son logement (locataire connecté)
     path('my-property/', MyPropertyView.as_view(), name='my_property'),
+    
+    # GET /api/tenants/home/
+    # Page d'accueil du locataire (logement, échéances, solde)
+    path('home/', TenantHomeView.as_view(), name='tenant_home'),
 ]
@@ -3,24 +3,62 @@ Vues API pour la gestion des locataires et assignations.
 Fournit les endpoints pour gérer les relations locataire-bien.
 """
 
+from datetime import date
+
 from rest_framework import generics, status, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
-from django.db.models import Q
+from django.db import IntegrityError
+from django.db.models import Q, Prefetch
 
+from .bulk import bulk_end, bulk_renew
+from .expirations import upcoming_expirations
+from .home import DEFAULT_RECENT_PAYMENTS, get_tenant_home
 from .models import TenantAssignment
+from .onboarding import onboard_tenant
+from .periods import (
+    OVERLAP_MESSAGE,
+    is_overlap_violation,
+    leases_as_of,
+    outstanding_as_of,
+    parse_as_of,
+)
 from .serializers import (
+    BulkEndSerializer,
+    BulkRenewSerializer,
+    OnboardingLeaseSerializer,
     TenantAssignmentSerializer,
     TenantAssignmentCreateSerializer,
     TenantListSerializer,
     TenantPropertyViewSerializer,
 )
 from apps.accounts.permissions import IsAdminOrAgent, IsTenant
+from apps.accounts.serializers import UserCreateSerializer
+from apps.payments.serializers import PaymentListSerializer
 
 User = get_user_model()
 
 
+def active_assignments_prefetch(as_of=None):
+    """
+    Précharge le bail actif de chaque locataire et son bien en une requête.
+    
+    Avec as_of, précharge le bail en cours à cette date.
+    Le résultat est exposé dans l'attribut `active_assignments` utilisé par
+    TenantListSerializer.
+    """
+    if as_of is None:
+        queryset = TenantAssignment.objects.filter(is_active=True)
+    else:
+        queryset = leases_as_of(as_of)
+    return Prefetch(
+        'tenant_assignments',
+        queryset=queryset.select_related('property'),
+        to_attr='active_assignments'
+    )
+
+
 class TenantListView(generics.ListAPIView):
     """
     Endpoint pour lister les locataires.
@@ -33,6 +71,7 @@ class TenantListView(generics.ListAPIView):
     Query params:
         - search: Rechercher par nom ou email
         - has_property: Filtrer par locataires avec/sans logement
+        - as_of: Date (YYYY-MM-DD) : logement occupé à cette date
     """
     
     serializer_class = TenantListSerializer
@@ -42,15 +81,8 @@ class TenantListView(generics.ListAPIView):
         """Retourne les locataires selon le rôle."""
         user = self.request.user
         
-        # Base : uniquement les locataires
-        queryset = User.objects.filter(role='tenant')
-        
-        # Agent : uniquement les locataires de ses biens
-        if user.role == 'agent':
-            tenant_ids = TenantAssignment.objects.filter(
-                property__agent=user
-            ).values_list('tenant_id', flat=True)
-            queryset = queryset.filter(id__in=tenant_ids)
+        # Locataires accessibles (agent : table d'accès agent → locataire)
+        queryset = User.objects.for_user(user).filter(role='tenant')
         
         # Filtres
         params = self.request.query_params
@@ -64,19 +96,25 @@ class TenantListView(generics.ListAPIView):
                 Q(last_name__icontains=search)
             )
         
+        # Date d'observation (historique des baux)
+        as_of = parse_as_of(params)
+        
         # Filtre locataires avec/sans logement
         has_property = params.get('has_property')
         if has_property is not None:
-            active_tenant_ids = TenantAssignment.objects.filter(
-                is_active=True
-            ).values_list('tenant_id', flat=True)
+            if as_of is None:
+                active_tenant_ids = TenantAssignment.objects.filter(
+                    is_active=True
+                ).values_list('tenant_id', flat=True)
+            else:
+                active_tenant_ids = leases_as_of(as_of).values_list('tenant_id', flat=True)
             
             if has_property.lower() == 'true':
                 queryset = queryset.filter(id__in=active_tenant_ids)
             else:
                 queryset = queryset.exclude(id__in=active_tenant_ids)
         
-        return queryset.prefetch_related('tenant_assignments__property')
+        return queryset.prefetch_related(active_assignments_prefetch(as_of))
 
 
 class TenantDetailView(generics.RetrieveAPIView):
@@ -91,17 +129,9 @@ class TenantDetailView(generics.RetrieveAPIView):
     
     def get_queryset(self):
         """Retourne les locataires accessibles."""
-        user = self.request.user
-        
-        queryset = User.objects.filter(role='tenant')
-        
-        if user.role == 'agent':
-            tenant_ids = TenantAssignment.objects.filter(
-                property__agent=user
-            ).values_list('tenant_id', flat=True)
-            queryset = queryset.filter(id__in=tenant_ids)
-        
-        return queryset
+        return User.objects.for_user(self.request.user).filter(
+            role='tenant'
+        ).prefetch_related(active_assignments_prefetch())
 
 
 class AssignmentListView(generics.ListAPIView):
@@ -114,6 +144,7 @@ class AssignmentListView(generics.ListAPIView):
         - is_active: Filtrer par bail actif/inactif
         - property_id: Filtrer par bien
         - tenant_id: Filtrer par locataire
+        - as_of: Date (YYYY-MM-DD) : baux en cours à cette date et restant dû
     """
     
     serializer_class = TenantAssignmentSerializer
@@ -121,12 +152,7 @@ class AssignmentListView(generics.ListAPIView):
     
     def get_queryset(self):
         """Retourne les assignations selon le rôle."""
-        user = self.request.user
-        
-        if user.role == 'admin':
-            queryset = TenantAssignment.objects.all()
-        else:
-            queryset = TenantAssignment.objects.filter(property__agent=user)
+        queryset = TenantAssignment.objects.for_user(self.request.user)
         
         # Filtres
         params = self.request.query_params
@@ -143,7 +169,16 @@ class AssignmentListView(generics.ListAPIView):
         if tenant_id:
             queryset = queryset.filter(tenant_id=tenant_id)
         
-        return queryset.select_related('tenant', 'property', 'agent')
+        # Baux en cours à une date donnée, avec le restant dû à cette date
+        as_of = parse_as_of(params)
+        if as_of is not None:
+            queryset = leases_as_of(as_of, queryset).annotate(
+                outstanding=outstanding_as_of(as_of)
+            )
+        
+        return queryset.select_related(
+            'tenant', 'property', 'agent'
+        ).prefetch_related('property__photos__asset')
 
 
 class AssignmentCreateView(generics.CreateAPIView):
@@ -185,11 +220,7 @@ class AssignmentDetailView(generics.RetrieveUpdateDestroyAPIView):
     
     def get_queryset(self):
         """Retourne les assignations accessibles."""
-        user = self.request.user
-        
-        if user.role == 'admin':
-            return TenantAssignment.objects.all()
-        return TenantAssignment.objects.filter(property__agent=user)
+        return TenantAssignment.objects.for_user(self.request.user)
     
     def get_serializer_class(self):
         """Retourne le sérialiseur approprié."""
@@ -204,7 +235,8 @@ class EndAssignmentView(APIView):
     
     POST /api/tenants/assignments/<id>/end/
     
-    Désactive l'assignation sans la supprimer (conservation de l'historique).
+    Désactive l'assignation sans la supprimer (conservation de l'historique)
+    et fixe la date de fin à aujourd'hui si elle est vide ou future.
     """
     
     permission_classes = [IsAdminOrAgent]
@@ -212,19 +244,17 @@ class EndAssignmentView(APIView):
     def post(self, request, pk):
         """Termine le bail."""
         try:
-            if request.user.role == 'admin':
-                assignment = TenantAssignment.objects.get(pk=pk)
-            else:
-                assignment = TenantAssignment.objects.get(
-                    pk=pk,
-                    property__agent=request.user
-                )
+            assignment = TenantAssignment.objects.for_user(request.user).get(pk=pk)
         except TenantAssignment.DoesNotExist:
             return Response(
                 {'error': 'Assignation non trouvée'},
                 status=status.HTTP_404_NOT_FOUND
             )
         
+        # La date de fin est conservée pour l'historique (requêtes as_of)
+        today = date.today()
+        if assignment.end_date is None or assignment.end_date > today:
+            assignment.end_date = max(today, assignment.start_date)
         assignment.is_active = False
         assignment.save()
         
@@ -234,6 +264,187 @@ class EndAssignmentView(APIView):
         })
 
 
+class TenantOnboardingView(APIView):
+    """
+    Endpoint pour l'arrivée d'un locataire en une seule requête.
+    
+    POST /api/tenants/onboard/
+    
+    Crée le compte du locataire, son bail et ses premières échéances
+    (dépôt de garantie, premier loyer) dans une seule transaction.
+    
+    Request body:
+        {
+            "tenant": {
+                "email": "locataire@example.com",
+                "first_name": "Pierre",
+                "last_name": "Martin",
+                "phone": "+33698765432"
+            },
+            "lease": {
+                "property": 3,
+                "start_date": "2024-01-01",
+                "end_date": "2025-01-01",
+                "rent_amount": 1200.00,
+                "deposit": 2400.00
+            }
+        }
+    
+    Response (201):
+        {
+            "tenant": {..., "generated_password": "Xy9$kL2m!4Np"},
+            "assignment": {...},
+            "payments": [...]
+        }
+    """
+    
+    permission_classes = [IsAdminOrAgent]
+    
+    def post(self, request):
+        """Valide puis enregistre le locataire, le bail et les échéances."""
+        tenant_serializer = UserCreateSerializer(data=request.data.get('tenant') or {})
+        lease_serializer = OnboardingLeaseSerializer(
+            data=request.data.get('lease') or {},
+            context={'request': request}
+        )
+        
+        # Toutes les erreurs sont renvoyées en une fois
+        errors = {}
+        if not tenant_serializer.is_valid():
+            errors['tenant'] = tenant_serializer.errors
+        if not lease_serializer.is_valid():
+            errors['lease'] = lease_serializer.errors
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            tenant, assignment, payments = onboard_tenant(
+                request.user,
+                tenant_serializer,
+                lease_serializer.validated_data
+            )
+        except IntegrityError as exc:
+            # Bail concurrent sur la même période : la transaction est annulée
+            if not is_overlap_violation(exc):
+                raise
+            return Response(
+                {'lease': {'non_field_errors': [OVERLAP_MESSAGE]}},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response({
+            'tenant': tenant_serializer.data,
+            'assignment': TenantAssignmentSerializer(assignment).data,
+            'payments': PaymentListSerializer(payments, many=True).data,
+        }, status=status.HTTP_201_CREATED)
+
+
+class BulkEndAssignmentsView(APIView):
+    """
+    Endpoint pour terminer plusieurs baux en une requête.
+    
+    POST /api/tenants/assignments/bulk-end/
+    
+    Request body:
+        {
+            "ids": [12, 15, 18],
+            "end_date": "2024-06-30"  // optionnel, aujourd'hui par défaut
+        }
+    
+    Response:
+        {
+            "ended": 2,
+            "already_ended": [15],
+            "invalid": [],
+            "not_found": []
+        }
+    """
+    
+    permission_classes = [IsAdminOrAgent]
+    
+    def post(self, request):
+        """Termine les baux accessibles."""
+        serializer = BulkEndSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        summary = bulk_end(
+            TenantAssignment.objects.for_user(request.user),
+            serializer.validated_data['ids'],
+            serializer.validated_data.get('end_date')
+        )
+        return Response(summary)
+
+
+class BulkRenewAssignmentsView(APIView):
+    """
+    Endpoint pour renouveler plusieurs baux en une requête.
+    
+    POST /api/tenants/assignments/bulk-renew/
+    
+    Request body:
+        {
+            "items": [
+                {"id": 12, "end_date": "2025-06-30", "rent_amount": 950.00},
+                {"id": 18, "end_date": "2025-08-31"}
+            ]
+        }
+    
+    Response:
+        {
+            "renewed": 2,
+            "inactive": [],
+            "invalid": [],
+            "not_found": []
+        }
+    """
+    
+    permission_classes = [IsAdminOrAgent]
+    
+    def post(self, request):
+        """Renouvelle les baux actifs accessibles."""
+        serializer = BulkRenewSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        try:
+            summary = bulk_renew(
+                TenantAssignment.objects.for_user(request.user),
+                serializer.validated_data['items']
+            )
+        except IntegrityError as exc:
+            # Une prolongation chevauche un bail actif : rien n'est appliqué
+            if not is_overlap_violation(exc):
+                raise
+            return Response(
+                {'error': OVERLAP_MESSAGE},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(summary)
+
+
+class ExpiringLeasesView(APIView):
+    """
+    Endpoint des baux arrivant à terme.
+    
+    GET /api/tenants/assignments/expiring/
+    
+    Retourne les baux actifs se terminant dans les 30, 60 et 90 prochains
+    jours, regroupés par horizon.
+    
+    Response:
+        {
+            "today": "2024-06-01",
+            "counts": {"30": 2, "60": 0, "90": 1},
+            "horizons": {"30": [...], "60": [], "90": [...]}
+        }
+    """
+    
+    permission_classes = [IsAdminOrAgent]
+    
+    def get(self, request):
+        """Retourne les échéances selon le rôle."""
+        return Response(upcoming_expirations(TenantAssignment.objects.for_user(request.user)))
+
+
 class MyPropertyView(generics.RetrieveAPIView):
     """
     Endpoint pour locataire - consulter son logement.
@@ -249,13 +460,10 @@ class MyPropertyView(generics.RetrieveAPIView):
     def get_object(self):
         """Retourne l'assignation active du locataire."""
         try:
-            return TenantAssignment.objects.select_related(
+            return TenantAssignment.objects.for_user(self.request.user).select_related(
                 'property',
                 'property__agent'
-            ).get(
-                tenant=self.request.user,
-                is_active=True
-            )
+            ).get(is_active=True)
         except TenantAssignment.DoesNotExist:
             return None
     
@@ -269,3 +477,40 @@ class MyPropertyView(generics.RetrieveAPIView):
             )
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
+
+
+class TenantHomeView(APIView):
+    """
+    Endpoint pour locataire - page d'accueil du portail.
+    
+    GET /api/tenants/home/
+    
+    Remplace les appels séparés à my-property, my-current et my-payments :
+    deux requêtes SQL, résultat mis en cache par locataire jusqu'à la
+    modification de son bail ou de ses paiements (voir apps.tenants.home).
+    
+    Query params:
+        - limit: Nombre de derniers paiements (défaut : 5, max : 50)
+    
+    Response:
+        {
+            "lease": {"id": 4, "property_details": {...}, "agent_contact": {...}, ...},
+            "next_payment": {"id": 31, "amount": "950.00", "due_date": "2024-07-05", "is_late": false, ...},
+            "balance": 950.0,
+            "overdue_total": 0.0,
+            "recent_payments": [...]
+        }
+    """
+    
+    permission_classes = [IsTenant]
+    
+    def get(self, request):
+        """Retourne la page d'accueil du locataire connecté."""
+        try:
+            limit = int(request.query_params.get('limit', DEFAULT_RECENT_PAYMENTS))
+        except ValueError:
+            return Response(
+                {'error': "Le paramètre limit doit être un entier."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(get_tenant_home(request.user, limit))
@@ -0,0 +1,70 @@
+"""
+Point d'entrée WSGI avec une chaîne de middlewares réduite pour l'API.
+
+L'API s'authentifie par JWT et ne renvoie que du JSON : sessions, CSRF,
+messages et protection contre le clickjacking n'y servent à rien. Les
+requêtes dont le chemin commence par API_URL_PREFIX traversent la chaîne
+API_MIDDLEWARE ; toutes les autres (admin, fichiers) gardent MIDDLEWARE.
+
+Chaque chaîne est construite une seule fois, au démarrage, par un handler
+Django distinct : les hooks process_view / process_exception de chaque
+chaîne restent ceux de ses propres middlewares.
+"""
+
+from contextlib import contextmanager
+
+import django
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+
+
+@contextmanager
+def _middleware_setting(middleware):
+    """Remplace temporairement settings.MIDDLEWARE (au chargement uniquement)."""
+    original = settings.MIDDLEWARE
+    settings.MIDDLEWARE = middleware
+    try:
+        yield
+    finally:
+        settings.MIDDLEWARE = original
+
+
+class APIWSGIHandler(WSGIHandler):
+    """Handler WSGI dont la chaîne provient de API_MIDDLEWARE."""
+
+    def load_middleware(self, is_async=False):
+        with _middleware_setting(settings.API_MIDDLEWARE):
+            super().load_middleware(is_async)
+
+
+class PrefixRoutedWSGIHandler:
+    """
+    Aiguille chaque requête vers la chaîne API ou la chaîne complète.
+
+    Attributes:
+        prefix: Préfixe des chemins de l'API
+        api_handler: Handler à chaîne réduite
+        default_handler: Handler à chaîne complète (MIDDLEWARE)
+    """
+
+    def __init__(self):
+        self.prefix = settings.API_URL_PREFIX
+        self.api_handler = APIWSGIHandler()
+        self.default_handler = WSGIHandler()
+
+    def __call__(self, environ, start_response):
+        if environ.get('PATH_INFO', '').startswith(self.prefix):
+            return self.api_handler(environ, start_response)
+        return self.default_handler(environ, start_response)
+
+
+def get_routed_wsgi_application():
+    """
+    Retourne l'application WSGI du projet.
+
+    Chaîne complète pour toutes les requêtes si API_MIDDLEWARE vaut None.
+    """
+    django.setup(set_prefix=False)
+    if getattr(settings, 'API_MIDDLEWARE', None) is None:
+        return WSGIHandler()
+    return PrefixRoutedWSGIHandler()
@@ -0,0 +1,175 @@
+"""
+Profilage de requêtes à la demande.
+
+Une requête est profilée lorsque :
+- un administrateur envoie l'en-tête PROFILING_HEADER (X-Profile: 1)
+- ou elle est tirée au sort (PROFILING_SAMPLE_RATE, 0 par défaut)
+
+Le profil (cProfile, fonctions les plus coûteuses) et les requêtes SQL avec
+leur durée sont stockés dans le cache PROFILING_CACHE sous un identifiant
+renvoyé dans l'en-tête X-Profile-Id, et consultables par les
+administrateurs (/api/accounts/profiles/<id>/). Utiliser un cache partagé
+pour consulter un profil capturé par un autre processus.
+
+Une requête non profilée ne coûte qu'une lecture d'en-tête (et un tirage
+aléatoire si l'échantillonnage est activé).
+"""
+
+import cProfile
+import io
+import pstats
+import random
+import time
+import uuid
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.utils import timezone
+
+# En-tête de déclenchement (clé META) et fraction de requêtes échantillonnées
+PROFILING_HEADER = getattr(settings, 'PROFILING_HEADER', 'HTTP_X_PROFILE')
+SAMPLE_RATE = getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0)
+
+# Stockage des profils : alias du cache, durée de conservation (secondes),
+# nombre de profils listés
+PROFILING_CACHE = getattr(settings, 'PROFILING_CACHE', 'default')
+PROFILE_TTL = getattr(settings, 'PROFILING_TTL', 3600)
+RECENT_PROFILES = 50
+
+# Nombre de fonctions et de requêtes SQL conservées par profil
+TOP_FUNCTIONS = 40
+MAX_QUERIES = 500
+
+RECENT_KEY = 'profile:recent'
+
+
+def _profile_key(profile_id):
+    return f"profile:{profile_id}"
+
+
+def get_profile(profile_id):
+    """Retourne un profil stocké (None s'il n'existe pas ou a expiré)."""
+    return caches[PROFILING_CACHE].get(_profile_key(profile_id))
+
+
+def recent_profiles():
+    """Retourne les résumés des derniers profils, du plus récent au plus ancien."""
+    return caches[PROFILING_CACHE].get(RECENT_KEY) or []
+
+
+class QueryRecorder:
+    """Enregistre les requêtes SQL exécutées et leur durée (execute_wrapper)."""
+
+    def __init__(self):
+        self.queries = []
+        self.count = 0
+        self.total = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.count += 1
+            self.total += duration
+            if len(self.queries) < MAX_QUERIES:
+                self.queries.append({
+                    'sql': sql,
+                    'time_ms': round(duration * 1000, 3),
+                    'many': many,
+                    'database': context['connection'].alias,
+                })
+
+
+def _is_admin(request):
+    """
+    Indique si la requête provient d'un administrateur.
+
+    L'API n'a pas de session : le token JWT est vérifié ici (utilisateurs en
+    cache), uniquement pour les requêtes portant l'en-tête de profilage.
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        from apps.accounts.authentication import CachedJWTAuthentication
+
+        try:
+            result = CachedJWTAuthentication().authenticate(request)
+        except Exception:
+            return False
+        if result is None:
+            return False
+        user = result[0]
+    return user.is_active and user.role == 'admin'
+
+
+class RequestProfilingMiddleware:
+    """Profile les requêtes demandées par un administrateur ou échantillonnées."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def _trigger(self, request):
+        if request.META.get(PROFILING_HEADER):
+            return 'header' if _is_admin(request) else None
+        if SAMPLE_RATE and random.random() < SAMPLE_RATE:
+            return 'sample'
+        return None
+
+    def __call__(self, request):
+        trigger = self._trigger(request)
+        if trigger is None:
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        recorder = QueryRecorder()
+        started_at = timezone.now()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            try:
+                profiler.enable()
+            except ValueError:
+                # Un autre profileur est déjà actif dans ce thread
+                return self.get_response(request)
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        duration = time.perf_counter() - start
+
+        profile_id = uuid.uuid4().hex
+        self._store(profile_id, request, response, trigger, started_at, duration, profiler, recorder)
+        response['X-Profile-Id'] = profile_id
+        return response
+
+    def _store(self, profile_id, request, response, trigger, started_at, duration,
+               profiler, recorder):
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+
+        user = getattr(request, 'user', None)
+        summary = {
+            'id': profile_id,
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'user_id': user.pk if user is not None and user.is_authenticated else None,
+            'trigger': trigger,
+            'started_at': started_at.isoformat(),
+            'duration_ms': round(duration * 1000, 3),
+            'query_count': recorder.count,
+            'query_time_ms': round(recorder.total * 1000, 3),
+        }
+        cache = caches[PROFILING_CACHE]
+        cache.set(_profile_key(profile_id), {
+            **summary,
+            'queries': recorder.queries,
+            'profile': output.getvalue(),
+        }, PROFILE_TTL)
+        # Liste bornée des derniers profils (lecture puis écriture, non atomique)
+        recent = [summary] + cache.get(RECENT_KEY, [])[:RECENT_PROFILES - 1]
+        cache.set(RECENT_KEY, recent, PROFILE_TTL)
@@ -39,6 +39,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',  # Contraintes d'exclusion (périodes de bail)
     
     # Applications tierces
     'rest_framework',           # Django REST Framework
@@ -67,6 +68,18 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'immogest.profiling.RequestProfilingMiddleware',
+]
+
+# Chaîne réduite pour les requêtes de l'API (authentification JWT, réponses
+# JSON : ni sessions, ni CSRF, ni messages, ni clickjacking). L'admin garde
+# MIDDLEWARE. None : MIDDLEWARE pour toutes les requêtes (voir immogest.handlers)
+API_URL_PREFIX = '/api/'
+API_MIDDLEWARE = [
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'immogest.profiling.RequestProfilingMiddleware',
 ]
 
 # =============================================================================
@@ -108,6 +121,24 @@ DATABASES = {
     }
 }
 
+# =============================================================================
+# CACHE
+# =============================================================================
+
+# Cache local au processus par défaut ; utiliser un backend partagé
+# (Redis, Memcached) en production avec plusieurs processus
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'immogest-default',
+    },
+    # Seaux de limitation des connexions (apps.accounts.throttling)
+    'throttle': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'immogest-throttle',
+    },
+}
+
 # =============================================================================
 # VALIDATION DES MOTS DE PASSE
 # =============================================================================
@@ -138,6 +169,22 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Photos des biens : tailles des miniatures (côté maximal en pixels),
+# nombre de processus de génération et taille maximale d'un envoi
+PROPERTY_PHOTO_SIZES = {
+    'small': 320,
+    'medium': 800,
+    'large': 1600,
+}
+PROPERTY_PHOTO_WORKERS = int(os.getenv('PROPERTY_PHOTO_WORKERS', '2'))
+PROPERTY_PHOTO_MAX_SIZE = 15 * 1024 * 1024
+
+# Création de locataires en masse : processus de hachage des mots de passe,
+# nombre maximal de lignes par envoi API et dossier privé des identifiants
+TENANT_PROVISIONING_WORKERS = int(os.getenv('TENANT_PROVISIONING_WORKERS', str(os.cpu_count() or 1)))
+TENANT_PROVISIONING_MAX_ROWS = 5000
+TENANT_CREDENTIALS_ROOT = BASE_DIR / 'private' / 'credentials'
+
 # =============================================================================
 # MODÈLE UTILISATEUR PERSONNALISÉ
 # =============================================================================
@@ -153,7 +200,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     # Authentification par défaut via JWT
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.accounts.authentication.CachedJWTAuthentication',
     ],
     
     # Permissions par défaut - utilisateur authentifié requis
@@ -174,6 +221,11 @@ REST_FRAMEWORK = {
     
     # Documentation OpenAPI
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    
+    # Nombre de proxys de confiance devant l'application : l'adresse cliente
+    # des limitations est lue dans X-Forwarded-For à cette profondeur
+    # (0 : REMOTE_ADDR, l'en-tête envoyé par le client est ignoré)
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', '0')),
 }
 
 # =============================================================================
@@ -200,8 +252,50 @@ SIMPLE_JWT = {
     # Champs utilisateur inclus dans le token
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
+    
+    # Rafraîchissement avec liste de révocation (apps.accounts.blacklist)
+    'TOKEN_REFRESH_SERIALIZER': 'apps.accounts.serializers.CustomTokenRefreshSerializer',
+}
+
+# Liste de révocation des tokens : écriture par lots (nombre de tokens ou délai
+# en secondes) et délai de synchronisation entre processus (secondes)
+TOKEN_BLACKLIST_FLUSH_SIZE = int(os.getenv('TOKEN_BLACKLIST_FLUSH_SIZE', '500'))
+TOKEN_BLACKLIST_FLUSH_INTERVAL = float(os.getenv('TOKEN_BLACKLIST_FLUSH_INTERVAL', '2'))
+TOKEN_BLACKLIST_SYNC_INTERVAL = float(os.getenv('TOKEN_BLACKLIST_SYNC_INTERVAL', '5'))
+
+# Limitation des connexions et rafraîchissements : alias du cache des seaux
+# et capacité / remplissage (jetons par seconde) par seau
+LOGIN_THROTTLE_CACHE = os.getenv('LOGIN_THROTTLE_CACHE', 'throttle')
+LOGIN_THROTTLE_BUCKETS = {
+    'login_ip': {'capacity': 20, 'refill': 1 / 3},
+    'login_email': {'capacity': 5, 'refill': 1 / 60},
+    'login_account': {'capacity': 50, 'refill': 1 / 120},
+    'refresh_ip': {'capacity': 30, 'refill': 1},
 }
 
+# Durée de vie (secondes) des utilisateurs en cache dans l'authentification JWT
+AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', '30'))
+
+# Durée de vie (secondes) des tableaux de bord en cache (invalidés à chaque écriture).
+# L'invalidation ne touche que le processus courant avec le cache LocMem : la
+# durée de vie est alors limitée à DASHBOARD_LOCAL_CACHE_TIMEOUT ; configurer
+# un cache partagé en production multi-processus
+DASHBOARD_CACHE_TIMEOUT = 300
+DASHBOARD_LOCAL_CACHE_TIMEOUT = 5
+
+# Statistiques de loyer (apps.properties.analytics) : alias du cache du compteur
+# de suppressions, à partager entre processus pour recharger leurs instantanés
+RENT_SNAPSHOT_CACHE = os.getenv('RENT_SNAPSHOT_CACHE', 'default')
+
+# Profilage à la demande (immogest.profiling) : en-tête X-Profile envoyé par un
+# administrateur, ou fraction de requêtes échantillonnées (0 : désactivé)
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_TTL = 3600
+
+# Threads de calcul des sections du tableau de bord composite (PostgreSQL ;
+# chaque thread ouvre sa propre connexion, 1 : calcul séquentiel)
+DASHBOARD_SECTION_WORKERS = int(os.getenv('DASHBOARD_SECTION_WORKERS', '4'))
+
 # =============================================================================
 # CORS - Autoriser le frontend React
 # =============================================================================
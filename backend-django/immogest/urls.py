@@ -7,9 +7,10 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from rest_framework_simplejwt.views import TokenRefreshView
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
+from apps.accounts.views import CustomTokenRefreshView
+
 urlpatterns = [
     # ==========================================================================
     # ADMINISTRATION DJANGO
@@ -19,7 +20,7 @@ urlpatterns = [
     # ==========================================================================
     # AUTHENTIFICATION JWT
     # ==========================================================================
-    path('api/auth/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/auth/refresh/', CustomTokenRefreshView.as_view(), name='token_refresh'),
     
     # ==========================================================================
     # APPLICATIONS API
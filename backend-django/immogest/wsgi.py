@@ -1,11 +1,14 @@
 """
 Configuration WSGI pour le projet ImmoGest.
 Expose l'application WSGI comme variable de module nommée 'application'.
+Les requêtes /api/ traversent une chaîne de middlewares réduite
+(voir immogest.handlers).
 """
 
 import os
-from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'immogest.settings')
 
-application = get_wsgi_application()
+from immogest.handlers import get_routed_wsgi_application  # noqa: E402
+
+application = get_routed_wsgi_application()